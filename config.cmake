@@ -44,23 +44,20 @@ if(DEFINED ecap5_ecap5_treq_EXECUTABLE)
   endif()
 
   # Define commands for using ECAP5-TREQ
-  add_custom_target(report
-    WORKING_DIRECTORY ${CMAKE_SOURCE_DIR}
-    COMMAND ${ecap5_ecap5_treq_EXECUTABLE} -c ${ecap5_ecap5_treq_CONFIG_PATH} gen_report -o ${CMAKE_BINARY_DIR}/report.html --html)
-  add_custom_command(
-    OUTPUT report.md
-    WORKING_DIRECTORY ${CMAKE_SOURCE_DIR}
-    COMMAND ${ecap5_ecap5_treq_EXECUTABLE} -c ${ecap5_ecap5_treq_CONFIG_PATH} gen_report -o ${CMAKE_BINARY_DIR}/report.md)
-  add_custom_target(report_markdown DEPENDS report.md)
-  add_custom_command(
-    OUTPUT test-result-badge.json
-    WORKING_DIRECTORY ${CMAKE_SOURCE_DIR}
-    COMMAND ${ecap5_ecap5_treq_EXECUTABLE} -c ${ecap5_ecap5_treq_CONFIG_PATH} gen_test_result_badge -o ${CMAKE_BINARY_DIR}/test-result-badge.json)
+  # All report artifacts are generated by a single invocation sharing the same analysis. The rule is only attached
+  # to the report_all target, the other targets depending on report_all so that the artifacts are never generated
+  # twice by the same build.
   add_custom_command(
-    OUTPUT traceability-result-badge.json
+    OUTPUT report.md report.html test-result-badge.json traceability-result-badge.json
     WORKING_DIRECTORY ${CMAKE_SOURCE_DIR}
-    COMMAND ${ecap5_ecap5_treq_EXECUTABLE} -c ${ecap5_ecap5_treq_CONFIG_PATH} gen_traceability_result_badge -o ${CMAKE_BINARY_DIR}/traceability-result-badge.json)
-  add_custom_target(badges DEPENDS test-result-badge.json traceability-result-badge.json)
+    COMMAND ${ecap5_ecap5_treq_EXECUTABLE} -c ${ecap5_ecap5_treq_CONFIG_PATH} gen_all -o ${CMAKE_BINARY_DIR})
+  add_custom_target(report_all DEPENDS report.md report.html test-result-badge.json traceability-result-badge.json)
+  add_custom_target(report)
+  add_dependencies(report report_all)
+  add_custom_target(report_markdown)
+  add_dependencies(report_markdown report_all)
+  add_custom_target(badges)
+  add_dependencies(badges report_all)
 
   add_custom_command(
     OUTPUT traceability-matrix.csv
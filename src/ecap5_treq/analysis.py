@@ -19,10 +19,13 @@
 # You should have received a copy of the GNU General Public License
 # along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
 
+from typing import Iterable
+
 from ecap5_treq.matrix import Matrix 
 from ecap5_treq.req import Req, ReqStatus
 from ecap5_treq.check import Check
 from ecap5_treq.log import log_imp, log_warn, log_error
+from ecap5_treq.profiling import profiler
 
 class Analysis():
     """An Analysis contains data analyzed from a requirements, checks, testdata and the traceability matrix
@@ -62,6 +65,8 @@ class Analysis():
         self.num_successfull_unknown_checks = 0
         self.num_failed_unknown_checks = 0
         self.check_status_by_check_id = {}
+        self.checks_by_id = {}
+        self.testdata_by_id = {}
         self.test_result = 0
         
         # Data from the traceability analysis
@@ -72,6 +77,7 @@ class Analysis():
         self.ids_reqs_covering_reqs = {}
         self.ids_checks_covering_reqs = {}
         self.justif_reqs_untraceable = {}
+        self.reqs_by_id = {}
         self.user_reqs = []
         self.external_interface_reqs = []
         self.functional_reqs = []
@@ -81,6 +87,10 @@ class Analysis():
         self.other_reqs = []
         self.traceability_result = 0
 
+        # Data from the consistency analysis
+        self.reqs_ids = set()
+        self.derived_from_links = []
+
         self.enable_allocation = enable_allocation
 
         self.analyse()
@@ -92,29 +102,265 @@ class Analysis():
         self.analyse_traceability()
         self.analyse_consistency()
 
-    def analyse_tests(self) -> None:
-        """Analyse data from the testdata
+    def update(self, reqs: list[Req], checks: list[Check], testdata: list[Check], matrix: Matrix,
+               enable_allocation: bool = True) -> None:
+        """Updates the analysis with new data, recomputing only what is affected by the changes
+
+        The new data is compared to the previous data using the id indexes. Changed requirements and testdata rows
+        are updated in place while the statuses, results and counters of the requirements affected by the changes
+        are recomputed. The test analysis is performed again if checks or testdata rows were added, removed or moved
+        and a full analysis is performed if the ids of any data are not unique or if requirements or checks were
+        moved. The consistency analysis is always performed again so that all its messages are logged.
+
+        :param reqs: list of requirements from the specification
+        :type reqs: list[Req]
+
+        :param checks: list of checks from the tests
+        :type checks: list[Check]
+
+        :param testdata: list of checks from testdata with results
+        :type testdata: list[Check]
+
+        :param matrix: traceability matrix
+        :type matrix: Matrix
+
+        :param enable_allocation: enables the requirement allocation feature
+        :type enable_allocation: bool
         """
-        # Count the number of successfull tests
-        self.num_successfull_checks = 0
-        self.num_failed_checks = 0
-        self.check_status_by_check_id = {}
-        for check in self.testdata:
-            if check.status:
-                self.num_successfull_checks += 1
+        new_reqs_by_id = {req.id: req for req in reqs}
+        new_checks_by_id = {check.id: check for check in checks}
+        new_testdata_by_id = {check.id: check for check in testdata}
+
+        # Duplicate ids cannot be tracked through the id indexes and moved requirements or checks change the
+        # order of the covering ids
+        if len(new_reqs_by_id) != len(reqs) or len(self.reqs_by_id) != len(self.reqs) or \
+           len(new_checks_by_id) != len(checks) or len(self.checks_by_id) != len(self.checks) or \
+           len(new_testdata_by_id) != len(testdata) or len(self.testdata_by_id) != len(self.testdata) or \
+           enable_allocation != self.enable_allocation or \
+           not same_order(self.reqs, reqs, self.reqs_by_id, new_reqs_by_id) or \
+           not same_order(self.checks, checks, self.checks_by_id, new_checks_by_id):
+            self.reqs = reqs
+            self.checks = checks
+            self.testdata = testdata
+            self.matrix = matrix
+            self.enable_allocation = enable_allocation
+            self.analyse()
+            return
+
+        # Requirements which status, result or contribution to the counters may have changed
+        affected_reqs_ids = set()
+
+        #
+        # Update the test analysis
+        #
+
+        # Checks which are added or removed are traced to different requirements
+        changed_checks_ids = new_checks_by_id.keys() ^ self.checks_by_id.keys()
+        old_checks_by_id = self.checks_by_id
+        old_check_status_by_check_id = self.check_status_by_check_id
+
+        # The testsuites and unknown checks are listed in the order of the testdata
+        if len(changed_checks_ids) > 0 or new_testdata_by_id.keys() != self.testdata_by_id.keys() or \
+           not same_order(self.testdata, testdata, self.testdata_by_id, new_testdata_by_id):
+            self.checks = checks
+            self.testdata = testdata
+            self.analyse_tests()
+            changed_status_ids = [cid for cid in self.check_status_by_check_id.keys() | old_check_status_by_check_id \
+                                    if self.check_status_by_check_id.get(cid) != old_check_status_by_check_id.get(cid)]
+        else:
+            changed_status_ids = []
+            for cid, check in new_testdata_by_id.items():
+                if self.testdata_by_id[cid] != check:
+                    changed_status_ids += [cid]
+                    self.update_testdata(self.testdata_by_id[cid], check)
+            # The new testdata checks replace the previous ones, which are not modified as they may be shared with
+            # the parse cache. The ids are listed in the same order in both lists.
+            self.testdata = testdata
+            self.testdata_by_id = new_testdata_by_id
+            if any(cid not in self.checks_by_id for cid in changed_status_ids):
+                self.unknown_checks = [new_testdata_by_id[check.id] for check in self.unknown_checks]
+            self.compute_test_result()
+
+        # The results of the requirements covered by checks which status changed are computed again
+        for cid in changed_status_ids:
+            if cid in self.checks_by_id:
+                affected_reqs_ids.update(self.matrix.get(cid))
+
+        #
+        # Update the traceability indexes
+        #
+
+        added_or_removed_reqs_ids = new_reqs_by_id.keys() ^ self.reqs_by_id.keys()
+        changed_reqs_ids = added_or_removed_reqs_ids | set(rid for rid, req in new_reqs_by_id.items() \
+                                    if rid in self.reqs_by_id and not same_req(self.reqs_by_id[rid], req))
+        # Requirements which covering lists were appended to and shall be sorted again
+        reordered_reqs_covering_ids = set()
+        for rid in changed_reqs_ids:
+            affected_reqs_ids.add(rid)
+            if rid in self.reqs_by_id:
+                affected_reqs_ids.update(self.remove_derived_from(self.reqs_by_id[rid]))
+            if rid in new_reqs_by_id:
+                derived_from = self.add_derived_from(new_reqs_by_id[rid])
+                affected_reqs_ids.update(derived_from)
+                reordered_reqs_covering_ids.update(derived_from)
+
+        # Traces change when a check is added or removed or when its row of the matrix changes
+        changed_rows_ids = set(cid for cid in matrix.data.keys() | self.matrix.data.keys() \
+                                if matrix.get(cid) != self.matrix.get(cid))
+        reordered_checks_covering_ids = set()
+        for cid in changed_checks_ids | changed_rows_ids:
+            old_rids = self.matrix.get(cid) if cid in old_checks_by_id else []
+            new_rids = matrix.get(cid) if cid in new_checks_by_id else []
+            if old_rids != new_rids:
+                affected_reqs_ids.update(self.remove_check_traces(cid, old_rids))
+                affected_reqs_ids.update(self.add_check_traces(cid, new_rids))
+                reordered_checks_covering_ids.update(new_rids)
+
+        # The covering ids are listed in the order of the specification and of the tests as in a full analysis
+        if len(reordered_reqs_covering_ids) > 0:
+            reqs_positions = {req.id: i for i, req in enumerate(reqs)}
+            for rid in reordered_reqs_covering_ids:
+                self.ids_reqs_covering_reqs[rid].sort(key=reqs_positions.get)
+        if len(reordered_checks_covering_ids) > 0:
+            checks_positions = {check.id: i for i, check in enumerate(checks)}
+            for rid in reordered_checks_covering_ids:
+                self.ids_checks_covering_reqs[rid].sort(key=checks_positions.get)
+
+        # Requirements which are marked or no longer marked untraceable
+        affected_reqs_ids.update(matrix.untraceable.keys() ^ self.matrix.untraceable.keys())
+        self.matrix = matrix
+        self.justif_reqs_untraceable = matrix.untraceable
+
+        #
+        # Update the affected requirements
+        #
+
+        # The contribution of the affected requirements is removed before updating them
+        for rid in affected_reqs_ids:
+            if rid in self.reqs_by_id:
+                self.count_req(self.reqs_by_id[rid], -1)
+        for rid in changed_reqs_ids:
+            if rid not in new_reqs_by_id:
+                del self.reqs_by_id[rid]
+            elif rid in self.reqs_by_id:
+                update_req(self.reqs_by_id[rid], new_reqs_by_id[rid])
             else:
-                self.num_failed_checks += 1
-            self.check_status_by_check_id[check.id] = check.status
+                self.reqs_by_id[rid] = new_reqs_by_id[rid]
+        for rid in affected_reqs_ids:
+            if rid in self.reqs_by_id:
+                req = self.reqs_by_id[rid]
+                self.compute_req_status(req)
+                self.count_req(req, 1)
+                if rid in self.ids_checks_covering_reqs:
+                    self.compute_req_result(req, self.check_status_by_check_id)
+                else:
+                    req.result = 0
 
-        # Fill the check status to all checks
-        for check in self.checks:
-            if check.id in self.check_status_by_check_id:
-                check.status = self.check_status_by_check_id[check.id]
+        # The requirements are only listed again if requirements were added or removed
+        if len(added_or_removed_reqs_ids) > 0:
+            self.reqs = [self.reqs_by_id[req.id] for req in reqs]
+            self.sort_reqs()
+        self.compute_traceability_result()
+
+        self.analyse_consistency()
+
+    def update_testdata(self, check: Check, new_check: Check) -> None:
+        """Replaces a testdata check by a new run of the check in its testcase and updates the test counters
+
+        The previous check is not modified.
+
+        :param check: the testdata check to replace
+        :type check: Check
+
+        :param new_check: the testdata check providing the new result
+        :type new_check: Check
+        """
+        for increment, status in [(-1, check.status), (1, new_check.status)]:
+            if status:
+                self.num_successfull_checks += increment
+            else:
+                self.num_failed_checks += increment
+            if check.id not in self.checks_by_id:
+                if status:
+                    self.num_successfull_unknown_checks += increment
+                else:
+                    self.num_failed_unknown_checks += increment
+
+        testcase = self.testsuites[check.testsuite][check.testcase]
+        testcase[next(i for i, other in enumerate(testcase) if other is check)] = new_check
+
+        self.check_status_by_check_id[check.id] = new_check.status
+        if check.id in self.checks_by_id:
+            self.checks_by_id[check.id].status = new_check.status
+
+    def add_derived_from(self, req: Req) -> list[str]:
+        """Adds a requirement to the requirements covering the requirements it is derived from
+
+        :param req: the derived requirement
+        :type req: Req
+
+        :returns: the ids of the requirements it is derived from
+        :rtype: list[str]
+        """
+        derived_from = req.derived_from if req.derived_from else []
+        for rid in derived_from:
+            self.ids_reqs_covering_reqs.setdefault(rid, []).append(req.id)
+        return derived_from
 
-        # Sort tests in testsuites
+    def remove_derived_from(self, req: Req) -> list[str]:
+        """Removes a requirement from the requirements covering the requirements it is derived from
+
+        :param req: the derived requirement
+        :type req: Req
+
+        :returns: the ids of the requirements it is derived from
+        :rtype: list[str]
+        """
+        derived_from = req.derived_from if req.derived_from else []
+        for rid in derived_from:
+            remove_covering_id(self.ids_reqs_covering_reqs, rid, req.id)
+        return derived_from
+
+    def add_check_traces(self, cid: str, rids: list[str]) -> list[str]:
+        """Adds a check to the checks covering the requirements it is traced to
+
+        :param cid: id of the check
+        :type cid: str
+
+        :param rids: ids of the requirements the check is traced to
+        :type rids: list[str]
+
+        :returns: the ids of the requirements the check is traced to
+        :rtype: list[str]
+        """
+        for rid in rids:
+            self.ids_checks_covering_reqs.setdefault(rid, []).append(cid)
+        return rids
+
+    def remove_check_traces(self, cid: str, rids: list[str]) -> list[str]:
+        """Removes a check from the checks covering the requirements it is traced to
+
+        :param cid: id of the check
+        :type cid: str
+
+        :param rids: ids of the requirements the check is traced to
+        :type rids: list[str]
+
+        :returns: the ids of the requirements the check is traced to
+        :rtype: list[str]
+        """
+        for rid in rids:
+            remove_covering_id(self.ids_checks_covering_reqs, rid, cid)
+        return rids
+
+    def analyse_tests(self) -> None:
+        """Analyse data from the testdata
+        """
+        # The counters are aggregated while sorting tests in testsuites
+        summary = ResultsSummary(self.checks)
         self.testsuites = {}
-        self.num_checks_in_testsuites = {}
         for check in self.testdata:
+            summary.add(check)
             if check.testsuite in self.testsuites:
                 if check.testcase in self.testsuites[check.testsuite]:
                     # add the check if both the testsuite and testcase exist
@@ -122,29 +368,38 @@ class Analysis():
                 else:
                     # create a dictionary if the testsuite exists but the testcase doesn't
                     self.testsuites[check.testsuite][check.testcase] = [check]
-                self.num_checks_in_testsuites[check.testsuite] += 1
             else:
                 # create a dictionary and initialize the table if none of the testsuite and testcase exist
                 self.testsuites[check.testsuite] = {check.testcase: [check]}
-                self.num_checks_in_testsuites[check.testsuite] = 1
+
+        self.num_successfull_checks = summary.num_successfull_checks
+        self.num_failed_checks = summary.num_failed_checks
+        self.num_successfull_unknown_checks = summary.num_successfull_unknown_checks
+        self.num_failed_unknown_checks = summary.num_failed_unknown_checks
+        self.num_checks_in_testsuites = summary.num_checks_in_testsuites
+        self.check_status_by_check_id = summary.check_status_by_check_id
+        self.unknown_checks = summary.unknown_checks
+
+        # Fill the check status to all checks. The status of checks without testdata is cleared as the checks may
+        # be reused from a previous analysis
+        for check in self.checks:
+            check.status = self.check_status_by_check_id.get(check.id)
+
+        # Index the checks by id once so that membership tests are performed in constant time
+        self.testdata_by_id = {check.id: check for check in self.testdata}
+        self.checks_by_id = summary.checks_by_id
 
         # List skipped checks
         self.skipped_checks = []
         for check in self.checks:
-            if check.id not in [c.id for c in self.testdata]:
+            if check.id not in self.testdata_by_id:
                 self.skipped_checks += [check]
 
-        # List unknown checks
-        self.unknown_checks = []
-        for check in self.testdata:
-            if check.id not in [c.id for c in self.checks]:
-                self.unknown_checks += [check]
-                if check.status:
-                    self.num_successfull_unknown_checks += 1
-                else:
-                    self.num_failed_unknown_checks += 1
+        self.compute_test_result()
 
-        # Compute the test result
+    def compute_test_result(self) -> None:
+        """Computes the test result from the number of successfull checks
+        """
         if len(self.checks) > 0:
             self.test_result = int(self.num_successfull_checks / len(self.checks) * 100.0)
         else:
@@ -181,40 +436,78 @@ class Analysis():
         self.num_uncovered_reqs = 0
         self.num_allocated_reqs = 0
         for req in self.reqs:
-            if (req.id in self.ids_reqs_covering_reqs) or (req.id in self.ids_checks_covering_reqs):
-                req.status = ReqStatus.COVERED
-                self.num_covered_reqs += 1
-            elif req.id in self.justif_reqs_untraceable:
-                req.status = ReqStatus.UNTRACEABLE
-                self.num_untraceable_reqs += 1
-            else:
-                req.status = ReqStatus.UNCOVERED
-                self.num_uncovered_reqs += 1
+            self.compute_req_status(req)
+            self.count_req(req, 1)
 
-            if(req.allocation):
-                self.num_allocated_reqs += 1
+        # Index the test results by check id. The index is built here as well as in analyse_tests so that the
+        # traceability analysis can be performed on its own
+        check_status_by_check_id = {check.id: check.status for check in self.testdata}
 
         # Compute the requirement test result
         for req in self.reqs:
             if req.id in self.ids_checks_covering_reqs:
-                # Get the covering check ids
-                covering_checks_ids = self.ids_checks_covering_reqs[req.id]
-                # Filter the testdata to only have covering checks
-                covering_checks = []
-                for check in self.testdata:
-                    if check.id in covering_checks_ids:
-                        covering_checks += [check]
-
-                req.result = 0
-                for check in covering_checks:
-                    if check.status:
-                        req.result += 1
-                # Compute a pourcentage based on the covering_checks_ids as
-                # covering_checks might be smaller than the number of covering checks
-                # eg. if a test was skipped
-                req.result = int(req.result / len(covering_checks_ids) * 100.0)
-
-        # Sort requirements based on type
+                self.compute_req_result(req, check_status_by_check_id)
+
+        self.reqs_by_id = {req.id: req for req in self.reqs}
+        self.sort_reqs()
+        self.compute_traceability_result()
+
+    def compute_req_status(self, req: Req) -> None:
+        """Computes the traceability status of a requirement from the coverage indexes
+
+        :param req: the requirement which status shall be computed
+        :type req: Req
+        """
+        if (req.id in self.ids_reqs_covering_reqs) or (req.id in self.ids_checks_covering_reqs):
+            req.status = ReqStatus.COVERED
+        elif req.id in self.justif_reqs_untraceable:
+            req.status = ReqStatus.UNTRACEABLE
+        else:
+            req.status = ReqStatus.UNCOVERED
+
+    def count_req(self, req: Req, increment: int) -> None:
+        """Adds the contribution of a requirement to the requirement counters
+
+        :param req: the requirement to count
+        :type req: Req
+
+        :param increment: 1 to count the requirement, -1 to remove a previously counted requirement
+        :type increment: int
+        """
+        if req.status == ReqStatus.COVERED:
+            self.num_covered_reqs += increment
+        elif req.status == ReqStatus.UNTRACEABLE:
+            self.num_untraceable_reqs += increment
+        else:
+            self.num_uncovered_reqs += increment
+
+        if(req.allocation):
+            self.num_allocated_reqs += increment
+
+    def compute_req_result(self, req: Req, check_status_by_check_id: dict[str, int]) -> None:
+        """Computes the test result of a requirement covered by checks
+
+        :param req: the requirement which result shall be computed
+        :type req: Req
+
+        :param check_status_by_check_id: test results indexed by check id
+        :type check_status_by_check_id: dict[str, int]
+        """
+        # Get the covering check ids
+        covering_checks_ids = self.ids_checks_covering_reqs[req.id]
+
+        req.result = 0
+        for cid in set(covering_checks_ids):
+            # Checks without testdata were skipped and are not successfull
+            if check_status_by_check_id.get(cid):
+                req.result += 1
+        # Compute a pourcentage based on the covering_checks_ids as
+        # some covering checks might have no testdata, eg. if a test was skipped
+        req.result = int(req.result / len(covering_checks_ids) * 100.0)
+
+    def sort_reqs(self) -> None:
+        """Sorts requirements based on type
+        """
         self.user_reqs = []
         self.external_interface_reqs = []
         self.functional_reqs = []
@@ -239,7 +532,9 @@ class Analysis():
             else:
                 self.other_reqs += [req]
 
-        # Compute traceability result
+    def compute_traceability_result(self) -> None:
+        """Computes the traceability result from the requirement counters
+        """
         if len(self.reqs) > 0:
             coverage_ratio = (self.num_covered_reqs + self.num_untraceable_reqs) / len(self.reqs) * 100
             if self.enable_allocation:
@@ -252,94 +547,267 @@ class Analysis():
 
     def analyse_consistency(self) -> None:
         """Analyse the consistency of the test and traceability data
-        """
-        # List req ids
-        reqs_ids = []
-        for req in self.reqs:
-            reqs_ids += [req.id]
-
-        ###################################################
-        #              Check matrix                       #
-        ###################################################
 
-        # Checks if the matrix is up to date
+        Each consistency rule is a linear pass over the data using hashed indexes. Each rule is recorded as a
+        ``consistency:<rule>`` stage of the profiler.
+        """
+        # Index req ids
+        self.reqs_ids = set(req.id for req in self.reqs)
+        # Index the derivedfrom links once for the rules checking them, the requirements without links being skipped
+        self.derived_from_links = [(req.id, req.derived_from) for req in self.reqs if req.derived_from]
+
+        rules = [
+            # Check matrix
+            ("matrix_up_to_date", self.check_matrix_up_to_date),
+            ("untraceable_reqs_traced", self.check_untraceable_reqs_traced),
+            ("matrix_reqs_exist", self.check_matrix_reqs_exist),
+            ("matrix_duplicate_traces", self.check_matrix_duplicate_traces),
+            ("untraceable_justifications", self.check_untraceable_justifications),
+            # Check reqs
+            ("duplicate_reqs", self.check_duplicate_reqs),
+            ("derived_from_reqs_exist", self.check_derived_from_reqs_exist),
+            ("derived_from_itself", self.check_derived_from_itself),
+            ("derived_from_duplicates", self.check_derived_from_duplicates),
+            # Check checks
+            ("duplicate_checks", self.check_duplicate_checks)
+        ]
+
+        for name, rule in rules:
+            with profiler.stage("consistency:" + name):
+                rule()
+
+    def check_matrix_up_to_date(self) -> None:
+        """Checks if the matrix is up to date
+        """
         if not self.matrix.check(self.checks):
             log_imp("The traceability matrix is not up to date and shall be regenerated")
 
-        # Checks if checks are traced to untraceable requirements
+    def check_untraceable_reqs_traced(self) -> None:
+        """Checks if checks are traced to untraceable requirements
+        """
         for rid in self.justif_reqs_untraceable:
             if rid in self.ids_checks_covering_reqs:
                 log_warn("Requirement \"{}\" is marked untraceable but it is traced to the following tests: {}"\
                             .format(rid, ", ".join([cid for cid in self.ids_checks_covering_reqs[rid]])))
 
-        # Check if requirements used in the matrix exist
+    def check_matrix_reqs_exist(self) -> None:
+        """Checks if requirements used in the matrix exist
+        """
         for cid in self.matrix.data:
             for rid in self.matrix.get(cid):
-                if rid not in reqs_ids:
+                if rid not in self.reqs_ids:
                     log_warn("Missing requirement \"{}\" traced to check \"{}\" in the matrix".format(rid, cid))
         for rid in self.matrix.untraceable:
-            if rid not in reqs_ids:
+            if rid not in self.reqs_ids:
                 log_warn("Missing requirement \"{}\" marked untraceable in the matrix".format(rid))
 
-        # Check if the same requirement is traced multiple times to the same check
-        for cid in self.matrix.data:
-            reqs_ids_seen = set()
-            duplicate_reqs = set([x for x in self.matrix.get(cid) if x in reqs_ids_seen or reqs_ids_seen.add(x)])
+    def check_matrix_duplicate_traces(self) -> None:
+        """Checks if the same requirement is traced multiple times to the same check
 
-            if len(duplicate_reqs) > 0:
-                for rid in duplicate_reqs:
-                    log_warn("Requirement \"{}\" is traced multiple times to the same test \"{}\"".format(rid, cid))
-        # Duplicate untraceable requirements are checks when created the matrix
+        Duplicate untraceable requirements are checked when creating the matrix.
+        """
+        for cid in self.matrix.data:
+            for rid in find_duplicates(self.matrix.get(cid)):
+                log_warn("Requirement \"{}\" is traced multiple times to the same test \"{}\"".format(rid, cid))
 
-        # Check if there is any missing justification for untraceable requirements
+    def check_untraceable_justifications(self) -> None:
+        """Checks if there is any missing justification for untraceable requirements
+        """
         for rid in self.matrix.untraceable:
             if len(self.matrix.untraceable[rid]) == 0:
                 log_warn("Missing justification for untraceable requirement \"{}\"".format(rid))
 
-        ###################################################
-        #              Check reqs                         #
-        ###################################################
-
-        # Checks if there are any duplicate requirement ids
-        reqs_ids_seen = set()
-        duplicate_reqs = set([x for x in reqs_ids if x in reqs_ids_seen or reqs_ids_seen.add(x)])
-        for rid in duplicate_reqs:
+    def check_duplicate_reqs(self) -> None:
+        """Checks if there are any duplicate requirement ids
+        """
+        for rid in find_duplicates([req.id for req in self.reqs]):
             log_error("Multiple requirements share the same id \"{}\"".format(rid))
 
-        # Checks if derivedfrom requirements exist
-        for req in self.reqs:
-            if req.derived_from:
-                for derived_from in req.derived_from:
-                    if derived_from not in reqs_ids:
-                        log_warn("Requirement \"{}\" is derived from missing requirement \"{}\""\
-                                    .format(req.id, derived_from))
+    def check_derived_from_reqs_exist(self) -> None:
+        """Checks if derivedfrom requirements exist
+        """
+        for rid, derived_from_ids in self.derived_from_links:
+            for derived_from in derived_from_ids:
+                if derived_from not in self.reqs_ids:
+                    log_warn("Requirement \"{}\" is derived from missing requirement \"{}\"".format(rid, derived_from))
 
-        # Checks if derivedfrom is different than current
-        for req in self.reqs:
-            if req.derived_from:
-                for derived_from in req.derived_from:
-                    if derived_from == req.id:
-                        log_warn("Requirement \"{}\" is derived from itself".format(req.id))
+    def check_derived_from_itself(self) -> None:
+        """Checks if derivedfrom is different than current
+        """
+        for rid, derived_from_ids in self.derived_from_links:
+            for derived_from in derived_from_ids:
+                if derived_from == rid:
+                    log_warn("Requirement \"{}\" is derived from itself".format(rid))
 
-        # Checks if derivedfrom doesn't have duplicates
-        for req in self.reqs:
-            if req.derived_from:
-                reqs_ids_seen = set()
-                duplicate_reqs = set([x for x in req.derived_from if x in reqs_ids_seen or reqs_ids_seen.add(x)])
-                if len(duplicate_reqs) > 0:
-                    for rid in duplicate_reqs:
-                        log_warn("Requirement \"{}\" is marked multiple times as derivedfrom of \"{}\""
-                                    .format(rid, req.id))
-
-        ###################################################
-        #              Check checks                       #
-        ###################################################
-
-        # Checks if there are any duplicate check ids
-        checks_ids = []
-        for check in self.checks:
-            checks_ids += [check.id]
-        checks_ids_seen = set()
-        duplicate_checks = set([x for x in checks_ids if x in checks_ids_seen or checks_ids_seen.add(x)])
-        for cid in duplicate_checks:
+    def check_derived_from_duplicates(self) -> None:
+        """Checks if derivedfrom doesn't have duplicates
+        """
+        for rid, derived_from_ids in self.derived_from_links:
+            for derived_from in find_duplicates(derived_from_ids):
+                log_warn("Requirement \"{}\" is marked multiple times as derivedfrom of \"{}\""
+                            .format(derived_from, rid))
+
+    def check_duplicate_checks(self) -> None:
+        """Checks if there are any duplicate check ids
+        """
+        for cid in find_duplicates([check.id for check in self.checks]):
             log_error("Multiple tests share the same id \"{}\"".format(cid))
+
+class ResultsSummary():
+    """A ResultsSummary aggregates the test counters of the analysis as testdata checks are added
+
+    Contrary to an Analysis, the testdata checks are not stored, only the status of each check id and the unknown
+    checks are kept, so that testdata can be streamed in bounded memory.
+    """
+
+    def __init__(self, checks: list[Check]):
+        """Constructor of ResultsSummary
+
+        :param checks: list of checks from the tests
+        :type checks: list[Check]
+        """
+        self.checks_by_id = {check.id: check for check in checks}
+        self.num_checks = len(checks)
+
+        self.num_successfull_checks = 0
+        self.num_failed_checks = 0
+        self.num_successfull_unknown_checks = 0
+        self.num_failed_unknown_checks = 0
+        self.num_checks_in_testsuites = {}
+        self.check_status_by_check_id = {}
+        self.unknown_checks = []
+        self.test_result = 0
+
+    def add(self, check: Check) -> None:
+        """Adds a testdata check to the counters
+
+        :param check: a check from the testdata with its result
+        :type check: Check
+        """
+        if check.status:
+            self.num_successfull_checks += 1
+        else:
+            self.num_failed_checks += 1
+        self.check_status_by_check_id[check.id] = check.status
+
+        if check.testsuite in self.num_checks_in_testsuites:
+            self.num_checks_in_testsuites[check.testsuite] += 1
+        else:
+            self.num_checks_in_testsuites[check.testsuite] = 1
+
+        if check.id not in self.checks_by_id:
+            self.unknown_checks += [check]
+            if check.status:
+                self.num_successfull_unknown_checks += 1
+            else:
+                self.num_failed_unknown_checks += 1
+
+    def add_all(self, testdata: Iterable[Check]) -> "ResultsSummary":
+        """Adds testdata checks to the counters and computes the test result
+
+        :param testdata: the checks from the testdata, e.g. an iterator returned by iter_testdata
+        :type testdata: Iterable[Check]
+
+        :returns: this summary
+        :rtype: ResultsSummary
+        """
+        for check in testdata:
+            self.add(check)
+        self.compute_test_result()
+        return self
+
+    def compute_test_result(self) -> None:
+        """Computes the test result from the number of successfull checks
+        """
+        if self.num_checks > 0:
+            self.test_result = int(self.num_successfull_checks / self.num_checks * 100.0)
+        else:
+            self.test_result = 0
+
+def find_duplicates(ids: list[str]) -> list[str]:
+    """Returns the ids appearing multiple times in a list
+
+    :param ids: list of ids
+    :type ids: list[str]
+
+    :returns: the duplicate ids, each listed once in order of first duplication
+    :rtype: list[str]
+    """
+    ids_seen = set()
+    duplicates = {}
+    for x in ids:
+        if x in ids_seen:
+            duplicates[x] = None
+        else:
+            ids_seen.add(x)
+    return list(duplicates)
+
+def same_req(req: Req, other: Req) -> bool:
+    """Compares the data imported from the specification of two requirements
+
+    Contrary to the equality operator of Req, the status and result computed by the analysis are not compared.
+
+    :param req: the first requirement
+    :type req: Req
+
+    :param other: the second requirement
+    :type other: Req
+
+    :returns: a boolean indicating if the imported data of the requirements are equal
+    :rtype: bool
+    """
+    return req.id == other.id and \
+           req.description == other.description and \
+           req.derived_from == other.derived_from and \
+           req.allocation == other.allocation
+
+def same_order(items: list, new_items: list, items_by_id: dict, new_items_by_id: dict) -> bool:
+    """Checks if the items present in both lists are listed in the same order
+
+    :param items: the first list of requirements or checks
+    :type items: list
+
+    :param new_items: the second list of requirements or checks
+    :type new_items: list
+
+    :param items_by_id: the items of the first list indexed by id
+    :type items_by_id: dict
+
+    :param new_items_by_id: the items of the second list indexed by id
+    :type new_items_by_id: dict
+
+    :returns: a boolean indicating if the common items are in the same order
+    :rtype: bool
+    """
+    common_ids = [item.id for item in items if item.id in new_items_by_id]
+    new_common_ids = [item.id for item in new_items if item.id in items_by_id]
+    return common_ids == new_common_ids
+
+def update_req(req: Req, new_req: Req) -> None:
+    """Updates the data imported from the specification of a requirement
+
+    :param req: the requirement to update
+    :type req: Req
+
+    :param new_req: the requirement providing the new data
+    :type new_req: Req
+    """
+    req.description = new_req.description
+    req.derived_from = new_req.derived_from
+    req.allocation = new_req.allocation
+
+def remove_covering_id(ids_covering: dict[str, list[str]], rid: str, covering_id: str) -> None:
+    """Removes an id from the ids covering a requirement, removing the requirement if it is no longer covered
+
+    :param ids_covering: ids covering each requirement
+    :type ids_covering: dict[str, list[str]]
+
+    :param rid: id of the covered requirement
+    :type rid: str
+
+    :param covering_id: id to remove
+    :type covering_id: str
+    """
+    ids_covering[rid].remove(covering_id)
+    if len(ids_covering[rid]) == 0:
+        del ids_covering[rid]
@@ -0,0 +1,24 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+#
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+#
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+from ecap5_treq.benchmark.run import main
+
+main()
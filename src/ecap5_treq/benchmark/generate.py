@@ -0,0 +1,199 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+#
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+#
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import random
+
+from ecap5_treq.config import Config, SpecFormat
+
+# Number of requirements of each specification source file
+REQS_PER_FILE = 100
+# Number of checks of each testcase and of each testsuite, a test source file containing a testsuite
+CHECKS_PER_TESTCASE = 10
+CHECKS_PER_TESTSUITE = 100
+# Number of testdata files the testdata is split into
+NUM_TESTDATA_SHARDS = 4
+# Ratio of failed checks in the testdata
+FAILURE_RATE = 0.1
+# Every UNTRACEABLE_PERIOD user requirement is marked untraceable in the matrix
+UNTRACEABLE_PERIOD = 50
+# Allocations given to the functional requirements
+ALLOCATIONS = ["core", "memory", "bus"]
+
+def generate(path: str, num_reqs: int, spec_format: SpecFormat = SpecFormat.TEX, seed: int = 0) -> Config:
+    """Generates a synthetic specification, tests, testdata and matrix
+
+    The data is fully determined by its size and seed. One requirement out of four is a user requirement, the other
+    ones being functional requirements derived from the previous user requirement, allocated and verified by a check.
+    The checks are traced to their requirement and sometimes to a second one, the testdata being split into shards
+    where some checks failed. The generated data is consistent so that its analysis does not log any message.
+
+    :param path: path to the directory where the data is generated, created if missing
+    :type path: str
+
+    :param num_reqs: number of requirements to generate
+    :type num_reqs: int
+
+    :param spec_format: language format of the specification
+    :type spec_format: SpecFormat, optional
+
+    :param seed: seed of the pseudo-random choices
+    :type seed: int, optional
+
+    :returns: a configuration providing the paths to the generated data
+    :rtype: Config
+    """
+    rand = random.Random(seed)
+
+    config = Config()
+    config.set("spec_format", spec_format)
+    config.set("spec_dir_path", os.path.join(path, "spec"))
+    config.set("test_dir_path", os.path.join(path, "tests"))
+    config.set("testdata_dir_path", os.path.join(path, "testdata"))
+    config.set("matrix_path", os.path.join(path, "matrix.csv"))
+    for key in ["spec_dir_path", "test_dir_path", "testdata_dir_path"]:
+        os.makedirs(config.get(key), exist_ok=True)
+
+    # Generate the requirements, the functional requirements being verified by checks
+    reqs = []
+    for i in range(num_reqs):
+        if i % 4 == 0:
+            reqs += [("U_req{}".format(i), None, None)]
+        else:
+            reqs += [("F_req{}".format(i), reqs[i - i % 4][0], ALLOCATIONS[i % len(ALLOCATIONS)])]
+    check_rids = [rid for rid, derived_from, _ in reqs if derived_from is not None]
+    check_ids = ["testsuite{}.testcase{}.check{}" \
+                    .format(i // CHECKS_PER_TESTSUITE, i // CHECKS_PER_TESTCASE, i) for i in range(len(check_rids))]
+
+    write_spec(config.get("spec_dir_path"), reqs, spec_format)
+    write_tests(config.get("test_dir_path"), check_ids)
+    write_testdata(config.get("testdata_dir_path"), check_ids, rand)
+    write_matrix(config.get("matrix_path"), reqs, check_ids, check_rids, rand)
+    return config
+
+def write_spec(path: str, reqs: list[tuple[str, str, str]], spec_format: SpecFormat) -> None:
+    """Writes the specification source files
+
+    :param path: path to the specification directory
+    :type path: str
+
+    :param reqs: id, derived from requirement id and allocation of each requirement
+    :type reqs: list[tuple[str, str, str]]
+
+    :param spec_format: language format of the specification
+    :type spec_format: SpecFormat
+    """
+    extension = "rst" if spec_format == SpecFormat.RST else "tex"
+    for start in range(0, len(reqs), REQS_PER_FILE):
+        lines = []
+        for rid, derived_from, allocation in reqs[start:start + REQS_PER_FILE]:
+            description = "The {} shall be synthesized for benchmarking purposes.".format(rid)
+            if spec_format == SpecFormat.RST:
+                lines += [".. requirement:: {}".format(rid)]
+                if derived_from is not None:
+                    lines += ["    :derivedfrom: {}".format(derived_from), "    :allocation: {}".format(allocation)]
+                lines += ["", "    " + description, ""]
+            else:
+                options = ""
+                if derived_from is not None:
+                    options = "[derivedfrom={}, allocation={{{}}}]".format(derived_from.replace("_", "\\_"), allocation)
+                lines += ["\\req{{{}}}{{{}}}{}".format(rid.replace("_", "\\_"), description, options), ""]
+        with open(os.path.join(path, "spec{}.{}".format(start // REQS_PER_FILE, extension)), "w", \
+                  encoding="utf-8") as file:
+            file.write("\n".join(lines))
+
+def write_tests(path: str, check_ids: list[str]) -> None:
+    """Writes the test source files, one file per testsuite and one function per testcase
+
+    :param path: path to the test directory
+    :type path: str
+
+    :param check_ids: ids of the checks
+    :type check_ids: list[str]
+    """
+    for start in range(0, len(check_ids), CHECKS_PER_TESTSUITE):
+        lines = ["#include \"testbench.h\"", ""]
+        for i in range(start, min(start + CHECKS_PER_TESTSUITE, len(check_ids))):
+            if i % CHECKS_PER_TESTCASE == 0:
+                lines += ["void testcase{}(Testbench &tb) {{".format(i // CHECKS_PER_TESTCASE)]
+            lines += ["    tb.step();",
+                      "    // Compare the outputs with the model",
+                      "    CHECK(\"{}\", tb.output() == tb.expected(), \"Wrong output\");".format(check_ids[i])]
+            if i % CHECKS_PER_TESTCASE == CHECKS_PER_TESTCASE - 1 or i == len(check_ids) - 1:
+                lines += ["}", ""]
+        with open(os.path.join(path, "testsuite{}.cpp".format(start // CHECKS_PER_TESTSUITE)), "w", \
+                  encoding="utf-8") as file:
+            file.write("\n".join(lines))
+
+def write_testdata(path: str, check_ids: list[str], rand: random.Random) -> None:
+    """Writes the testdata shards, each check being run once
+
+    :param path: path to the testdata directory
+    :type path: str
+
+    :param check_ids: ids of the checks
+    :type check_ids: list[str]
+
+    :param rand: pseudo-random generator
+    :type rand: random.Random
+    """
+    shards = [[] for _ in range(NUM_TESTDATA_SHARDS)]
+    for i, cid in enumerate(check_ids):
+        if rand.random() < FAILURE_RATE:
+            shards[i % NUM_TESTDATA_SHARDS] += ["{};0;Wrong output at cycle {}".format(cid, rand.randint(0, 1000))]
+        else:
+            shards[i % NUM_TESTDATA_SHARDS] += ["{};1".format(cid)]
+    for i, rows in enumerate(shards):
+        with open(os.path.join(path, "shard{}.csv".format(i)), "w", encoding="utf-8") as file:
+            file.write("\n".join(rows) + "\n")
+
+def write_matrix(path: str, reqs: list[tuple[str, str, str]], check_ids: list[str], check_rids: list[str], \
+                 rand: random.Random) -> None:
+    """Writes the traceability matrix
+
+    :param path: path to the matrix file
+    :type path: str
+
+    :param reqs: id, derived from requirement id and allocation of each requirement
+    :type reqs: list[tuple[str, str, str]]
+
+    :param check_ids: ids of the checks
+    :type check_ids: list[str]
+
+    :param check_rids: id of the requirement verified by each check
+    :type check_rids: list[str]
+
+    :param rand: pseudo-random generator
+    :type rand: random.Random
+    """
+    rows = []
+    for cid, rid in zip(check_ids, check_rids):
+        # Some checks also cover another requirement
+        other_rid = rand.choice(check_rids)
+        if rand.random() < 0.2 and other_rid != rid:
+            rows += ["{};{};{}".format(cid, rid, other_rid)]
+        else:
+            rows += ["{};{}".format(cid, rid)]
+    user_rids = [rid for rid, derived_from, _ in reqs if derived_from is None]
+    for rid in user_rids[::UNTRACEABLE_PERIOD]:
+        rows += ["__UNTRACEABLE__;{};Verified by review".format(rid)]
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("\n".join(rows) + "\n")
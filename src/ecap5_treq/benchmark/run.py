@@ -0,0 +1,250 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+#
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+#
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+from ecap5_treq.analysis import Analysis
+from ecap5_treq.benchmark.generate import generate
+from ecap5_treq.check import import_checks, import_testdata
+from ecap5_treq.config import Config, SpecFormat
+from ecap5_treq.log import log_clear
+from ecap5_treq.main import load_analysis
+from ecap5_treq.matrix import Matrix
+from ecap5_treq.report import generate_report
+from ecap5_treq.req import import_reqs
+
+# Stages of a run, in order
+STAGES = ["import_reqs", "import_checks", "import_testdata", "read_matrix", "analysis", "generate_report", \
+          "generate_html_report", "cached_full_analysis", "cached_incremental_analysis"]
+# Default numbers of requirements of the generated data
+DEFAULT_SCALES = [1000, 10000, 100000]
+# Default ratio by which a stage shall be slower than its baseline to be reported as a regression
+DEFAULT_TOLERANCE = 0.25
+# Stages which duration increased by less than MIN_REGRESSION seconds are not reported to ignore the noise
+MIN_REGRESSION = 0.05
+
+def run_stages(config: Config) -> dict[str, float]:
+    """Runs each stage from the import of the data to the html report once, without cache
+
+    :param config: a configuration providing the paths to the data
+    :type config: Config
+
+    :returns: the duration in seconds of each stage
+    :rtype: dict[str, float]
+    """
+    timings = {}
+    def timed(stage, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        timings[stage] = time.perf_counter() - start
+        return result
+
+    reqs = timed("import_reqs", import_reqs, config.get("spec_dir_path"), config.get("spec_format"))
+    checks = timed("import_checks", import_checks, config.get("test_dir_path"))
+    testdata = timed("import_testdata", import_testdata, config.get("testdata_dir_path"))
+    matrix = timed("read_matrix", Matrix, config.get("matrix_path"))
+    analysis = timed("analysis", Analysis, reqs, checks, testdata, matrix)
+    timed("generate_report", generate_report, analysis)
+    timed("generate_html_report", generate_report, analysis, True)
+
+    timings.update(run_cached_analyses(config))
+
+    log_clear()
+    return timings
+
+def run_cached_analyses(config: Config) -> dict[str, float]:
+    """Times a full and an incremental analysis after a testdata row changed, with a warm parse cache
+
+    Both analyses import the data from the parse cache, the incremental analysis also loading, updating and saving
+    the analysis of the previous run, so that the stages show when the incremental analysis is faster.
+
+    :param config: a configuration providing the paths to the data
+    :type config: Config
+
+    :returns: the duration in seconds of the full and incremental analyses
+    :rtype: dict[str, float]
+    """
+    with tempfile.TemporaryDirectory() as cache_path:
+        full_config = Config()
+        full_config.data = dict(config.data)
+        full_config.set("cache_dir_path", cache_path)
+        incremental_config = Config()
+        incremental_config.data = dict(full_config.data)
+        incremental_config.set("incremental", True)
+
+        # The first run fills the parse cache and stores the analysis
+        load_analysis(incremental_config)
+
+        # The status of the first row of a testdata shard is inverted, the file being restored afterwards
+        shard = os.path.join(config.get("testdata_dir_path"), sorted(os.listdir(config.get("testdata_dir_path")))[0])
+        with open(shard, encoding="utf-8") as file:
+            content = file.read()
+        first_row, rest = content.split("\n", 1)
+        fields = first_row.split(";")
+        changed_row = "{};0;Benchmark failure".format(fields[0]) if fields[1] == "1" else "{};1".format(fields[0])
+        try:
+            with open(shard, "w", encoding="utf-8") as file:
+                file.write(changed_row + "\n" + rest)
+
+            timings = {}
+            start = time.perf_counter()
+            load_analysis(incremental_config)
+            timings["cached_incremental_analysis"] = time.perf_counter() - start
+            start = time.perf_counter()
+            load_analysis(full_config)
+            timings["cached_full_analysis"] = time.perf_counter() - start
+        finally:
+            with open(shard, "w", encoding="utf-8") as file:
+                file.write(content)
+    return {stage: timings[stage] for stage in ["cached_full_analysis", "cached_incremental_analysis"]}
+
+def run(scales: list[int], path: str, spec_format: SpecFormat = SpecFormat.TEX, repeat: int = 1, \
+        seed: int = 0) -> dict[str, dict[str, float]]:
+    """Generates data at each scale and times the stages on it
+
+    :param scales: numbers of requirements of the generated data
+    :type scales: list[int]
+
+    :param path: path to the directory where the data is generated, one subdirectory per scale
+    :type path: str
+
+    :param spec_format: language format of the specification
+    :type spec_format: SpecFormat, optional
+
+    :param repeat: number of runs at each scale, the fastest duration of each stage being kept
+    :type repeat: int, optional
+
+    :param seed: seed of the generated data
+    :type seed: int, optional
+
+    :returns: the duration in seconds of each stage indexed by scale
+    :rtype: dict[str, dict[str, float]]
+    """
+    results = {}
+    for scale in scales:
+        config = generate(os.path.join(path, str(scale)), scale, spec_format, seed)
+        timings = {}
+        for _ in range(repeat):
+            for stage, duration in run_stages(config).items():
+                timings[stage] = min(duration, timings.get(stage, duration))
+        # Scales are stored as strings to match the baseline read from JSON
+        results[str(scale)] = timings
+    return results
+
+def compare(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], \
+            tolerance: float = DEFAULT_TOLERANCE) -> list[tuple[str, str, float, float]]:
+    """Compares the durations of the stages to a baseline
+
+    :param results: the duration of each stage indexed by scale
+    :type results: dict[str, dict[str, float]]
+
+    :param baseline: the baseline durations, scales and stages missing from the baseline being ignored
+    :type baseline: dict[str, dict[str, float]]
+
+    :param tolerance: ratio by which a stage shall be slower than its baseline to be reported
+    :type tolerance: float, optional
+
+    :returns: the scale, stage, baseline duration and duration of each regression
+    :rtype: list[tuple[str, str, float, float]]
+    """
+    regressions = []
+    for scale, timings in results.items():
+        for stage, duration in timings.items():
+            reference = baseline.get(scale, {}).get(stage)
+            if reference is not None and duration > reference * (1 + tolerance) and \
+               duration - reference >= MIN_REGRESSION:
+                regressions += [(scale, stage, reference, duration)]
+    return regressions
+
+def format_results(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]] = None) -> str:
+    """Formats the durations of the stages as a table
+
+    :param results: the duration of each stage indexed by scale
+    :type results: dict[str, dict[str, float]]
+
+    :param baseline: the baseline durations, added to the table with the ratio to the baseline if provided
+    :type baseline: dict[str, dict[str, float]], optional
+
+    :returns: the table of the durations
+    :rtype: str
+    """
+    lines = ["{:>8}  {:<30}{:>10}".format("scale", "stage", "time (s)") + \
+             ("{:>14}{:>8}".format("baseline (s)", "ratio") if baseline is not None else "")]
+    for scale, timings in results.items():
+        for stage, duration in timings.items():
+            line = "{:>8}  {:<30}{:>10.3f}".format(scale, stage, duration)
+            reference = baseline.get(scale, {}).get(stage) if baseline is not None else None
+            if reference is not None:
+                line += "{:>14.3f}{:>8.2f}".format(reference, duration / reference if reference > 0 else 0)
+            lines += [line]
+        lines += ["{:>8}  {:<30}{:>10.3f}".format(scale, "total", sum(timings.values()))]
+    return "\n".join(lines)
+
+def main(argv: list[str] = None) -> None:
+    """Entry point of the benchmark
+
+    The command exits with a non-zero code if a stage is slower than its baseline.
+
+    :param argv: command line arguments, the arguments of the process being used if not provided
+    :type argv: list[str], optional
+    """
+    parser = argparse.ArgumentParser(
+            prog="python -m ecap5_treq.benchmark",
+            description="Times the stages of ECAP5-TREQ on generated data")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, \
+                        help="numbers of requirements of the generated data")
+    parser.add_argument("--spec-format", default=SpecFormat.TEX, help="language format of the specification")
+    parser.add_argument("--repeat", type=int, default=1, help="number of runs at each scale")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated data")
+    parser.add_argument("--dir", help="directory where the data is generated, a temporary directory by default")
+    parser.add_argument("--baseline", help="path to the JSON baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="writes the results to the baseline file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, \
+                        help="ratio by which a stage shall be slower than its baseline to fail")
+    args = parser.parse_args(argv)
+
+    if args.dir:
+        results = run(args.scales, args.dir, args.spec_format, args.repeat, args.seed)
+    else:
+        with tempfile.TemporaryDirectory() as path:
+            results = run(args.scales, path, args.spec_format, args.repeat, args.seed)
+
+    baseline = None
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    elif args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    print(format_results(results, baseline))
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for scale, stage, reference, duration in regressions:
+            print("Regression of {} at scale {}: {:.3f}s instead of {:.3f}s".format(stage, scale, duration, reference))
+        if len(regressions) > 0:
+            sys.exit(1)
@@ -0,0 +1,284 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+# 
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+# 
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import pickle
+import hashlib
+from typing import Callable
+
+from ecap5_treq.log import log_warn
+from ecap5_treq.profiling import profiler
+
+# Version of the cache format. Cache files written with another version are discarded.
+CACHE_VERSION = 3
+
+class Cache:
+    """A Cache stores the records parsed from source files so that unchanged files are not parsed again
+
+    Records are stored per kind of source file (e.g. tex specification or test sources) and are keyed by
+    the path of the source file. An entry is valid as long as the modification time and size of the file are
+    unchanged, or, when hashing is enabled, as long as the content of the file is unchanged. A Cache without
+    directory only keeps its entries in memory.
+    """
+
+    def __init__(self, path: str, use_hash: bool = False):
+        """Constructor of Cache
+
+        :param path: path to the cache directory or None to keep the entries in memory
+        :type path: str
+
+        :param use_hash: enables the validation of entries using a hash of the content of source files
+        :type use_hash: bool
+        """
+        self.path = path
+        self.use_hash = use_hash
+
+        # Entries of each kind loaded from the cache directory
+        self.tables = {}
+        # Paths of the source files accessed during this run for each kind
+        self.seen = {}
+        # Kinds which entries have been modified since they were loaded
+        self.dirty = set()
+
+    def get(self, kind: str, file: str) -> list:
+        """Returns the records cached for a source file if the cached entry is still valid
+
+        The warnings logged when the file was parsed are logged again so that cached and parsed files
+        produce the same messages.
+
+        :param kind: kind of the source file
+        :type kind: str
+
+        :param file: path to the source file
+        :type file: str
+
+        :returns: the cached records or None if there is no valid entry for the file
+        :rtype: list
+        """
+        entry = self.lookup(kind, file)
+        if entry is None:
+            profiler.count("cache_misses")
+            return None
+
+        profiler.count("cache_hits")
+        for msg in entry["warnings"]:
+            log_warn(msg)
+        return entry["records"]
+
+    def lookup(self, kind: str, file: str) -> dict:
+        """Returns the cached entry of a source file if it is still valid
+
+        Contrary to get(), the warnings stored in the entry are not logged.
+
+        :param kind: kind of the source file
+        :type kind: str
+
+        :param file: path to the source file
+        :type file: str
+
+        :returns: the cached entry or None if there is no valid entry for the file
+        :rtype: dict
+        """
+        table = self.load(kind)
+        self.seen[kind].add(file)
+
+        if file not in table:
+            return None
+        entry = table[file]
+
+        stat = os.stat(file)
+        if entry["mtime"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            # The file may have been touched without being modified
+            if not self.use_hash or entry["hash"] != hash_file(file):
+                return None
+            entry["mtime"] = stat.st_mtime_ns
+            entry["size"] = stat.st_size
+            self.dirty.add(kind)
+        return entry
+
+    def set(self, kind: str, file: str, records: list, warnings: list[str]) -> None:
+        """Stores the records parsed from a source file
+
+        :param kind: kind of the source file
+        :type kind: str
+
+        :param file: path to the source file
+        :type file: str
+
+        :param records: records parsed from the source file
+        :type records: list
+
+        :param warnings: warnings logged while parsing the source file
+        :type warnings: list[str]
+        """
+        table = self.load(kind)
+        self.seen[kind].add(file)
+
+        stat = os.stat(file)
+        table[file] = {
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "hash": hash_file(file) if self.use_hash else None,
+            "records": records,
+            "warnings": warnings
+        }
+        self.dirty.add(kind)
+
+    def load(self, kind: str) -> dict:
+        """Returns the entries of a kind, loading them from the cache directory if required
+
+        :param kind: kind of the source files
+        :type kind: str
+
+        :returns: a dictionary of entries indexed by source file path
+        :rtype: dict
+        """
+        if kind not in self.tables:
+            self.tables[kind] = {}
+            self.seen[kind] = set()
+            if self.path is None:
+                return self.tables[kind]
+            try:
+                with open(self.table_path(kind), "rb") as file:
+                    content = pickle.load(file)
+                if content["version"] == CACHE_VERSION:
+                    self.tables[kind] = content["entries"]
+            except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError, AttributeError):
+                # A missing or unreadable cache is rebuilt from the source files
+                pass
+        return self.tables[kind]
+
+    def save(self) -> None:
+        """Writes the modified entries to the cache directory
+
+        Entries of source files that were not accessed during this run are discarded.
+        """
+        for kind, table in self.tables.items():
+            stale = [file for file in table if file not in self.seen[kind]]
+            for file in stale:
+                del table[file]
+            if len(stale) > 0:
+                self.dirty.add(kind)
+
+            if kind in self.dirty and self.path is not None:
+                os.makedirs(self.path, exist_ok=True)
+                with open(self.table_path(kind), "wb") as file:
+                    pickle.dump({"version": CACHE_VERSION, "entries": table}, file, pickle.HIGHEST_PROTOCOL)
+        self.dirty = set()
+
+    def get_state(self, name: str) -> object:
+        """Returns a state stored by a previous run
+
+        :param name: name of the state
+        :type name: str
+
+        :returns: the stored state or None if there is no readable state
+        :rtype: object
+        """
+        try:
+            with open(self.state_path(name), "rb") as file:
+                content = pickle.load(file)
+            if content["version"] == CACHE_VERSION:
+                return content["state"]
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError, AttributeError):
+            # A missing or unreadable state is computed again
+            pass
+        return None
+
+    def set_state(self, name: str, state: object) -> None:
+        """Stores a state for the next runs
+
+        :param name: name of the state
+        :type name: str
+
+        :param state: the state to store
+        :type state: object
+        """
+        os.makedirs(self.path, exist_ok=True)
+        with open(self.state_path(name), "wb") as file:
+            pickle.dump({"version": CACHE_VERSION, "state": state}, file, pickle.HIGHEST_PROTOCOL)
+
+    def table_path(self, kind: str) -> str:
+        """Returns the path to the file storing the entries of a kind
+
+        :param kind: kind of the source files
+        :type kind: str
+
+        :returns: the path to the cache file
+        :rtype: str
+        """
+        return os.path.join(self.path, "{}.pickle".format(kind))
+
+    def state_path(self, name: str) -> str:
+        """Returns the path to the file storing a state
+
+        :param name: name of the state
+        :type name: str
+
+        :returns: the path to the state file
+        :rtype: str
+        """
+        return os.path.join(self.path, "{}.state.pickle".format(name))
+
+def cached_parse(cache: Cache, kind: str, file: str, parse: Callable[[str], list]) -> list:
+    """Parses a source file using the cached records if available
+
+    :param cache: the cache to use or None to always parse the file
+    :type cache: Cache
+
+    :param kind: kind of the source file
+    :type kind: str
+
+    :param file: path to the source file
+    :type file: str
+
+    :param parse: function parsing the source file
+    :type parse: Callable[[str], list]
+
+    :returns: the records parsed from the source file
+    :rtype: list
+    """
+    if cache is None:
+        profiler.count_file(file)
+        return parse(file)
+
+    records = cache.get(kind, file)
+    if records is None:
+        profiler.count_file(file)
+        num_warnings = len(log_warn.msgs)
+        records = parse(file)
+        cache.set(kind, file, records, log_warn.msgs[num_warnings:])
+    return records
+
+def hash_file(file: str) -> str:
+    """Computes a hash of the content of a file
+
+    :param file: path to the file
+    :type file: str
+
+    :returns: the hexadecimal digest of the content of the file
+    :rtype: str
+    """
+    digest = hashlib.sha256()
+    with open(file, "rb") as content:
+        for chunk in iter(lambda: content.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
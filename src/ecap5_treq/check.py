@@ -25,13 +25,37 @@ import re
 import sys
 import csv
 import glob
+from typing import Iterator
 
 from ecap5_treq.log import log_error
+from ecap5_treq.cache import Cache, cached_parse
+from ecap5_treq.parallel import parse_files
+from ecap5_treq.profiling import profiler
+from ecap5_treq.source import open_source, source_location
+
+# Tokens of the test source files scanned for checks. Comments as well as string and char literals are matched so
+# that the checks they contain are skipped, the check group being only defined when a check is matched. Each
+# alternative starts with a literal char so that the regex engine can skip the chars which cannot start a token and
+# repetitions are unrolled to avoid backtracking.
+CHECK_PATTERN = re.compile(rb"""
+      //[^\n]*                                          # Line comment
+    | /\*[^*]*(?:\*+[^*/][^*]*)*(?:\*+/|\**\Z)          # Block comment
+    | "[^"\\\n]*(?:\\.[^"\\\n]*)*"                      # String literal
+    | '[^'\\\n]*(?:\\.[^'\\\n]*)*'                      # Char literal
+    | CHECK\s*\((?:\s*"(?P<id>[^"\n]*)")?(?P<check>)    # Check followed by its id
+""", re.VERBOSE)
 
 class Check:
     """A Check is a test that can be traced to requirements
+
+    Checks are compact records which identifiers are interned so that the identifiers shared by many checks, and by
+    the checks and their testdata, are only stored once. Checks are hashed by id.
+
+    Testdata checks also count the runs from which their status is merged, a single run by default.
     """
 
+    __slots__ = ("testsuite", "testcase", "shortid", "id", "status", "error_msg", "runs")
+
     def __init__(self, testsuite: str, testcase: str, shortid: str, status: int = None, error_msg: str = None):
         """Constructor of Check
 
@@ -47,17 +71,19 @@ class Check:
         :param error_msg: message associated to a failed check
         :type error_msg: str, optional
         """
-        self.testsuite = testsuite
-        self.testcase = testcase
+        self.testsuite = sys.intern(testsuite)
+        self.testcase = sys.intern(testcase)
         self.shortid = shortid
 
-        self.id = testsuite + "." + testcase + "." + shortid
+        self.id = sys.intern(testsuite + "." + testcase + "." + shortid)
 
         self.status = None
         self.error_msg = None
+        self.runs = None
         if status is not None:
             self.status = (status == 1)
             self.error_msg = error_msg
+            self.runs = 1
     
     def to_str(self) -> str:
         """Convert the check to a string
@@ -68,6 +94,8 @@ class Check:
         status_and_error_msg = ""
         if self.status is not None:
             status_and_error_msg = ", status={}, error_msg={}".format(self.status, self.error_msg)
+            if self.runs > 1:
+                status_and_error_msg += ", runs={}".format(self.runs)
 
         return "CHECK(testsuite=\"{}\", testcase=\"{}\", shortid=\"{}\"{})" \
                     .format(self.testsuite, self.testcase, self.id, status_and_error_msg)
@@ -98,69 +126,268 @@ class Check:
                 self.testsuite == other.testsuite and \
                 self.id == other.id and \
                 self.status == other.status and \
-                self.error_msg == other.error_msg)
+                self.error_msg == other.error_msg and \
+                self.runs == other.runs)
+
+    def __hash__(self) -> int:
+        """Override of the __hash__ function used to store checks in sets and as dictionary keys
+
+        The hash only depends on the id which is not modified by the analysis.
+
+        :returns: the hash of the check
+        :rtype: int
+        """
+        return hash(self.id)
 
 
-def import_checks(path) -> list[Check]:
+def import_checks(path: str, cache: Cache = None, jobs: int = 1) -> list[Check]:
     """Imports checks from test source files
 
     :param path: path to the root of the test source files
     :type path: str
 
+    :param cache: cache of previously parsed source files
+    :type cache: Cache, optional
+
+    :param jobs: number of processes used to parse the source files
+    :type jobs: int, optional
+
     :returns: a list of checks from the test source files
     :rtype: list[Check]
     """
-    checks = []
     # Get the list of test source files
     files = glob.glob(path + "/**/*.cpp", recursive=True)
-    for file in files:
-        # Get the content of the test source file
-        content = "".join(l[:-1] for l in open(file, encoding="utf-8"))
+    checks = parse_files(cache, "checks", files, import_checks_from_file, jobs)
+    if cache:
+        cache.save()
+    return checks 
+
+def import_checks_from_file(file: str) -> list[Check]:
+    """Imports checks from a test source file
+
+    Checks within comments or string literals are ignored. The content of the file is scanned as bytes, large files
+    being mapped in memory.
+
+    :param file: path to the test source file
+    :type file: str
+
+    :returns: a list of checks from the test source file
+    :rtype: list[Check]
+    """
+    checks = []
+    # Get the raw content of the test source file, only the ids of the checks being decoded
+    with open_source(file) as content:
         # Find checks in the file
-        for i in [m.start() for m in re.finditer(r"CHECK\([^\)]*\)", content)]:
+        if content.find(b"CHECK") < 0:
+            return checks
+        for match in CHECK_PATTERN.finditer(content):
+            # Comments and literals are matched only to be skipped
+            if match.lastgroup != "check":
+                continue
+            # The keyword shall not be the end of another identifier, the preceding byte being empty at offset 0
+            preceding = content[match.start() - 1:match.start()]
+            if preceding.isalnum() or preceding == b"_":
+                continue
+
             # The format of the check is
             #
             #     CHECK("<id>"...
-            #           1    2
-            cur = process_keyword(i, content)      # Go to 1
-            cur, id = process_string(cur, content) # Go from 1 to 2
-
-            testsuite, testcase, shortid = process_check_id(id)
+            id = match.group("id")
+            if id is None:
+                line_end = content.find(b"\n", match.start())
+                log_error("Syntax error while processing check at {}: expected a string literal id in \"{}\"" \
+                            .format(source_location(match.start(), content, file), \
+                                    content[match.start():line_end if line_end >= 0 else len(content)] \
+                                        .decode("utf-8", errors="replace")))
+                # The program is interrupted here as this is a critical error
+                sys.exit(-1)
+
+            testsuite, testcase, shortid = process_check_id(id.decode("utf-8"))
 
             checks += [Check(testsuite, testcase, shortid)]
-    return checks 
+    return checks
+
+def iter_testdata(path: str) -> Iterator[Check]:
+    """Iterates over the checks from the testdata files without storing them
+
+    Contrary to import_testdata, the testdata files are read row by row as the checks are consumed so that large
+    testdata can be processed in bounded memory. The cache is not used.
+
+    :param path: path to the root of the testdata files
+    :type path: str
+
+    :returns: an iterator over the checks from the testdata files where the status is completed
+    :rtype: Iterator[Check]
+    """
+    files = list_testdata_files(path)
+    profiler.count("files_scanned", len(files))
+    for file in files:
+        profiler.count_file(file)
+        yield from iter_testdata_from_file(file)
+
+def list_testdata_files(path: str) -> list[str]:
+    """Lists the testdata files, either CSV files or JUnit XML files
+
+    The files are sorted by path so that the order of the runs of a check spread over several files is reproducible.
+
+    :param path: path to the root of the testdata files
+    :type path: str
+
+    :returns: the paths to the testdata files
+    :rtype: list[str]
+    """
+    return sorted(glob.glob(path + "/*.csv") + glob.glob(path + "/*.xml"))
 
-def import_testdata(path: str) -> list[Check]:
+def import_testdata(path: str, cache: Cache = None) -> list[Check]:
     """Imports checks from the testdata files
 
     :param path: path to the root of the testdata files
     :type path: str
 
+    :param cache: cache of previously parsed source files
+    :type cache: Cache, optional
+
     :returns: a list of checks from the testdata files where the status is completed
     :rtype: list[Check]
     """
     checks = []
     # Get the list of testdata files
-    files = glob.glob(path + "/*.csv")
+    files = list_testdata_files(path)
+    profiler.count("files_scanned", len(files))
     for file in files:
-        with open(file, newline='', encoding="utf-8") as csvfile:
-            reader = csv.reader(csvfile, delimiter=';', quotechar='|')
-            for row in reader:
-                # Skip empty lines or lines with only spaces
-                if len(row) == 0 or (len(row) == 1 and len(row[0].strip()) == 0):
-                    continue
+        checks += cached_parse(cache, "testdata", file, import_testdata_from_file)
+    if cache:
+        cache.save()
+    return checks
 
-                # The data is incomplete if no status is provided
-                if len(row) < 2 or len(row[1].strip()) == 0:
-                    log_error("Incomplete test data in {} for row \"{}\"".format(file, row))
-                    # The program is interrupted here as this is a critical error
-                    sys.exit(-1)
+def import_testdata_from_file(file: str) -> list[Check]:
+    """Imports checks from a testdata file
 
-                # Read the check id from the testdata
-                testsuite, testcase, shortid = process_check_id(row[0])
-                # Add the check to the list providing both the status and error_msg parameters
-                checks += [Check(testsuite, testcase, shortid, int(row[1]), (row[2] if len(row) >= 3 else None))]
-    return checks
+    :param file: path to the testdata file
+    :type file: str
+
+    :returns: a list of checks from the testdata file where the status is completed
+    :rtype: list[Check]
+    """
+    return list(iter_testdata_from_file(file))
+
+def iter_testdata_from_file(file: str) -> Iterator[Check]:
+    """Iterates over the checks from a testdata file, reading the file row by row
+
+    JUnit XML files are recognized by their .xml extension, other files being read as CSV files.
+
+    :param file: path to the testdata file
+    :type file: str
+
+    :returns: an iterator over the checks from the testdata file where the status is completed
+    :rtype: Iterator[Check]
+    """
+    if file.endswith(".xml"):
+        return iter_testdata_from_junit_file(file)
+    return iter_testdata_from_csv_file(file)
+
+def iter_testdata_from_csv_file(file: str) -> Iterator[Check]:
+    """Iterates over the checks from a CSV testdata file, reading the file row by row
+
+    :param file: path to the testdata file
+    :type file: str
+
+    :returns: an iterator over the checks from the testdata file where the status is completed
+    :rtype: Iterator[Check]
+    """
+    with open(file, newline='', encoding="utf-8") as csvfile:
+        reader = csv.reader(csvfile, delimiter=';', quotechar='|')
+        for row in reader:
+            # Skip empty lines or lines with only spaces
+            if len(row) == 0 or (len(row) == 1 and len(row[0].strip()) == 0):
+                continue
+
+            # The data is incomplete if no status is provided
+            if len(row) < 2 or len(row[1].strip()) == 0:
+                log_error("Incomplete test data in {} for row \"{}\"".format(file, row))
+                # The program is interrupted here as this is a critical error
+                sys.exit(-1)
+
+            # Read the check id from the testdata
+            testsuite, testcase, shortid = process_check_id(row[0])
+            # Provide the check with both the status and error_msg parameters
+            yield Check(testsuite, testcase, shortid, int(row[1]), (row[2] if len(row) >= 3 else None))
+
+def iter_testdata_from_junit_file(file: str) -> Iterator[Check]:
+    """Iterates over the checks from a JUnit XML testdata file, parsing the file incrementally
+
+    Each testcase element is a check which raw id is built from its classname and name attributes, the classname being
+    omitted when empty. A testcase with a failure or error child element is failed, its error message being the message
+    attribute or the text of the first of these elements. Skipped testcases are ignored as they have no status.
+
+    Elements are discarded once processed so that the memory used does not depend on the size of the file.
+
+    :param file: path to the testdata file
+    :type file: str
+
+    :returns: an iterator over the checks from the testdata file where the status is completed
+    :rtype: Iterator[Check]
+    """
+    # The XML parser is only imported when JUnit XML testdata is imported
+    from xml.etree.ElementTree import iterparse, ParseError
+
+    with open(file, "rb") as xmlfile:
+        # Elements being parsed, the last one being the parent of the next ended element
+        parents = []
+        try:
+            for event, element in iterparse(xmlfile, events=("start", "end")):
+                if event == "start":
+                    parents += [element]
+                    continue
+                parents.pop()
+
+                if element.tag == "testcase":
+                    check = process_junit_testcase(element, file)
+                    if check is not None:
+                        yield check
+
+                # Only the elements of the testcase being parsed are kept, the elements of the testsuites are released
+                # as soon as they are ended
+                if element.tag == "testcase" or (len(parents) > 0 and parents[-1].tag != "testcase"):
+                    element.clear()
+                    if len(parents) > 0:
+                        parents[-1].remove(element)
+        except ParseError as error:
+            log_error("Syntax error in JUnit testdata {}: {}".format(file, error))
+            # The program is interrupted here as this is a critical error
+            sys.exit(-1)
+
+def process_junit_testcase(element, file: str) -> Check:
+    """Converts a JUnit XML testcase element to a check
+
+    :param element: ended testcase element
+    :type element: xml.etree.ElementTree.Element
+
+    :param file: path to the testdata file
+    :type file: str
+
+    :returns: the check of the testcase, or None if the testcase was skipped
+    :rtype: Check
+    """
+    if element.find("skipped") is not None:
+        return None
+
+    name = element.get("name", "").strip()
+    if len(name) == 0:
+        log_error("Missing testcase name in JUnit testdata {}".format(file))
+        # The program is interrupted here as this is a critical error
+        sys.exit(-1)
+    classname = element.get("classname", "").strip()
+    testsuite, testcase, shortid = process_check_id(classname + "." + name if len(classname) > 0 else name)
+
+    status = 1
+    error_msg = None
+    for child in element:
+        if child.tag in ("failure", "error"):
+            status = 0
+            error_msg = child.get("message") or (child.text or "").strip() or None
+            break
+    return Check(testsuite, testcase, shortid, status, error_msg)
 
 def process_check_id(id: str) -> [str, str, str]:
     """Converts a raw check id to the appropriate fields
@@ -194,77 +421,3 @@ def process_check_id(id: str) -> [str, str, str]:
         sys.exit(-1)
 
     return (testsuite, testcase, shortid)
-
-def process_keyword(cur: int, content: str) -> int:
-    """Increments cur to point to the char following the next parenthesis in content
-
-    :param cur: pointer to the starting char in content
-    :type cur: int
-
-    :param content: content string
-    :type content: str
-
-    :returns: the incremented cur pointing to the char following the next parenthesis in content
-    :rtype: int
-    """
-    cur_start = cur
-    valid = True
-
-    # Process the keyword
-    keyword = "CHECK"
-    for char in keyword:
-        valid = valid & (content[cur] == char) 
-        cur += 1
-    # Process spaces
-    while content[cur] == " ":
-        cur += 1
-    # Process the parenthesis
-    valid = valid & (content[cur] == '(')
-    cur += 1
-    # Process spaces
-    while content[cur] == " ":
-        cur += 1
-    valid = valid & (content[cur] == '\"')
-    
-    if not valid:
-        log_error("Syntax error while processing keyword \"{}\"".format(content[cur_start:cur]))
-        sys.exit(-1)
-
-    return cur
-
-def process_string(cur: int, content: str) -> tuple[int, str]:
-    """Recovers a string contained between matching quotation marks starting from the char pointed by cur
-
-    An empty string is returned in case where the first char pointed by cur is not a quotation mark
-
-    :param cur: pointer to the starting char in content
-    :type cur: int
-
-    :param content: content string
-    :type content: str
-
-    :returns: a tuple containing both an incremented cur pointing to the next char after the quotation mark and the 
-        recovered string
-    :rtype: tuple[int, str]
-    """
-    cur_start = cur
-    result = ""
-    if content[cur] != "\"":
-        log_error("Syntax error while running process_string. Missing starting \\\" while processing string \"{}\"" \
-                    .format(content[cur_start:-1].replace("\"", "\\\"") + "..."))
-        sys.exit(-1)
-
-    cur += 1
-    # We go up to the closing "
-    while cur < len(content) and content[cur] != "\"":
-        result += content[cur]
-        cur += 1
-    if cur == len(content):
-        log_error("Syntax error while running process_string. Missing closing \" while processing string \"{}\"" \
-                    .format(content[cur_start:-1].replace("\"", "\\\"") + "..."))
-        sys.exit(-1)
-
-    # Skip the closing \"
-    cur += 1
-
-    return cur, result
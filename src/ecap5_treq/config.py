@@ -31,6 +31,16 @@ class SpecFormat:
     RST = "RST"
     TEX = "TEX"
 
+class MergePolicy:
+    """A MergePolicy details how the status of a check run several times is computed
+    """
+    # The status of the last run is kept
+    LAST = "last"
+    # The check fails if any of its runs failed
+    ANY_FAIL = "any_fail"
+    # The check succeeds if the ratio of successfull runs reaches the pass rate
+    PASS_RATE = "pass_rate"
+
 class Config:
     """A Config stores input parameters such as paths to the specification, 
     tests, testdata or the traceability matrix.
@@ -71,11 +81,18 @@ class Config:
             "spec_dir_path",
             "test_dir_path",
             "testdata_dir_path",
-            "matrix_path"
+            "matrix_path",
+            "cache_dir_path"
         ]
         allowed_other_keys = [
             "spec_format",
-            "disable_allocation"
+            "disable_allocation",
+            "cache_hash",
+            "jobs",
+            "incremental",
+            "testdata_merge",
+            "testdata_pass_rate",
+            "watch_interval"
         ]
 
         # Check if there are any unknown keys
@@ -95,6 +112,16 @@ class Config:
             self.set("spec_format", SpecFormat.TEX)
         if "disable_allocation" not in self:
             self.set("disable_allocation", False)
+        if "cache_hash" not in self:
+            self.set("cache_hash", False)
+        if "jobs" not in self:
+            self.set("jobs", 1)
+        if "incremental" not in self:
+            self.set("incremental", False)
+        if "testdata_merge" not in self:
+            self.set("testdata_merge", MergePolicy.LAST)
+        if "testdata_pass_rate" not in self:
+            self.set("testdata_pass_rate", 0.5)
 
     def get(self, key: str) -> str:
         """Return the configuration data pointed by key
@@ -0,0 +1,113 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+#
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+#
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+from typing import TextIO
+
+class AlertKind:
+    """Kinds of alerts, named after the github markdown alerts
+    """
+    CAUTION = "CAUTION"
+    IMPORTANT = "IMPORTANT"
+    WARNING = "WARNING"
+
+class DocumentWriter:
+    """A DocumentWriter renders the blocks of a document, e.g. the report, as github markdown
+
+    The content of the blocks is html, which is written as is in both markdown and html documents. The document model
+    is made of the blocks written through the methods of the writer so that the same document can be rendered in
+    another format by a subclass without converting the rendered markdown.
+    """
+
+    def __init__(self, out: TextIO):
+        """Constructor of DocumentWriter
+
+        :param out: file-like object the document is written to
+        :type out: TextIO
+        """
+        self.out = out
+
+    def begin(self) -> None:
+        """Writes the content required before the first block of the document
+        """
+
+    def end(self) -> None:
+        """Writes the content required after the last block of the document
+        """
+
+    def write(self, content: str) -> None:
+        """Writes raw html content, e.g. a table
+
+        :param content: the html content
+        :type content: str
+        """
+        self.out.write(content)
+
+    def heading(self, level: int, title: str, anchor: str = None) -> None:
+        """Writes a heading
+
+        :param level: level of the heading, starting from 1
+        :type level: int
+
+        :param title: title of the heading
+        :type title: str
+
+        :param anchor: id of an anchor placed before the title
+        :type anchor: str, optional
+        """
+        self.out.write("{} {}\n".format("#" * level, heading_content(title, anchor)))
+
+    def alert(self, kind: str, content: str) -> None:
+        """Writes an alert
+
+        :param kind: kind of the alert
+        :type kind: AlertKind
+
+        :param content: html content of the alert
+        :type content: str
+        """
+        self.out.write("\n> [!{}]\n> {}\n".format(kind, content))
+
+    def paragraph(self, content: str, strong: bool = False) -> None:
+        """Writes a paragraph
+
+        :param content: html content of the paragraph
+        :type content: str
+
+        :param strong: true if the content is emphasized
+        :type strong: bool, optional
+        """
+        self.out.write("**{}**".format(content) if strong else content)
+
+def heading_content(title: str, anchor: str = None) -> str:
+    """Formats the content of a heading, preceded by its anchor if any
+
+    :param title: title of the heading
+    :type title: str
+
+    :param anchor: id of an anchor placed before the title
+    :type anchor: str, optional
+
+    :returns: the content of the heading
+    :rtype: str
+    """
+    if anchor is None:
+        return title
+    return "<a id=\"{}\"></a> {}".format(anchor, title)
@@ -0,0 +1,136 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+# 
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+# 
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import sqlite3
+import contextlib
+
+from ecap5_treq.analysis import Analysis
+from ecap5_treq.output import replace_if_changed
+
+# Schema of the exported database. The indexes are created once the data is inserted.
+EXPORT_DB_SCHEMA = """
+    CREATE TABLE reqs (id TEXT PRIMARY KEY, position INTEGER NOT NULL, description TEXT, status TEXT NOT NULL,
+                       result INTEGER NOT NULL);
+    CREATE TABLE req_derived_from (req_id TEXT NOT NULL, derived_from_id TEXT NOT NULL);
+    CREATE TABLE req_allocation (req_id TEXT NOT NULL, allocation TEXT NOT NULL);
+    CREATE TABLE checks (id TEXT PRIMARY KEY, position INTEGER NOT NULL, testsuite TEXT NOT NULL,
+                         testcase TEXT NOT NULL, shortid TEXT NOT NULL, status INTEGER, skipped INTEGER NOT NULL);
+    CREATE TABLE testdata (id TEXT PRIMARY KEY, position INTEGER NOT NULL, testsuite TEXT NOT NULL,
+                           testcase TEXT NOT NULL, shortid TEXT NOT NULL, status INTEGER NOT NULL, error_msg TEXT,
+                           runs INTEGER NOT NULL, unknown INTEGER NOT NULL);
+    CREATE TABLE traces (check_id TEXT NOT NULL, req_id TEXT NOT NULL);
+    CREATE TABLE untraceable (req_id TEXT PRIMARY KEY, justification TEXT NOT NULL);
+    CREATE TABLE results (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+EXPORT_DB_INDEXES = """
+    CREATE INDEX req_derived_from_req_id ON req_derived_from (req_id);
+    CREATE INDEX req_derived_from_derived_from_id ON req_derived_from (derived_from_id);
+    CREATE INDEX req_allocation_req_id ON req_allocation (req_id);
+    CREATE INDEX req_allocation_allocation ON req_allocation (allocation);
+    CREATE INDEX checks_testsuite ON checks (testsuite, testcase);
+    CREATE INDEX testdata_testsuite ON testdata (testsuite, testcase);
+    CREATE INDEX traces_check_id ON traces (check_id);
+    CREATE INDEX traces_req_id ON traces (req_id);
+"""
+
+def export_db(analysis: Analysis, path: str) -> None:
+    """Exports the imported data and the results of an analysis to a SQLite database
+
+    The database is written to a temporary file in a single transaction and replaces the file pointed by path once
+    complete, unless the exported content is identical.
+
+    Duplicate requirement, check and testdata ids are exported once, the last one taking precedence, as they are
+    reported as errors by the analysis.
+
+    :param analysis: the analysis to export
+    :type analysis: Analysis
+
+    :param path: path to the database file
+    :type path: str
+    """
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    try:
+        with contextlib.closing(sqlite3.connect(tmp_path)) as connection:
+            # The temporary file is discarded on failure so the database does not need to be journaled
+            connection.execute("PRAGMA journal_mode = OFF")
+            connection.execute("PRAGMA synchronous = OFF")
+            with connection:
+                write_tables(connection, analysis)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    replace_if_changed(tmp_path, path)
+
+def write_tables(connection: sqlite3.Connection, analysis: Analysis) -> None:
+    """Creates the tables of the exported database and inserts the data of an analysis
+
+    :param connection: connection to the exported database
+    :type connection: sqlite3.Connection
+
+    :param analysis: the analysis to export
+    :type analysis: Analysis
+    """
+    # executescript would commit the transaction so the statements are executed one by one
+    for statement in EXPORT_DB_SCHEMA.split(";")[:-1]:
+        connection.execute(statement)
+
+    connection.executemany("INSERT OR REPLACE INTO reqs VALUES (?, ?, ?, ?, ?)", \
+            ((req.id, i, req.description, req.status, req.result) for i, req in enumerate(analysis.reqs)))
+    connection.executemany("INSERT INTO req_derived_from VALUES (?, ?)", \
+            ((req.id, rid) for req in analysis.reqs if req.derived_from for rid in req.derived_from))
+    connection.executemany("INSERT INTO req_allocation VALUES (?, ?)", \
+            ((req.id, allocation) for req in analysis.reqs if req.allocation for allocation in req.allocation))
+
+    skipped_ids = set(check.id for check in analysis.skipped_checks)
+    connection.executemany("INSERT OR REPLACE INTO checks VALUES (?, ?, ?, ?, ?, ?, ?)", \
+            ((check.id, i, check.testsuite, check.testcase, check.shortid, check.status, check.id in skipped_ids) \
+                for i, check in enumerate(analysis.checks)))
+    unknown_ids = set(check.id for check in analysis.unknown_checks)
+    connection.executemany("INSERT OR REPLACE INTO testdata VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", \
+            ((check.id, i, check.testsuite, check.testcase, check.shortid, check.status, check.error_msg, \
+                check.runs, check.id in unknown_ids) for i, check in enumerate(analysis.testdata)))
+
+    connection.executemany("INSERT INTO traces VALUES (?, ?)", \
+            ((cid, rid) for cid in analysis.matrix.data for rid in analysis.matrix.get(cid)))
+    connection.executemany("INSERT INTO untraceable VALUES (?, ?)", analysis.matrix.untraceable.items())
+
+    results = {
+        "test_result": analysis.test_result,
+        "traceability_result": analysis.traceability_result,
+        "num_successfull_checks": analysis.num_successfull_checks,
+        "num_failed_checks": analysis.num_failed_checks,
+        "num_skipped_checks": len(analysis.skipped_checks),
+        "num_successfull_unknown_checks": analysis.num_successfull_unknown_checks,
+        "num_failed_unknown_checks": analysis.num_failed_unknown_checks,
+        "num_covered_reqs": analysis.num_covered_reqs,
+        "num_untraceable_reqs": analysis.num_untraceable_reqs,
+        "num_uncovered_reqs": analysis.num_uncovered_reqs,
+        "num_allocated_reqs": analysis.num_allocated_reqs
+    }
+    connection.executemany("INSERT INTO results VALUES (?, ?)", results.items())
+
+    for statement in EXPORT_DB_INDEXES.split(";")[:-1]:
+        connection.execute(statement)
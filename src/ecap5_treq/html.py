@@ -22,7 +22,9 @@
 # pylint: disable=line-too-long
 
 import re
-import markdown
+from typing import TextIO
+
+from ecap5_treq.document import AlertKind, DocumentWriter, heading_content
 
 STYLE = """
 #report {
@@ -328,12 +330,99 @@ def markdown_to_html(content: str) -> str:
     :returns: an html string
     :rtype: str
     """
+    # The markdown package is only imported when a markdown document is converted
+    import markdown
+
     content = process_alerts(content)
-    html = "<html><head><meta charset=\"utf-8\"><style>{}</style></head><body><div id=\"report\">".format(STYLE)
+    html = html_header()
     html += markdown.markdown(content)
-    html += "</div></body></html>"
+    html += HTML_FOOTER
     return html
 
+def html_header(stylesheet: str = None) -> str:
+    """Returns the beginning of an html page up to the opening of the report element, including the style
+
+    :param stylesheet: path to a stylesheet containing STYLE linked by the page, the style being inlined otherwise
+    :type stylesheet: str, optional
+
+    :returns: the beginning of the html page
+    :rtype: str
+    """
+    if stylesheet is not None:
+        style = "<link rel=\"stylesheet\" href=\"{}\">".format(stylesheet)
+    else:
+        style = "<style>{}</style>".format(STYLE)
+    return "<html><head><meta charset=\"utf-8\">{}</head><body><div id=\"report\">".format(style)
+
+HTML_FOOTER = "</div></body></html>"
+
+class HtmlWriter(DocumentWriter):
+    """An HtmlWriter renders the blocks of a document directly as a styled html page
+
+    The html is equivalent to the conversion of the markdown document by markdown_to_html, without parsing the
+    markdown document. The raw html content of the blocks is written as is.
+    """
+
+    def __init__(self, out: TextIO, stylesheet: str = None):
+        """Constructor of HtmlWriter
+
+        :param out: file-like object the html page is written to
+        :type out: TextIO
+
+        :param stylesheet: path to a stylesheet containing STYLE linked by the page, the style being inlined otherwise
+        :type stylesheet: str, optional
+        """
+        super().__init__(out)
+        self.stylesheet = stylesheet
+
+    def begin(self) -> None:
+        """Writes the beginning of the html page
+        """
+        self.out.write(html_header(self.stylesheet))
+
+    def end(self) -> None:
+        """Writes the end of the html page
+        """
+        self.out.write(HTML_FOOTER)
+
+    def heading(self, level: int, title: str, anchor: str = None) -> None:
+        """Writes a heading element
+
+        :param level: level of the heading, starting from 1
+        :type level: int
+
+        :param title: title of the heading
+        :type title: str
+
+        :param anchor: id of an anchor placed before the title
+        :type anchor: str, optional
+        """
+        self.out.write("<h{0}>{1}</h{0}>\n".format(level, heading_content(title, anchor)))
+
+    def alert(self, kind: str, content: str) -> None:
+        """Writes an alert styled as a github markdown alert
+
+        :param kind: kind of the alert
+        :type kind: AlertKind
+
+        :param content: html content of the alert
+        :type content: str
+        """
+        replace = {AlertKind.CAUTION: REPLACE_CAUTION, AlertKind.WARNING: REPLACE_WARNING, \
+                   AlertKind.IMPORTANT: REPLACE_IMPORTANT}[kind]
+        self.out.write("\n{}\n".format(replace.replace(r"\1", content)))
+
+    def paragraph(self, content: str, strong: bool = False) -> None:
+        """Writes a paragraph element
+
+        :param content: html content of the paragraph
+        :type content: str
+
+        :param strong: true if the content is emphasized
+        :type strong: bool, optional
+        """
+        self.out.write("<p><strong>{}</strong></p>".format(content) if strong else "<p>{}</p>".format(content))
+
 REPLACE_WARNING = r'<div class="markdown-alert markdown-alert-warning"><p class="markdown-alert-title"><svg class="octicon octicon-alert mr-2" viewBox="0 0 16 16" version="1.1" width="16" height="16" aria-hidden="true"><path d="M6.457 1.047c.659-1.234 2.427-1.234 3.086 0l6.082 11.378A1.75 1.75 0 0 1 14.082 15H1.918a1.75 1.75 0 0 1-1.543-2.575Zm1.763.707a.25.25 0 0 0-.44 0L1.698 13.132a.25.25 0 0 0 .22.368h12.164a.25.25 0 0 0 .22-.368Zm.53 3.996v2.5a.75.75 0 0 1-1.5 0v-2.5a.75.75 0 0 1 1.5 0ZM9 11a1 1 0 1 1-2 0 1 1 0 0 1 2 0Z"></path></svg>Warning</p><p>\1</p></div>'
 REPLACE_CAUTION = r'<div class="markdown-alert markdown-alert-caution"><p class="markdown-alert-title"><svg class="octicon octicon-stop mr-2" viewBox="0 0 16 16" version="1.1" width="16" height="16" aria-hidden="true"><path d="M4.47.22A.749.749 0 0 1 5 0h6c.199 0 .389.079.53.22l4.25 4.25c.141.14.22.331.22.53v6a.749.749 0 0 1-.22.53l-4.25 4.25A.749.749 0 0 1 11 16H5a.749.749 0 0 1-.53-.22L.22 11.53A.749.749 0 0 1 0 11V5c0-.199.079-.389.22-.53Zm.84 1.28L1.5 5.31v5.38l3.81 3.81h5.38l3.81-3.81V5.31L10.69 1.5ZM8 4a.75.75 0 0 1 .75.75v3.5a.75.75 0 0 1-1.5 0v-3.5A.75.75 0 0 1 8 4Zm0 8a1 1 0 1 1 0-2 1 1 0 0 1 0 2Z"></path></svg>Caution</p><p>\1</p></div>'
 REPLACE_IMPORTANT = r'<div class="markdown-alert markdown-alert-important"><p class="markdown-alert-title"><svg class="octicon octicon-report mr-2" viewBox="0 0 16 16" version="1.1" width="16" height="16" aria-hidden="true"><path d="M0 1.75C0 .784.784 0 1.75 0h12.5C15.216 0 16 .784 16 1.75v9.5A1.75 1.75 0 0 1 14.25 13H8.06l-2.573 2.573A1.458 1.458 0 0 1 3 14.543V13H1.75A1.75 1.75 0 0 1 0 11.25Zm1.75-.25a.25.25 0 0 0-.25.25v9.5c0 .138.112.25.25.25h2a.75.75 0 0 1 .75.75v2.19l2.72-2.72a.749.749 0 0 1 .53-.22h6.5a.25.25 0 0 0 .25-.25v-9.5a.25.25 0 0 0-.25-.25Zm7 2.25v2.5a.75.75 0 0 1-1.5 0v-2.5a.75.75 0 0 1 1.5 0ZM9 9a1 1 0 1 1-2 0 1 1 0 0 1 2 0Z"></path></svg>Caution</p><p>\1</p></div>'
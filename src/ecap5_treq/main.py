@@ -19,23 +19,29 @@
 # You should have received a copy of the GNU General Public License
 # along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
 
+from __future__ import annotations
+
+import os
+import sys
+import time
 import argparse
-import subprocess
+from typing import Iterable, TYPE_CHECKING
 
-from ecap5_treq.analysis import Analysis
-from ecap5_treq.check import import_checks, import_testdata
 from ecap5_treq.config import Config
-from ecap5_treq.log import log_error
-from ecap5_treq.matrix import Matrix, prepare_matrix
-from ecap5_treq.report import generate_report_warning_section,    \
-                              generate_report_summary,            \
-                              generate_test_report,               \
-                              generate_traceability_report,       \
-                              generate_test_result_badge,         \
-                              generate_traceability_result_badge, \
-                              generate_report_footer
-from ecap5_treq.req import import_reqs 
-from ecap5_treq.html import markdown_to_html
+from ecap5_treq.profiling import profiler
+
+# The modules required by a command are imported when the command is run so that the startup of the program only
+# pays for the command run, e.g. the markdown package is only imported to generate an html report
+if TYPE_CHECKING:
+    from ecap5_treq.analysis import Analysis
+    from ecap5_treq.cache import Cache
+    from ecap5_treq.check import Check
+
+# Names of the files written in the output directory by the gen_all command
+GEN_ALL_REPORT_MARKDOWN = "report.md"
+GEN_ALL_REPORT_HTML = "report.html"
+GEN_ALL_TEST_RESULT_BADGE = "test-result-badge.json"
+GEN_ALL_TRACEABILITY_RESULT_BADGE = "traceability-result-badge.json"
 
 def cmd_print_reqs(config: dict[str, str]) -> None:
     """Handles the print_reqs command.
@@ -46,7 +52,12 @@ def cmd_print_reqs(config: dict[str, str]) -> None:
     :param config: a configuration dictionnary providing path to input files
     :type config: dict[str, str]
     """
-    reqs = import_reqs(config.get("spec_dir_path"), config.get("spec_format"))
+    from ecap5_treq.req import import_reqs
+
+    with profiler.stage("import_reqs"):
+        reqs = import_reqs(config.get("spec_dir_path"), config.get("spec_format"), \
+                           cache=open_cache(config), jobs=config.get("jobs"))
+        profiler.count("reqs", len(reqs))
     for req in reqs:
         print(req)
 
@@ -59,7 +70,11 @@ def cmd_print_checks(config: dict[str, str]) -> None:
     :param config: a configuration dictionnary providing path to input files
     :type config: dict[str, str]
     """
-    checks = import_checks(config.get("test_dir_path"))
+    from ecap5_treq.check import import_checks
+
+    with profiler.stage("import_checks"):
+        checks = import_checks(config.get("test_dir_path"), cache=open_cache(config), jobs=config.get("jobs"))
+        profiler.count("checks", len(checks))
     for check in checks:
         print(check)
 
@@ -72,7 +87,12 @@ def cmd_print_testdata(config: dict[str, str]) -> None:
     :param config: a configuration dictionnary providing path to input files
     :type config: dict[str, str]
     """
-    checks = import_testdata(config.get("testdata_dir_path"))
+    from ecap5_treq.check import import_testdata
+
+    with profiler.stage("import_testdata"):
+        checks = merge_config_testdata(config, import_testdata(config.get("testdata_dir_path"), \
+                                                               cache=open_cache(config)))
+        profiler.count("testdata", len(checks))
     for check in checks:
         print(check)
 
@@ -85,28 +105,52 @@ def cmd_prepare_matrix(config: dict[str, str]) -> None:
     :param config: a configuration dictionnary providing path to input files
     :type config: dict[str, str]
     """
+    from ecap5_treq.check import import_checks
+    from ecap5_treq.matrix import Matrix, MatrixDb, MatrixDiff, is_matrix_db, prepare_matrix
+    from ecap5_treq.output import OutputFile
+
     # recover the previous matrix if specified
     previous_matrix = Matrix()
     if "matrix_path" in config:
         previous_matrix.read(config.get("matrix_path"))
 
-    checks = import_checks(config.get("test_dir_path"))
-    matrix = prepare_matrix(checks, previous_matrix)
-
-    if "output" in config:
-        with open(config.get("output"), 'w', encoding="utf-8") as file:
-            file.write(matrix.to_csv())
-
-        if "matrix_path" in config:
-            # print diff
-            try:
-                subprocess.check_output(['diff', config.get("output"), config.get("matrix_path")])
+    with profiler.stage("import_checks"):
+        checks = import_checks(config.get("test_dir_path"), cache=open_cache(config), jobs=config.get("jobs"))
+        profiler.count("checks", len(checks))
+    with profiler.stage("prepare_matrix"):
+        matrix = prepare_matrix(checks, previous_matrix)
+
+    if "output" in config and is_matrix_db(config.get("output")):
+        # The stored matrix does not need to be read again if it is the previous matrix
+        stored_matrix = None
+        if "matrix_path" in config and config.get("matrix_path") == config.get("output"):
+            stored_matrix = previous_matrix
+
+        # Only the modified rows are written to the database
+        with MatrixDb(config.get("output")) as db:
+            num_changes = db.write(matrix, stored_matrix)
+        # The differences with the previous matrix are reported instead if there is one
+        if "matrix_path" not in config:
+            if num_changes == 0:
                 print("Matrix unchanged")
-            except subprocess.CalledProcessError as e:
-                print(e.output.decode())
+            else:
+                print("Matrix updated: {} modified rows".format(num_changes))
+    elif "output" in config:
+        with OutputFile(config.get("output")) as file:
+            file.write(matrix.to_csv())
     else:
         print(matrix.to_csv())
 
+    if "output" in config and "matrix_path" in config:
+        diff = MatrixDiff(previous_matrix, matrix)
+        if "json" in config and config.get("json"):
+            print(diff.to_json())
+        else:
+            print(diff.to_str())
+        # The command fails when the matrix changed so that outdated matrices are detected by continuous integration
+        if "exit_code" in config and config.get("exit_code") and len(diff) > 0:
+            sys.exit(1)
+
 def cmd_gen_report(config: dict[str, str]) -> None:
     """Handles the gen_report command.
 
@@ -115,35 +159,28 @@ def cmd_gen_report(config: dict[str, str]) -> None:
     :param config: a configuration dictionnary providing path to input files
     :type config: dict[str, str]
     """
-    reqs = import_reqs(config.get("spec_dir_path"), config.get("spec_format"))
-    checks = import_checks(config.get("test_dir_path"))
-    testdata = import_testdata(config.get("testdata_dir_path"))
-    matrix = Matrix(config.get("matrix_path"))
-    # Perform the test result and traceability analysis
-    analysis = Analysis(reqs, checks, testdata, matrix, not config.get("disable_allocation"))
-
-    # Generate report sections
-    report_warnings = generate_report_warning_section()
-    report_summary = generate_report_summary(analysis)
-    test_report = generate_test_report(analysis)
-    traceability_report = generate_traceability_report(analysis)
-    report_footer = generate_report_footer()
-
-    # Only output the full report if there are no error messages
-    if len(log_error.msgs) > 0:
-        report = report_warnings + "\n**Report generation failed.**"
-    else:
-        report = report_warnings + report_summary + test_report + traceability_report + report_footer
+    from ecap5_treq.output import OutputFile
+    from ecap5_treq.report import write_report
 
-    # Convert to html if requested
-    if config.get("html"):
-        report = markdown_to_html(report)
+    analysis = load_analysis(config)
 
+    if "site" in config:
+        from ecap5_treq.pages import write_site
+
+        # Large reports are split in pages written in parallel
+        with profiler.stage("write_site"):
+            write_site(analysis, config.get("site"), config.get("jobs"))
+        return
+
+    # The report is streamed to the output, the html report being rendered directly
+    html = config.get("html")
     if "output" in config:
-        with open(config.get("output"), 'w', encoding="utf-8") as file:
-            file.write(report)
+        with profiler.stage("write_report"), OutputFile(config.get("output")) as file:
+            write_report(analysis, file, html)
     else:
-        print(report)
+        with profiler.stage("write_report"):
+            write_report(analysis, sys.stdout, html)
+        sys.stdout.write("\n")
 
 def cmd_gen_test_result_badge(config: dict[str, str]) -> None:
     """Handles the gen_test_result_badge command.
@@ -154,21 +191,23 @@ def cmd_gen_test_result_badge(config: dict[str, str]) -> None:
     :param config: a configuration dictionnary providing path to input files
     :type config: dict[str, str]
     """
-    reqs = import_reqs(config.get("spec_dir_path"), config.get("spec_format"))
-    checks = import_checks(config.get("test_dir_path"))
-    testdata = import_testdata(config.get("testdata_dir_path"))
-    matrix = Matrix(config.get("matrix_path"))
-    # Perform the test result and traceability analysis
-    analysis = Analysis(reqs, checks, testdata, matrix, not config.get("disable_allocation"))
+    from ecap5_treq.analysis import ResultsSummary
+    from ecap5_treq.check import import_checks, iter_testdata
+    from ecap5_treq.report import generate_test_result_badge
+
+    # Only the test counters are required, the testdata is streamed and only its merged checks are stored
+    with profiler.stage("import_checks"):
+        checks = import_checks(config.get("test_dir_path"), cache=open_cache(config), jobs=config.get("jobs"))
+        profiler.count("checks", len(checks))
+    with profiler.stage("import_testdata"):
+        testdata = merge_config_testdata(config, iter_testdata(config.get("testdata_dir_path")))
+        profiler.count("testdata", len(testdata))
+        summary = ResultsSummary(checks).add_all(testdata)
 
     # Generate a test result badge
-    badge = generate_test_result_badge(analysis)
+    badge = generate_test_result_badge(summary)
 
-    if "output" in config:
-        with open(config.get("output"), 'w', encoding="utf-8") as file:
-            file.write(badge)
-    else:
-        print(badge)
+    write_output(config, badge)
 
 def cmd_gen_traceability_result_badge(config: dict[str, str]) -> None:
     """Handles the gen_traceability_result_badge command.
@@ -179,21 +218,255 @@ def cmd_gen_traceability_result_badge(config: dict[str, str]) -> None:
     :param config: a configuration dictionnary providing path to input files
     :type config: dict[str, str]
     """
-    reqs = import_reqs(config.get("spec_dir_path"), config.get("spec_format"))
-    checks = import_checks(config.get("test_dir_path"))
-    testdata = import_testdata(config.get("testdata_dir_path"))
-    matrix = Matrix(config.get("matrix_path"))
-    # Perform the test result and traceability analysis
-    analysis = Analysis(reqs, checks, testdata, matrix, not config.get("disable_allocation"))
+    from ecap5_treq.report import generate_traceability_result_badge
+
+    analysis = load_analysis(config)
 
     # Generate a traceability result badge
     badge = generate_traceability_result_badge(analysis)
 
+    write_output(config, badge)
+
+def cmd_gen_all(config: dict[str, str]) -> None:
+    """Handles the gen_all command.
+
+    The gen_all command generates the markdown report, the html report and both badges from a single
+    analysis. The inputs are only parsed once and the outputs are written in the output directory.
+
+    :param config: a configuration dictionnary providing path to input files
+    :type config: dict[str, str]
+    """
+    analysis = load_analysis(config)
+
+    write_all(config.get("output"), analysis)
+
+def cmd_export_db(config: dict[str, str]) -> None:
+    """Handles the export_db command.
+
+    The export_db command exports the requirements, checks, testdata, matrix and analysis results to the SQLite
+    database which path is given in config.
+
+    :param config: a configuration dictionnary providing path to input files
+    :type config: dict[str, str]
+    """
+    from ecap5_treq.export import export_db
+
+    analysis = load_analysis(config)
+
+    with profiler.stage("export_db"):
+        export_db(analysis, config.get("output"))
+
+def cmd_watch(config: dict[str, str]) -> None:
+    """Handles the watch command.
+
+    The watch command generates the same outputs as the gen_all command and generates them again each time the
+    specification, tests, testdata or matrix change. The parsed records and the analysis are kept in memory between
+    two generations so that only the changed files are parsed again. The command runs until interrupted.
+
+    :param config: a configuration dictionnary providing path to input files
+    :type config: dict[str, str]
+    """
+    from ecap5_treq.cache import Cache
+    from ecap5_treq.log import log_clear, log_error
+    from ecap5_treq.merge import check_merge_policy
+    from ecap5_treq.watch import WATCH_INTERVAL, snapshot, wait_for_changes
+
+    # The configuration is validated once before watching so that configuration errors interrupt the command instead
+    # of being reported after each change
+    output_dir = config.get("output")
+    paths = [config.get(key) for key in ["spec_dir_path", "test_dir_path", "testdata_dir_path", "matrix_path"]]
+    for path in paths:
+        if not os.path.exists(path):
+            log_error("The watched path {} does not exist".format(path))
+            sys.exit(-1)
+    check_merge_policy(config.get("testdata_merge"))
+    interval = config.get("watch_interval") if "watch_interval" in config else WATCH_INTERVAL
+
+    # The parse cache keeps the records in memory if no cache directory is configured
+    cache = open_cache(config)
+    if cache is None:
+        cache = Cache(None, config.get("cache_hash"))
+
+    analysis = None
+    files = snapshot(paths)
+    try:
+        while True:
+            start = time.perf_counter()
+            # The logged messages are reported, they are cleared so that each report only contains its own messages
+            log_clear()
+            try:
+                analysis = load_analysis(config, cache, analysis)
+            except SystemExit:
+                # Critical parse errors are logged before exiting, the outputs are generated again once fixed
+                print("Outputs not generated, watching for changes")
+            else:
+                write_all(output_dir, analysis)
+                print("Outputs generated in {:.3f}s, watching for changes".format(time.perf_counter() - start))
+
+            files = wait_for_changes(paths, files, interval)
+    except KeyboardInterrupt:
+        pass
+
+def write_all(output_dir: str, analysis: Analysis) -> None:
+    """Writes the markdown report, the html report and both badges in the output directory
+
+    Only the files which content changed are replaced.
+
+    :param output_dir: path to the output directory
+    :type output_dir: str
+
+    :param analysis: the analysis to report
+    :type analysis: Analysis
+    """
+    from ecap5_treq.output import OutputFile
+    from ecap5_treq.report import generate_report, generate_test_result_badge, \
+                                  generate_traceability_result_badge
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    with profiler.stage("generate_report"):
+        report = generate_report(analysis)
+    with profiler.stage("generate_html_report"):
+        html = generate_report(analysis, html=True)
+    test_result_badge = generate_test_result_badge(analysis)
+    traceability_result_badge = generate_traceability_result_badge(analysis)
+
+    outputs = {
+        GEN_ALL_REPORT_MARKDOWN: report,
+        GEN_ALL_REPORT_HTML: html,
+        GEN_ALL_TEST_RESULT_BADGE: test_result_badge,
+        GEN_ALL_TRACEABILITY_RESULT_BADGE: traceability_result_badge
+    }
+    with profiler.stage("write_outputs"):
+        for filename, content in outputs.items():
+            with OutputFile(os.path.join(output_dir, filename)) as file:
+                file.write(content)
+
+def load_analysis(config: dict[str, str], cache: Cache = None, analysis: Analysis = None) -> Analysis:
+    """Imports the requirements, checks, testdata and matrix and performs the analysis
+
+    In incremental mode, the analysis of the previous run is loaded from the cache and updated with the changes.
+
+    :param config: a configuration dictionnary providing path to input files
+    :type config: dict[str, str]
+
+    :param cache: cache of previously parsed source files, the cache configured in config is used by default
+    :type cache: Cache, optional
+
+    :param analysis: a previous analysis to update with the imported data
+    :type analysis: Analysis, optional
+
+    :returns: the analysis performed on the imported data
+    :rtype: Analysis
+    """
+    from ecap5_treq.analysis import Analysis
+    from ecap5_treq.check import import_checks, import_testdata
+    from ecap5_treq.matrix import Matrix
+    from ecap5_treq.req import import_reqs
+
+    if cache is None:
+        cache = open_cache(config)
+    with profiler.stage("import_reqs"):
+        reqs = import_reqs(config.get("spec_dir_path"), config.get("spec_format"), cache=cache, \
+                           jobs=config.get("jobs"))
+        profiler.count("reqs", len(reqs))
+    with profiler.stage("import_checks"):
+        checks = import_checks(config.get("test_dir_path"), cache=cache, jobs=config.get("jobs"))
+        profiler.count("checks", len(checks))
+    with profiler.stage("import_testdata"):
+        testdata = merge_config_testdata(config, import_testdata(config.get("testdata_dir_path"), cache=cache))
+        profiler.count("testdata", len(testdata))
+    with profiler.stage("read_matrix"):
+        matrix = Matrix(config.get("matrix_path"))
+        profiler.count("matrix_rows", len(matrix.data) + len(matrix.untraceable))
+
+    incremental = cache is not None and cache.path is not None and config.get("incremental")
+    if analysis is None and incremental:
+        with profiler.stage("load_previous_analysis"):
+            analysis = cache.get_state("analysis")
+
+    with profiler.stage("analysis"):
+        if analysis is None:
+            # Perform the test result and traceability analysis
+            analysis = Analysis(reqs, checks, testdata, matrix, not config.get("disable_allocation"))
+        else:
+            # Only the data changed since the previous analysis is analysed again
+            analysis.update(reqs, checks, testdata, matrix, not config.get("disable_allocation"))
+
+    if incremental:
+        with profiler.stage("save_analysis"):
+            cache.set_state("analysis", analysis)
+    return analysis
+
+def merge_config_testdata(config: dict[str, str], testdata: Iterable[Check]) -> list[Check]:
+    """Merges the runs of the checks from the testdata with the merge policy of the configuration
+
+    :param config: a configuration dictionnary providing the merge policy
+    :type config: dict[str, str]
+
+    :param testdata: the checks from the testdata
+    :type testdata: Iterable[Check]
+
+    :returns: the merged checks
+    :rtype: list[Check]
+    """
+    from ecap5_treq.merge import merge_testdata
+
+    return merge_testdata(testdata, config.get("testdata_merge"), config.get("testdata_pass_rate"))
+
+def open_cache(config: dict[str, str]) -> Cache:
+    """Returns the parse cache configured in config
+
+    :param config: a configuration dictionnary providing path to the cache directory
+    :type config: dict[str, str]
+
+    :returns: the parse cache or None if no cache directory is configured
+    :rtype: Cache
+    """
+    from ecap5_treq.cache import Cache
+
+    if "cache_dir_path" not in config:
+        return None
+    return Cache(config.get("cache_dir_path"), config.get("cache_hash"))
+
+def write_output(config: dict[str, str], content: str) -> None:
+    """Writes content to the output file if provided in config, prints it otherwise
+
+    The output file is only replaced if its content changed.
+
+    :param config: a configuration dictionnary providing path to the output file
+    :type config: dict[str, str]
+
+    :param content: the content to output
+    :type content: str
+    """
+    from ecap5_treq.output import OutputFile
+
     if "output" in config:
-        with open(config.get("output"), 'w', encoding="utf-8") as file:
-            file.write(badge)
+        with OutputFile(config.get("output")) as file:
+            file.write(content)
     else:
-        print(badge)
+        print(content)
+
+def write_profile(args: argparse.Namespace) -> None:
+    """Outputs the stages recorded by the profiler as requested by the command line arguments
+
+    The summary is printed to stderr so that it does not mix with the outputs printed to stdout. The JSON and trace
+    outputs are only replaced if their content changed.
+
+    :param args: the command line arguments
+    :type args: argparse.Namespace
+    """
+    from ecap5_treq.output import OutputFile
+
+    if args.profile:
+        sys.stderr.write(profiler.summary() + "\n")
+    if args.profile_json:
+        with OutputFile(args.profile_json) as file:
+            file.write(profiler.to_json())
+    if args.profile_trace:
+        with OutputFile(args.profile_trace) as file:
+            file.write(profiler.to_chrome_trace())
 
 def main():
     """Entry point to ECAP5-TREQ
@@ -216,6 +489,12 @@ The command option expects one of the following:
                                      badge by img.shields.io.
     gen_traceability_result_badge    Generates a JSON file for configuring the generation of a traceability result 
                                      svg badge by img.shields.io
+    gen_all                          Generates the markdown report, the html report and both badges in the
+                                     output directory from a single analysis.
+    export_db                        Exports the requirements, checks, testdata, matrix and analysis results
+                                     to a SQLite database.
+    watch                            Generates the same outputs as gen_all and generates them again each time
+                                     the input files change.
 
 The full documentation is available at https://ecap5.github.io/ECAP5-TREQ/index.html""")
     parser.add_argument('command')
@@ -226,8 +505,21 @@ The full documentation is available at https://ecap5.github.io/ECAP5-TREQ/index.
     parser.add_argument('-m', '--matrix')
     parser.add_argument('-o', '--output')
     parser.add_argument('--html', action='store_true')
+    parser.add_argument('--site')
+    parser.add_argument('--json', action='store_true')
+    parser.add_argument('--exit-code', action='store_true')
     parser.add_argument('--spec-format')
     parser.add_argument('--disable-allocation', action='store_true')
+    parser.add_argument('--cache')
+    parser.add_argument('--cache-hash', action='store_true')
+    parser.add_argument('-j', '--jobs', type=int)
+    parser.add_argument('--incremental', action='store_true')
+    parser.add_argument('--testdata-merge')
+    parser.add_argument('--testdata-pass-rate', type=float)
+    parser.add_argument('--watch-interval', type=float)
+    parser.add_argument('--profile', action='store_true')
+    parser.add_argument('--profile-json')
+    parser.add_argument('--profile-trace')
 
     args = parser.parse_args()
 
@@ -247,29 +539,65 @@ The full documentation is available at https://ecap5.github.io/ECAP5-TREQ/index.
         config.set("spec_format", args.spec_format)
     if args.disable_allocation:
         config.set("disable_allocation", args.disable_allocation)
+    if args.cache:
+        config.set_path("cache_dir_path", args.cache)
+    if args.cache_hash:
+        config.set("cache_hash", args.cache_hash)
+    if args.jobs:
+        config.set("jobs", args.jobs)
+    if args.incremental:
+        config.set("incremental", args.incremental)
+    if args.testdata_merge:
+        config.set("testdata_merge", args.testdata_merge)
+    if args.testdata_pass_rate is not None:
+        config.set("testdata_pass_rate", args.testdata_pass_rate)
+    if args.watch_interval is not None:
+        config.set("watch_interval", args.watch_interval)
 
     # Add other arguments that are not present in configuration files
     if args.output:
         config.set("output", args.output)
     config.set("html", args.html)
-    
-    # Handle the different commands provided
-    if args.command == "print_reqs":
-        cmd_print_reqs(config)
-    elif args.command == "print_checks":
-        cmd_print_checks(config)
-    elif args.command == "print_testdata":
-        cmd_print_testdata(config)
-    elif args.command == "prepare_matrix":
-        cmd_prepare_matrix(config)
-    elif args.command == "gen_report":
-        cmd_gen_report(config)
-    elif args.command == "gen_test_result_badge":
-        cmd_gen_test_result_badge(config)
-    elif args.command == "gen_traceability_result_badge":
-        cmd_gen_traceability_result_badge(config)
-    else:
-        parser.print_help()
+    if args.site:
+        config.set("site", args.site)
+    if args.json:
+        config.set("json", args.json)
+    if args.exit_code:
+        config.set("exit_code", args.exit_code)
+
+    # The profiler records the stages of the command once started
+    profile = args.profile or args.profile_json or args.profile_trace
+    if profile:
+        profiler.start()
+
+    try:
+        # Handle the different commands provided
+        if args.command == "print_reqs":
+            cmd_print_reqs(config)
+        elif args.command == "print_checks":
+            cmd_print_checks(config)
+        elif args.command == "print_testdata":
+            cmd_print_testdata(config)
+        elif args.command == "prepare_matrix":
+            cmd_prepare_matrix(config)
+        elif args.command == "gen_report":
+            cmd_gen_report(config)
+        elif args.command == "gen_test_result_badge":
+            cmd_gen_test_result_badge(config)
+        elif args.command == "gen_traceability_result_badge":
+            cmd_gen_traceability_result_badge(config)
+        elif args.command == "gen_all":
+            cmd_gen_all(config)
+        elif args.command == "export_db":
+            cmd_export_db(config)
+        elif args.command == "watch":
+            cmd_watch(config)
+        else:
+            parser.print_help()
+    finally:
+        if profile:
+            profiler.stop()
+            write_profile(args)
 
 if __name__ == "__main__":
     main()
@@ -20,12 +20,24 @@
 # along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
 
 import csv
+import errno
 import io
+import json
+import os
+import pathlib
+import sqlite3
+from collections import Counter
 
 from ecap5_treq.check import Check
 from ecap5_treq.req import Req
 
 from ecap5_treq.log import log_warn
+from ecap5_treq.profiling import profiler
+
+# Extensions of the matrix files stored in a SQLite database
+MATRIX_DB_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+# Separator of the requirement ids traced to a check in the database
+MATRIX_DB_SEPARATOR = "\x1f"
 
 class Matrix:
     """A Matrix contains the traceability data between checks and requirements
@@ -45,6 +57,8 @@ class Matrix:
     def read(self, path: str) -> None:
         """Reads the traceability matrix from the file pointed by path
 
+        Matrix files which extension is one of ``MATRIX_DB_EXTENSIONS`` are read from a SQLite database.
+
         :param path: path to the traceability matrix
         :type path: str
 
@@ -53,6 +67,12 @@ class Matrix:
         """
         self.data = {}
         self.untraceable = {}
+        profiler.count_file(path)
+        if is_matrix_db(path):
+            # The database is opened read-only so that a missing matrix is reported instead of being created empty
+            with MatrixDb(path, readonly=True) as db:
+                db.read(self)
+            return
         with open(path, newline='', encoding="utf-8") as csvfile:
             reader = csv.reader(csvfile, delimiter=';', quotechar='|')
             for row in reader:
@@ -84,13 +104,8 @@ class Matrix:
         :returns: a boolean indicating the result of the comparison
         :rtype: bool
         """
-        check_ids = [c.id for c in checks]
-        matrix_ids = list(self.data.keys())
-
-        check_ids.sort()
-        matrix_ids.sort()
-        
-        return check_ids == matrix_ids
+        # The ids are counted to compare them in linear time, including duplicate check ids
+        return Counter(c.id for c in checks) == Counter(self.data.keys())
     
     def add(self, check_id: str, traced_reqs: list[Req]) -> None:
         """Adds traceability data to the matrix
@@ -207,3 +222,272 @@ def prepare_matrix(checks: list[Check], previous_matrix: Matrix) -> Matrix:
         for rid in previous_matrix.untraceable:
             matrix.add_untraceable(rid, previous_matrix.untraceable[rid])
     return matrix
+
+class MatrixDiff:
+    """A MatrixDiff contains the differences between two traceability matrices, indexed by check and requirement ids
+    """
+
+    def __init__(self, previous: Matrix, matrix: Matrix):
+        """Constructor of MatrixDiff
+
+        The differences are computed in a single pass over both matrices using their dictionaries.
+
+        :param previous: the previous traceability matrix
+        :type previous: Matrix
+
+        :param matrix: the updated traceability matrix
+        :type matrix: Matrix
+        """
+        # Requirement ids traced to the added and removed checks, indexed by check id
+        self.added_checks = {cid: rids for cid, rids in matrix.data.items() if cid not in previous.data}
+        self.removed_checks = {cid: rids for cid, rids in previous.data.items() if cid not in matrix.data}
+        # Previous and updated requirement ids traced to the checks which traces changed, indexed by check id
+        self.changed_checks = {cid: (previous.data[cid], rids) for cid, rids in matrix.data.items() \
+                                    if cid in previous.data and previous.data[cid] != rids}
+
+        # Justifications of the added and removed untraceable requirements, indexed by requirement id
+        self.added_untraceable = {rid: justification for rid, justification in matrix.untraceable.items() \
+                                    if rid not in previous.untraceable}
+        self.removed_untraceable = {rid: justification for rid, justification in previous.untraceable.items() \
+                                    if rid not in matrix.untraceable}
+        # Previous and updated justifications of the untraceable requirements, indexed by requirement id
+        self.changed_untraceable = {rid: (previous.untraceable[rid], justification) \
+                                    for rid, justification in matrix.untraceable.items() \
+                                        if rid in previous.untraceable and previous.untraceable[rid] != justification}
+
+    def __len__(self) -> int:
+        """Override of the __len__ function returning the number of differences
+
+        :returns: the number of added, removed or changed checks and untraceable requirements
+        :rtype: int
+        """
+        return len(self.added_checks) + len(self.removed_checks) + len(self.changed_checks) + \
+               len(self.added_untraceable) + len(self.removed_untraceable) + len(self.changed_untraceable)
+
+    def to_str(self) -> str:
+        """Converts the differences to a human readable string
+
+        Added, removed and changed rows are prefixed with ``+``, ``-`` and ``~`` respectively.
+
+        :returns: a summary of the differences followed by one line per difference
+        :rtype: str
+        """
+        if len(self) == 0:
+            return "Matrix unchanged"
+
+        lines = ["Matrix updated: {} added, {} removed and {} changed checks, " \
+                 "{} added, {} removed and {} changed untraceable requirements" \
+                    .format(len(self.added_checks), len(self.removed_checks), len(self.changed_checks), \
+                            len(self.added_untraceable), len(self.removed_untraceable), len(self.changed_untraceable))]
+        for cid, rids in self.added_checks.items():
+            lines += ["+ {}: {}".format(cid, ", ".join(rids))]
+        for cid, rids in self.removed_checks.items():
+            lines += ["- {}: {}".format(cid, ", ".join(rids))]
+        for cid, (previous_rids, rids) in self.changed_checks.items():
+            lines += ["~ {}: {} (was {})".format(cid, ", ".join(rids), ", ".join(previous_rids))]
+        for rid, justification in self.added_untraceable.items():
+            lines += ["+ __UNTRACEABLE__ {}: {}".format(rid, justification)]
+        for rid, justification in self.removed_untraceable.items():
+            lines += ["- __UNTRACEABLE__ {}: {}".format(rid, justification)]
+        for rid, (previous_justification, justification) in self.changed_untraceable.items():
+            lines += ["~ __UNTRACEABLE__ {}: {} (was {})".format(rid, justification, previous_justification)]
+        return "\n".join(lines)
+
+    def to_json(self) -> str:
+        """Converts the differences to a JSON string
+
+        :returns: a JSON object with one member per kind of difference, the changes providing the previous and updated
+                  values
+        :rtype: str
+        """
+        return json.dumps({
+            "added_checks": self.added_checks,
+            "removed_checks": self.removed_checks,
+            "changed_checks": {cid: {"previous": previous_rids, "current": rids} \
+                                for cid, (previous_rids, rids) in self.changed_checks.items()},
+            "added_untraceable": self.added_untraceable,
+            "removed_untraceable": self.removed_untraceable,
+            "changed_untraceable": {rid: {"previous": previous_justification, "current": justification} \
+                                    for rid, (previous_justification, justification) \
+                                        in self.changed_untraceable.items()}
+        }, indent=2)
+
+    def __str__(self) -> str:
+        """Override of the __str__ function used to output a string from an object
+
+        :returns: a string representing the differences
+        :rtype: str
+        """
+        return self.to_str()
+
+class MatrixDb:
+    """A MatrixDb stores a traceability matrix in an indexed SQLite database
+
+    The requirements traced to each check are stored with the check so that the matrix is read with a single scan.
+    The traces are also indexed by requirement id so that the checks traced to a requirement are looked up without
+    reading the whole matrix. Writing a matrix only modifies the rows which changed, in a single transaction.
+    """
+
+    def __init__(self, path: str, readonly: bool = False):
+        """Constructor of MatrixDb
+
+        The database and its tables are created if required, unless the database is opened read-only.
+
+        :param path: path to the database file
+        :type path: str
+
+        :param readonly: opens an existing database read-only, a FileNotFoundError being raised if it is missing
+        :type readonly: bool, optional
+        """
+        if readonly:
+            if not os.path.isfile(path):
+                raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+            self.connection = sqlite3.connect(pathlib.Path(path).absolute().as_uri() + "?mode=ro", uri=True)
+            return
+
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS checks (position INTEGER PRIMARY KEY, check_id TEXT UNIQUE NOT NULL,
+                                               req_ids TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS traces (check_id TEXT NOT NULL, position INTEGER NOT NULL,
+                                               req_id TEXT NOT NULL, PRIMARY KEY (check_id, position));
+            CREATE INDEX IF NOT EXISTS traces_req_id ON traces (req_id);
+            CREATE TABLE IF NOT EXISTS untraceable (position INTEGER PRIMARY KEY, req_id TEXT UNIQUE NOT NULL,
+                                                    justification TEXT NOT NULL);
+        """)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self) -> None:
+        """Closes the database
+        """
+        self.connection.close()
+
+    def read(self, matrix: Matrix) -> None:
+        """Reads the whole traceability matrix from the database
+
+        :param matrix: the matrix to fill
+        :type matrix: Matrix
+        """
+        for cid, req_ids in self.connection.execute("SELECT check_id, req_ids FROM checks ORDER BY position"):
+            matrix.data[cid] = split_req_ids(req_ids)
+        for rid, justification in self.connection.execute( \
+                "SELECT req_id, justification FROM untraceable ORDER BY position"):
+            matrix.untraceable[rid] = justification
+
+    def get(self, check_id: str) -> list[str]:
+        """Returns the requirements traced to a check
+
+        :param check_id: id of the check
+        :type check_id: str
+
+        :returns: the ids of the requirements traced to the check
+        :rtype: list[str]
+        """
+        row = self.connection.execute("SELECT req_ids FROM checks WHERE check_id = ?", (check_id,)).fetchone()
+        return split_req_ids(row[0]) if row else []
+
+    def get_checks(self, rid: str) -> list[str]:
+        """Returns the checks traced to a requirement
+
+        :param rid: id of the requirement
+        :type rid: str
+
+        :returns: the ids of the checks traced to the requirement, each listed once
+        :rtype: list[str]
+        """
+        return [cid for (cid,) in self.connection.execute( \
+                    "SELECT DISTINCT traces.check_id FROM traces JOIN checks ON traces.check_id = checks.check_id " \
+                    "WHERE req_id = ? ORDER BY checks.position", (rid,))]
+
+    def __contains__(self, check_id: str) -> bool:
+        """Override of the __contains__ function used to check if a check_id belongs to the traceability matrix
+
+        :param check_id: id of the check
+        :type check_id: str
+
+        :returns: a boolean indicating if id of the check belongs to the traceability matrix
+        :rtype: bool
+        """
+        return self.connection.execute("SELECT 1 FROM checks WHERE check_id = ?", (check_id,)).fetchone() is not None
+
+    def write(self, matrix: Matrix, previous: Matrix = None) -> int:
+        """Replaces the traceability matrix stored in the database
+
+        Only the checks and untraceable requirements which were added, removed or modified are written. All the
+        modifications are performed in a single transaction.
+
+        :param matrix: the matrix to store
+        :type matrix: Matrix
+
+        :param previous: the matrix currently stored in the database if already read
+        :type previous: Matrix, optional
+
+        :returns: the number of checks and untraceable requirements which were added, removed, modified or moved
+        :rtype: int
+        """
+        if previous is None:
+            previous = Matrix()
+            self.read(previous)
+
+        positions = {cid: i for i, cid in enumerate(previous.data)}
+        removed_cids = [cid for cid in previous.data if cid not in matrix.data]
+        changed_cids = [cid for cid in matrix.data if matrix.data[cid] != previous.data.get(cid)]
+        moved_cids = [cid for i, cid in enumerate(matrix.data) if positions.get(cid, i) != i]
+
+        positions = {rid: i for i, rid in enumerate(previous.untraceable)}
+        removed_rids = [rid for rid in previous.untraceable if rid not in matrix.untraceable]
+        changed_rids = [(i, rid, justification) for i, (rid, justification) in enumerate(matrix.untraceable.items()) \
+                            if previous.untraceable.get(rid) != justification or positions.get(rid) != i]
+
+        with self.connection:
+            self.connection.executemany("DELETE FROM checks WHERE check_id = ?", [(cid,) for cid in removed_cids])
+            self.connection.executemany("DELETE FROM traces WHERE check_id = ?", \
+                                        [(cid,) for cid in removed_cids + changed_cids])
+            positions = {cid: i for i, cid in enumerate(matrix.data)}
+            self.connection.executemany("INSERT OR REPLACE INTO checks VALUES (?, ?, ?)", \
+                                        [(positions[cid], cid, join_req_ids(matrix.data[cid])) \
+                                            for cid in set(changed_cids) | set(moved_cids)])
+            self.connection.executemany("INSERT INTO traces VALUES (?, ?, ?)", \
+                                        [(cid, i, rid) for cid in changed_cids for i, rid in enumerate(matrix.data[cid])])
+            self.connection.executemany("DELETE FROM untraceable WHERE req_id = ?", [(rid,) for rid in removed_rids])
+            self.connection.executemany("INSERT OR REPLACE INTO untraceable VALUES (?, ?, ?)", changed_rids)
+
+        return len(removed_cids) + len(set(changed_cids) | set(moved_cids)) + len(removed_rids) + len(changed_rids)
+
+def join_req_ids(rids: list[str]) -> str:
+    """Joins the requirement ids traced to a check to be stored in the database
+
+    :param rids: the requirement ids
+    :type rids: list[str]
+
+    :returns: the joined requirement ids
+    :rtype: str
+    """
+    return MATRIX_DB_SEPARATOR.join(rids)
+
+def split_req_ids(req_ids: str) -> list[str]:
+    """Splits the requirement ids traced to a check stored in the database
+
+    :param req_ids: the joined requirement ids
+    :type req_ids: str
+
+    :returns: the requirement ids
+    :rtype: list[str]
+    """
+    return req_ids.split(MATRIX_DB_SEPARATOR) if req_ids else []
+
+def is_matrix_db(path: str) -> bool:
+    """Checks if a matrix file is stored in a SQLite database
+
+    :param path: path to the matrix file
+    :type path: str
+
+    :returns: a boolean indicating if the extension of the file is one of MATRIX_DB_EXTENSIONS
+    :rtype: bool
+    """
+    return path.lower().endswith(MATRIX_DB_EXTENSIONS)
@@ -0,0 +1,109 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+#
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+#
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+from typing import Iterable
+
+from ecap5_treq.log import log_error
+from ecap5_treq.check import Check
+from ecap5_treq.config import MergePolicy
+
+MERGE_POLICIES = [MergePolicy.LAST, MergePolicy.ANY_FAIL, MergePolicy.PASS_RATE]
+
+def merge_testdata(testdata: Iterable[Check], policy: str = MergePolicy.LAST, pass_rate: float = 0.5) -> list[Check]:
+    """Merges the runs of the checks from the testdata so that each check appears once
+
+    Each testdata check is a run, the runs being ordered as the testdata files and rows. The checks are indexed by id in
+    a single pass so that the merge is linear whatever the number of testdata files. The runs property of the merged
+    checks counts their runs. The error message of a failed check is the one of its last failed run.
+
+    The checks of the testdata are not modified, checks run several times being replaced by new checks, so that the
+    testdata can be kept in a cache.
+
+    :param testdata: the checks from the testdata, e.g. an iterator returned by iter_testdata
+    :type testdata: Iterable[Check]
+
+    :param policy: policy used to compute the status of the checks run several times
+    :type policy: str, optional
+
+    :param pass_rate: minimal ratio of successfull runs for a check to succeed with the pass_rate policy
+    :type pass_rate: float, optional
+
+    :returns: the merged checks in the order of their first run
+    :rtype: list[Check]
+    """
+    check_merge_policy(policy)
+
+    merged = {}
+    num_successfull_runs = {}
+    for check in testdata:
+        num_successfull_runs[check.id] = num_successfull_runs.get(check.id, 0) + check.status
+        previous = merged.get(check.id)
+        if previous is None:
+            merged[check.id] = check
+            continue
+
+        status, error_msg = check.status, check.error_msg
+        if policy != MergePolicy.LAST and check.status:
+            # A successfull run does not override a previous failure
+            status, error_msg = previous.status, previous.error_msg
+        merged[check.id] = merged_check(check, status, error_msg, previous.runs + 1)
+
+    if policy == MergePolicy.PASS_RATE:
+        for cid, check in merged.items():
+            status = num_successfull_runs[cid] >= pass_rate * check.runs
+            if status != check.status:
+                merged[cid] = merged_check(check, status, None if status else check.error_msg, check.runs)
+
+    return list(merged.values())
+
+def check_merge_policy(policy: str) -> None:
+    """Checks that a testdata merge policy is known, the program being interrupted otherwise
+
+    :param policy: the checked merge policy
+    :type policy: str
+    """
+    if policy not in MERGE_POLICIES:
+        log_error("Unknown testdata merge policy: {}. Expected one of: {}".format(policy, ", ".join(MERGE_POLICIES)))
+        # The program is interrupted here as this is a critical error
+        sys.exit(-1)
+
+def merged_check(check: Check, status: bool, error_msg: str, runs: int) -> Check:
+    """Creates a merged check
+
+    :param check: a run of the check
+    :type check: Check
+
+    :param status: merged status of the check
+    :type status: bool
+
+    :param error_msg: merged error message of the check
+    :type error_msg: str
+
+    :param runs: number of runs of the check
+    :type runs: int
+
+    :returns: a new check with the merged status
+    :rtype: Check
+    """
+    result = Check(check.testsuite, check.testcase, check.shortid, 1 if status else 0, error_msg)
+    result.runs = runs
+    return result
@@ -0,0 +1,145 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+#
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+#
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+from typing import TextIO
+
+from ecap5_treq.cache import hash_file
+
+class OutputFile:
+    """An OutputFile writes an output file atomically and only if its content changed
+
+    The content is streamed to a temporary file next to the output file. Once complete, the temporary file replaces the
+    output file if their contents differ and is discarded otherwise, so that the modification time of unchanged outputs
+    is preserved and that a partially written output is never visible. Each writer uses its own temporary file so that
+    processes writing the same output at the same time do not write into each other's file.
+
+    Usage::
+
+        with OutputFile(path) as file:
+            file.write(content)
+    """
+
+    def __init__(self, path: str):
+        """Constructor of OutputFile
+
+        :param path: path to the output file
+        :type path: str
+        """
+        self.path = path
+        # Set once the file is opened
+        self.tmp_path = None
+        self.file = None
+        # Set once the file is closed, true if the output file was replaced
+        self.changed = None
+
+    def __enter__(self) -> TextIO:
+        """Opens the temporary file
+
+        :returns: the temporary file opened for writing
+        :rtype: TextIO
+        """
+        fd, self.tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), \
+                                             prefix=os.path.basename(self.path) + ".", suffix=".tmp")
+        try:
+            # The temporary file is only readable by its owner, a new output file gets the default permissions instead
+            os.chmod(self.tmp_path, 0o666 & ~UMASK)
+            self.file = os.fdopen(fd, "w", encoding="utf-8")
+        except BaseException:
+            os.close(fd)
+            os.remove(self.tmp_path)
+            raise
+        return self.file
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Closes the temporary file and replaces the output file if its content changed
+
+        The temporary file is discarded if an exception was raised while writing it.
+        """
+        self.file.close()
+        if exc_type is not None:
+            os.remove(self.tmp_path)
+        else:
+            self.changed = replace_if_changed(self.tmp_path, self.path)
+
+def replace_if_changed(tmp_path: str, path: str) -> bool:
+    """Atomically replaces a file by a temporary file if their contents differ, the temporary file being removed
+    otherwise
+
+    The permissions of the replaced file are kept.
+
+    :param tmp_path: path to the temporary file, located in the same directory as the replaced file
+    :type tmp_path: str
+
+    :param path: path to the replaced file
+    :type path: str
+
+    :returns: true if the file was replaced
+    :rtype: bool
+    """
+    if same_content(tmp_path, path):
+        os.remove(tmp_path)
+        return False
+    if os.path.isfile(path):
+        shutil.copymode(path, tmp_path)
+    os.replace(tmp_path, path)
+    return True
+
+def read_umask() -> int:
+    """Returns the file mode creation mask of the process
+
+    The mask is read from ``/proc/self/status`` where available. Otherwise, it can only be read by setting it, which
+    is racy if other threads create files at the same time.
+
+    :returns: the file mode creation mask
+    :rtype: int
+    """
+    try:
+        with open("/proc/self/status", encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except OSError:
+        pass
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+# File mode creation mask of the process, read once when the module is imported
+UMASK = read_umask()
+
+def same_content(file1: str, file2: str) -> bool:
+    """Compares the contents of two files by hash, files of different sizes being different
+
+    :param file1: path to the first file
+    :type file1: str
+
+    :param file2: path to the second file, which may not exist
+    :type file2: str
+
+    :returns: true if both files exist and have the same content
+    :rtype: bool
+    """
+    if not os.path.isfile(file2) or os.path.getsize(file1) != os.path.getsize(file2):
+        return False
+    return hash_file(file1) == hash_file(file2)
@@ -0,0 +1,370 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+#
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+#
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=line-too-long
+
+import os
+import re
+import glob
+
+from ecap5_treq.analysis import Analysis
+from ecap5_treq.html import STYLE, HtmlWriter
+from ecap5_treq.log import log_error
+from ecap5_treq.output import OutputFile
+from ecap5_treq.req import ReqStatus
+from ecap5_treq.report import REQ_CATEGORIES,                     \
+                              write_report_warning_section,       \
+                              write_report_summary,               \
+                              write_report_footer,                \
+                              write_test_summary_table,           \
+                              write_checks_table,                 \
+                              write_skipped_checks,               \
+                              write_unknown_checks,               \
+                              write_traceability_summary_table,   \
+                              write_reqs_table
+
+# Names of the files written in the site directory besides the pages of the testsuites and requirement categories
+SITE_INDEX = "index.html"
+SITE_STYLESHEET = "style.css"
+# Prefixes of the names of the pages of the testsuites and of the requirement categories
+TESTSUITE_PAGE_PREFIX = "testsuite-"
+CATEGORY_PAGE_PREFIX = "reqs-"
+
+class PageKind:
+    """Kinds of pages of the site besides the index
+    """
+    TESTSUITE = "testsuite"
+    CATEGORY = "category"
+
+# Analysis and site directory of the worker processes, set once per worker by init_worker
+worker_site = {}
+
+def write_site(analysis: Analysis, path: str, jobs: int = 1) -> int:
+    """Writes the report as a site made of an index page and of one page per testsuite and per requirement category
+
+    The index page contains the summary of the report and links to the other pages, the style being shared by the
+    pages in a stylesheet. The pages are written in parallel by jobs worker processes, only the pages which content
+    changed being replaced. The pages of the testsuites and requirement categories which no longer exist are removed.
+    Only the index page is written if error messages were logged.
+
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
+
+    :param path: path to the site directory, created if missing
+    :type path: str
+
+    :param jobs: number of worker processes writing the pages
+    :type jobs: int, optional
+
+    :returns: the number of files replaced
+    :rtype: int
+    """
+    os.makedirs(path, exist_ok=True)
+
+    pages = site_pages(analysis) if len(log_error.msgs) == 0 else {}
+    # Remove the pages of a previous report which are not part of this report
+    for file in glob.glob(os.path.join(path, TESTSUITE_PAGE_PREFIX + "*.html")) + \
+                glob.glob(os.path.join(path, CATEGORY_PAGE_PREFIX + "*.html")):
+        if os.path.basename(file) not in pages:
+            os.remove(file)
+
+    num_changes = 0
+    output = OutputFile(os.path.join(path, SITE_STYLESHEET))
+    with output as file:
+        file.write(STYLE)
+    num_changes += output.changed
+
+    output = OutputFile(os.path.join(path, SITE_INDEX))
+    with output as file:
+        doc = HtmlWriter(file, SITE_STYLESHEET)
+        doc.begin()
+        write_index_page(analysis, pages, doc)
+        doc.end()
+    num_changes += output.changed
+
+    if jobs <= 1 or len(pages) <= 1:
+        for name, page in pages.items():
+            num_changes += write_page(analysis, path, name, page)
+    else:
+        # The import of multiprocessing is only paid when a pool is required
+        from concurrent.futures import ProcessPoolExecutor
+
+        # The analysis is passed once to each worker instead of once per page
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pages)), initializer=init_worker, \
+                                 initargs=(analysis, path)) as executor:
+            num_changes += sum(executor.map(write_page_in_worker, pages.keys(), pages.values(), \
+                                            chunksize=max(1, len(pages) // (jobs * 4))))
+    return num_changes
+
+def site_pages(analysis: Analysis) -> dict[str, tuple[str, str]]:
+    """Lists the pages of the testsuites and requirement categories of the site
+
+    Testsuites which checks are all unknown and requirement categories without requirements have no page.
+
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
+
+    :returns: the kind and the name of the testsuite or the list of the analysis of each page indexed by file name
+    :rtype: dict[str, tuple[str, str]]
+    """
+    unknown_check_ids = {check.id for check in analysis.unknown_checks}
+    pages = {}
+    for testsuite, testcases in analysis.testsuites.items():
+        if any(check.id not in unknown_check_ids for checks in testcases.values() for check in checks):
+            pages[page_name(TESTSUITE_PAGE_PREFIX, testsuite, pages)] = (PageKind.TESTSUITE, testsuite)
+    for title, name in REQ_CATEGORIES:
+        if len(getattr(analysis, name)) > 0:
+            pages[page_name(CATEGORY_PAGE_PREFIX, title, pages)] = (PageKind.CATEGORY, name)
+    return pages
+
+def page_name(prefix: str, name: str, pages: dict[str, tuple[str, str]]) -> str:
+    """Returns the file name of a page, made unique by a number if another page has the same name
+
+    :param prefix: prefix of the file name
+    :type prefix: str
+
+    :param name: name of the testsuite or title of the requirement category of the page
+    :type name: str
+
+    :param pages: the pages already named
+    :type pages: dict[str, tuple[str, str]]
+
+    :returns: the file name of the page
+    :rtype: str
+    """
+    slug = prefix + re.sub(r"[^A-Za-z0-9_.-]+", "-", name).lower()
+    result = slug + ".html"
+    i = 2
+    while result in pages:
+        result = "{}-{}.html".format(slug, i)
+        i += 1
+    return result
+
+def write_page(analysis: Analysis, path: str, name: str, page: tuple[str, str]) -> bool:
+    """Writes a page of a testsuite or of a requirement category
+
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
+
+    :param path: path to the site directory
+    :type path: str
+
+    :param name: file name of the page
+    :type name: str
+
+    :param page: kind and name of the testsuite or of the list of the analysis of the page
+    :type page: tuple[str, str]
+
+    :returns: true if the page was replaced
+    :rtype: bool
+    """
+    kind, key = page
+    output = OutputFile(os.path.join(path, name))
+    with output as file:
+        doc = HtmlWriter(file, SITE_STYLESHEET)
+        doc.begin()
+        doc.paragraph("<a href=\"{}\">Back to summary</a>".format(SITE_INDEX))
+        if kind == PageKind.TESTSUITE:
+            write_testsuite_page(analysis, key, doc)
+        else:
+            write_category_page(analysis, key, doc)
+        doc.end()
+    return output.changed
+
+def init_worker(analysis: Analysis, path: str) -> None:
+    """Initializes a worker process writing pages
+
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
+
+    :param path: path to the site directory
+    :type path: str
+    """
+    worker_site["analysis"] = analysis
+    worker_site["path"] = path
+
+def write_page_in_worker(name: str, page: tuple[str, str]) -> bool:
+    """Writes a page in a worker process initialized by init_worker
+
+    :param name: file name of the page
+    :type name: str
+
+    :param page: kind and name of the testsuite or of the list of the analysis of the page
+    :type page: tuple[str, str]
+
+    :returns: true if the page was replaced
+    :rtype: bool
+    """
+    return write_page(worker_site["analysis"], worker_site["path"], name, page)
+
+def write_index_page(analysis: Analysis, pages: dict[str, tuple[str, str]], doc: HtmlWriter) -> None:
+    """Writes the content of the index page, linking to the pages of the testsuites and requirement categories
+
+    The counters link to the pages where the first failed check, untraceable, uncovered and unallocated requirements
+    are located instead of anchors of the index page.
+
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
+
+    :param pages: the pages of the site returned by site_pages
+    :type pages: dict[str, tuple[str, str]]
+
+    :param doc: document the page is written to
+    :type doc: HtmlWriter
+    """
+    write_report_warning_section(doc)
+    if len(log_error.msgs) > 0:
+        doc.write("\n")
+        doc.paragraph("Report generation failed.", strong=True)
+        return
+
+    testsuite_pages = {key: name for name, (kind, key) in pages.items() if kind == PageKind.TESTSUITE}
+    category_pages = {key: name for name, (kind, key) in pages.items() if kind == PageKind.CATEGORY}
+    anchor_pages = index_anchor_pages(analysis, testsuite_pages, category_pages)
+
+    write_report_summary(analysis, doc)
+
+    doc.write("\n")
+    doc.heading(2, "Test report", "test-report")
+    write_test_summary_table(analysis, doc, anchor_pages)
+
+    doc.write("\n")
+    doc.heading(3, "Testsuites")
+    doc.write("<table>\n")
+    doc.write("  <thead>\n")
+    doc.write("    <tr>\n")
+    doc.write("      <th>Testsuite</th>\n")
+    doc.write("      <th>Checks</th>\n")
+    doc.write("      <th>Failures</th>\n")
+    doc.write("      <th>Status</th>\n")
+    doc.write("    </tr>\n")
+    doc.write("  </thead>\n")
+    unknown_check_ids = {check.id for check in analysis.unknown_checks}
+    for testsuite, name in testsuite_pages.items():
+        checks = [check for checks in analysis.testsuites[testsuite].values() for check in checks \
+                    if check.id not in unknown_check_ids]
+        num_failed_checks = len([check for check in checks if not check.status])
+        doc.write("  <tr>\n")
+        doc.write("    <td><a href=\"{}\"><samp>{}</samp></a></td>\n".format(name, testsuite))
+        doc.write("    <td align=\"right\">{}</td>\n".format(len(checks)))
+        doc.write("    <td align=\"right\">{}</td>\n".format(num_failed_checks))
+        doc.write("    <td align=\"center\">{}</td>\n".format("✅" if num_failed_checks == 0 else "🚫"))
+        doc.write("  </tr>\n")
+    doc.write("</table>\n")
+
+    write_skipped_checks(analysis, doc)
+    write_unknown_checks(analysis, doc)
+
+    doc.write("\n")
+    doc.heading(2, "Traceability report", "traceability-report")
+    write_traceability_summary_table(analysis, doc, anchor_pages)
+
+    doc.write("\n")
+    doc.heading(3, "Requirements")
+    doc.write("<table>\n")
+    doc.write("  <thead>\n")
+    doc.write("    <tr>\n")
+    doc.write("      <th>Category</th>\n")
+    doc.write("      <th>Covered</th>\n")
+    doc.write("      <th>Untraceable</th>\n")
+    doc.write("      <th>Uncovered</th>\n")
+    doc.write("      <th>Total</th>\n")
+    doc.write("    </tr>\n")
+    doc.write("  </thead>\n")
+    for title, attribute in REQ_CATEGORIES:
+        if attribute in category_pages:
+            reqs = getattr(analysis, attribute)
+            doc.write("  <tr>\n")
+            doc.write("    <td><a href=\"{}\">{}</a></td>\n".format(category_pages[attribute], title))
+            for status in [ReqStatus.COVERED, ReqStatus.UNTRACEABLE, ReqStatus.UNCOVERED]:
+                doc.write("    <td align=\"right\">{}</td>\n".format(len([req for req in reqs if req.status == status])))
+            doc.write("    <td align=\"right\">{}</td>\n".format(len(reqs)))
+            doc.write("  </tr>\n")
+    doc.write("</table>\n")
+
+    write_report_footer(doc)
+
+def index_anchor_pages(analysis: Analysis, testsuite_pages: dict[str, str], category_pages: dict[str, str]) -> dict[str, str]:
+    """Locates the pages containing the anchors linked from the counters of the index page
+
+    The anchors of the skipped and unknown checks are located in the index page.
+
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
+
+    :param testsuite_pages: file name of the page of each testsuite
+    :type testsuite_pages: dict[str, str]
+
+    :param category_pages: file name of the page of each requirement category indexed by list of the analysis
+    :type category_pages: dict[str, str]
+
+    :returns: the file name of the page containing each anchor indexed by anchor id
+    :rtype: dict[str, str]
+    """
+    unknown_check_ids = {check.id for check in analysis.unknown_checks}
+    anchor_pages = {}
+    for testsuite, name in testsuite_pages.items():
+        if any(not check.status and check.id not in unknown_check_ids \
+               for checks in analysis.testsuites[testsuite].values() for check in checks):
+            anchor_pages["first-failed-check"] = name
+            break
+
+    for attribute, name in category_pages.items():
+        reqs = getattr(analysis, attribute)
+        if "untraceable-reqs" not in anchor_pages and any(req.status == ReqStatus.UNTRACEABLE for req in reqs):
+            anchor_pages["untraceable-reqs"] = name
+        if "uncovered-reqs" not in anchor_pages and any(req.status == ReqStatus.UNCOVERED for req in reqs):
+            anchor_pages["uncovered-reqs"] = name
+        if "first-unallocated-req" not in anchor_pages and any(not req.allocation for req in reqs):
+            anchor_pages["first-unallocated-req"] = name
+    return anchor_pages
+
+def write_testsuite_page(analysis: Analysis, testsuite: str, doc: HtmlWriter) -> None:
+    """Writes the content of the page of a testsuite
+
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
+
+    :param testsuite: name of the testsuite
+    :type testsuite: str
+
+    :param doc: document the page is written to
+    :type doc: HtmlWriter
+    """
+    doc.heading(1, "Testsuite <samp>{}</samp>".format(testsuite))
+    write_checks_table(analysis, [testsuite], doc)
+
+def write_category_page(analysis: Analysis, attribute: str, doc: HtmlWriter) -> None:
+    """Writes the content of the page of a requirement category
+
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
+
+    :param attribute: name of the list of the analysis containing the requirements of the category
+    :type attribute: str
+
+    :param doc: document the page is written to
+    :type doc: HtmlWriter
+    """
+    categories = [(title, name) for title, name in REQ_CATEGORIES if name == attribute]
+    doc.heading(1, categories[0][0])
+    for status in [ReqStatus.COVERED, ReqStatus.UNTRACEABLE, ReqStatus.UNCOVERED]:
+        write_reqs_table(analysis, status, categories, doc)
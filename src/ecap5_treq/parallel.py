@@ -0,0 +1,132 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+# 
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+# 
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import sys
+import contextlib
+from itertools import repeat
+from typing import Callable
+
+from ecap5_treq.log import log_imp, log_warn, log_error, log_clear
+from ecap5_treq.cache import Cache, cached_parse
+from ecap5_treq.profiling import profiler
+
+def parse_files(cache: Cache, kind: str, files: list[str], parse: Callable[[str], list], jobs: int = 1) -> list:
+    """Parses source files, distributing the parsing over a pool of processes when more than one job is requested
+
+    The records are returned in the order of the files and the messages logged while parsing are identical
+    to the ones logged when the files are parsed one after the other.
+
+    :param cache: the cache to use or None to always parse the files
+    :type cache: Cache
+
+    :param kind: kind of the source files
+    :type kind: str
+
+    :param files: paths to the source files
+    :type files: list[str]
+
+    :param parse: function parsing a source file
+    :type parse: Callable[[str], list]
+
+    :param jobs: maximum number of files parsed in parallel
+    :type jobs: int, optional
+
+    :returns: the records parsed from the source files
+    :rtype: list
+    """
+    records = []
+    profiler.count("files_scanned", len(files))
+    if jobs <= 1:
+        for file in files:
+            records += cached_parse(cache, kind, file, parse)
+        return records
+
+    # Cached entries are only replayed once all the files have been parsed to preserve the order of messages
+    entries = [cache.lookup(kind, file) if cache else None for file in files]
+    pending = [file for file, entry in zip(files, entries) if entry is None]
+    if cache:
+        profiler.count("cache_hits", len(files) - len(pending))
+        profiler.count("cache_misses", len(pending))
+    for file in pending:
+        profiler.count_file(file)
+
+    results = {}
+    if len(pending) > 0:
+        # The import of multiprocessing is only paid when a pool is required
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as executor:
+            results = dict(zip(pending, executor.map(parse_in_worker, repeat(parse), pending)))
+
+    for file, entry in zip(files, entries):
+        if entry is not None:
+            for msg in entry["warnings"]:
+                log_warn(msg)
+            records += entry["records"]
+        else:
+            file_records, warnings = replay_worker_result(results[file])
+            if cache:
+                cache.set(kind, file, file_records, warnings)
+            records += file_records
+    return records
+
+def parse_in_worker(parse: Callable[[str], list], file: str) -> tuple:
+    """Parses a source file in a worker process, capturing the messages logged while parsing
+
+    :param parse: function parsing the source file
+    :type parse: Callable[[str], list]
+
+    :param file: path to the source file
+    :type file: str
+
+    :returns: a tuple containing the records, the messages logged for each level, the printed log output
+              and the exit code if parsing was interrupted
+    :rtype: tuple
+    """
+    log_clear()
+    records = []
+    exit_code = None
+    with contextlib.redirect_stderr(io.StringIO()) as output:
+        try:
+            records = parse(file)
+        except SystemExit as excp:
+            # Parsing is interrupted on critical errors, which shall be reported by the main process
+            exit_code = excp.code
+    return records, log_imp.msgs, log_warn.msgs, log_error.msgs, output.getvalue(), exit_code
+
+def replay_worker_result(result: tuple) -> tuple[list, list[str]]:
+    """Logs the messages captured in a worker process as if the file had been parsed in the main process
+
+    :param result: the tuple returned by parse_in_worker
+    :type result: tuple
+
+    :returns: a tuple containing the records and the warnings logged while parsing
+    :rtype: tuple[list, list[str]]
+    """
+    records, imps, warnings, errors, output, exit_code = result
+    sys.stderr.write(output)
+    log_imp.msgs += imps
+    log_warn.msgs += warnings
+    log_error.msgs += errors
+    if exit_code is not None:
+        sys.exit(exit_code)
+    return records, warnings
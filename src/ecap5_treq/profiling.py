@@ -0,0 +1,226 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+#
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+#
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import json
+import time
+import contextlib
+from typing import Iterator
+
+class Stage:
+    """A Stage records the resources used by a step of a command
+    """
+
+    def __init__(self, name: str, depth: int, start: float):
+        """Constructor of Stage
+
+        :param name: name of the stage
+        :type name: str
+
+        :param depth: number of enclosing stages
+        :type depth: int
+
+        :param start: time at which the stage started, relative to the start of the profiler in seconds
+        :type start: float
+        """
+        self.name = name
+        self.depth = depth
+        self.start = start
+        self.wall_time = 0
+        self.cpu_time = 0
+        self.peak_memory = 0
+        # Counters indexed by name, e.g. files scanned, bytes read or records produced
+        self.counters = {}
+
+    def to_dict(self) -> dict:
+        """Converts the stage to a dictionary
+
+        :returns: a dictionary of the measures of the stage
+        :rtype: dict
+        """
+        return {
+            "name": self.name,
+            "depth": self.depth,
+            "start": self.start,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "peak_memory": self.peak_memory,
+            "counters": self.counters
+        }
+
+class Profiler:
+    """A Profiler records the wall time, CPU time, peak memory and counters of the stages of a command
+
+    Stages can be nested, the resources used by a stage including the ones used by its nested stages. Counters are
+    added to the innermost running stage. The profiler does nothing until it is started so that the stages and
+    counters can be recorded unconditionally.
+
+    The memory is traced with tracemalloc, which only traces the allocations of the current process and slows the
+    allocations down. The CPU time of the worker processes is not measured either.
+    """
+
+    def __init__(self):
+        """Constructor of Profiler
+        """
+        self.enabled = False
+        # True if the memory is traced, tracemalloc only being imported in that case to keep the startup fast
+        self.trace_memory = False
+        self.origin = 0
+        # Stages in the order of their start
+        self.stages = []
+        # Running stages, the innermost stage being the last
+        self.running = []
+
+    def start(self, trace_memory: bool = True) -> None:
+        """Starts recording the stages, previous stages being discarded
+
+        :param trace_memory: enables the tracing of the memory allocations
+        :type trace_memory: bool, optional
+        """
+        self.enabled = True
+        self.origin = time.perf_counter()
+        self.stages = []
+        self.running = []
+        self.trace_memory = trace_memory
+        if trace_memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    def stop(self) -> None:
+        """Stops recording the stages, the recorded stages being kept
+        """
+        self.enabled = False
+        if self.trace_memory:
+            import tracemalloc
+            tracemalloc.stop()
+            self.trace_memory = False
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[Stage]:
+        """Records a stage for the duration of the context
+
+        :param name: name of the stage
+        :type name: str
+
+        :returns: the recorded stage, or None if the profiler is not started
+        :rtype: Iterator[Stage]
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        stage = Stage(name, len(self.running), time.perf_counter() - self.origin)
+        self.stages += [stage]
+        # The peak of the enclosing stage is saved before being reset for the nested stage
+        self.update_peak_memory()
+        if self.trace_memory:
+            import tracemalloc
+            tracemalloc.reset_peak()
+        self.running += [stage]
+
+        start_cpu_time = time.process_time()
+        try:
+            yield stage
+        finally:
+            stage.wall_time = time.perf_counter() - self.origin - stage.start
+            stage.cpu_time = time.process_time() - start_cpu_time
+            self.update_peak_memory()
+            self.running.pop()
+            if len(self.running) > 0:
+                self.running[-1].peak_memory = max(self.running[-1].peak_memory, stage.peak_memory)
+
+    def update_peak_memory(self) -> None:
+        """Updates the peak memory of the innermost running stage with the peak since the last reset
+        """
+        if len(self.running) > 0 and self.trace_memory:
+            import tracemalloc
+            self.running[-1].peak_memory = max(self.running[-1].peak_memory, tracemalloc.get_traced_memory()[1])
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Adds a value to a counter of the innermost running stage
+
+        :param name: name of the counter
+        :type name: str
+
+        :param value: value added to the counter
+        :type value: int, optional
+        """
+        if len(self.running) > 0:
+            counters = self.running[-1].counters
+            counters[name] = counters.get(name, 0) + value
+
+    def count_file(self, file: str) -> None:
+        """Counts a file read and its size
+
+        :param file: path to the file read
+        :type file: str
+        """
+        if len(self.running) > 0:
+            self.count("files_read")
+            self.count("bytes_read", os.path.getsize(file))
+
+    def summary(self) -> str:
+        """Formats the recorded stages as a table, nested stages being indented
+
+        :returns: the table of the recorded stages
+        :rtype: str
+        """
+        lines = ["{:<32}{:>10}{:>10}{:>12}  {}".format("stage", "wall (s)", "cpu (s)", "peak (MB)", "counters")]
+        for stage in self.stages:
+            counters = ", ".join("{}={}".format(name, value) for name, value in stage.counters.items())
+            lines += ["{:<32}{:>10.3f}{:>10.3f}{:>12.1f}  {}".format("  " * stage.depth + stage.name, stage.wall_time, \
+                        stage.cpu_time, stage.peak_memory / 1e6, counters).rstrip()]
+        return "\n".join(lines)
+
+    def to_json(self) -> str:
+        """Converts the recorded stages to JSON
+
+        :returns: a JSON array of the recorded stages with durations in seconds and memory in bytes
+        :rtype: str
+        """
+        return json.dumps([stage.to_dict() for stage in self.stages], indent=2)
+
+    def to_chrome_trace(self) -> str:
+        """Converts the recorded stages to the Chrome trace event format
+
+        The trace can be opened in chrome://tracing or in Perfetto, each stage being a complete event which arguments
+        are its CPU time, peak memory and counters.
+
+        :returns: a JSON trace with durations in microseconds
+        :rtype: str
+        """
+        events = []
+        for stage in self.stages:
+            events += [{
+                "name": stage.name,
+                "cat": "ecap5-treq",
+                "ph": "X",
+                "ts": int(stage.start * 1e6),
+                "dur": int(stage.wall_time * 1e6),
+                "pid": os.getpid(),
+                "tid": 0,
+                "args": dict(stage.counters, cpu_time=stage.cpu_time, peak_memory=stage.peak_memory)
+            }]
+        return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"})
+
+# Profiler shared by the modules recording stages and counters
+profiler = Profiler()
@@ -21,30 +21,133 @@
 
 # pylint: disable=line-too-long
 
+import io
 import re
 import colorsys
+from typing import TextIO
 
-from ecap5_treq.analysis import Analysis 
+from ecap5_treq.analysis import Analysis, ResultsSummary
+from ecap5_treq.document import AlertKind, DocumentWriter
+from ecap5_treq.html import HtmlWriter
 from ecap5_treq.req import Req, ReqStatus
 from ecap5_treq.log import log_error, log_imp, log_warn
+from ecap5_treq.profiling import profiler
+
+# Categories of requirements, with the name of the list of the analysis where their requirements are stored
+REQ_CATEGORIES = [("User Requirements", "user_reqs"), \
+                  ("External Interface Requirements", "external_interface_reqs"), \
+                  ("Functional Requirements", "functional_reqs"), \
+                  ("Architecture Requirements", "architecture_reqs"), \
+                  ("Design Requirements", "design_reqs"), \
+                  ("Non-Functional Requirements", "non_functional_reqs"), \
+                  ("Other Requirements", "other_reqs")]
+# Title, anchor id and specific columns of the table of the requirements of each status
+REQ_STATUS_TABLES = {
+    ReqStatus.COVERED: ("Covered requirements", None, ["Covered by", "Tested by", "Test results"]),
+    ReqStatus.UNTRACEABLE: ("Untraceable requirements", "untraceable-reqs", ["Justification"]),
+    ReqStatus.UNCOVERED: ("Uncovered requirements", "uncovered-reqs", [])
+}
+
+def write_report(analysis: Analysis, out: TextIO, html: bool = False) -> None:
+    """Writes the full test and traceability report
+
+    Only the warning section is written if error messages were logged. The html report is rendered directly from the
+    blocks of the report, without converting the markdown report.
 
-def generate_report_warning_section() -> str:
-    """Generates a string containing messages logged in this tool during the report generation
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
 
-    :returns: a string containing messages logged in this tool during the report generation
+    :param out: file-like object the report is written to
+    :type out: TextIO
+
+    :param html: true if the report is written as an html page instead of markdown
+    :type html: bool, optional
+    """
+    doc = HtmlWriter(out) if html else DocumentWriter(out)
+    doc.begin()
+    write_report_warning_section(doc)
+    # Only output the full report if there are no error messages
+    if len(log_error.msgs) > 0:
+        doc.write("\n")
+        doc.paragraph("Report generation failed.", strong=True)
+    else:
+        with profiler.stage("report_summary"):
+            write_report_summary(analysis, doc)
+        with profiler.stage("test_report"):
+            write_test_report(analysis, doc)
+        with profiler.stage("traceability_report"):
+            write_traceability_report(analysis, doc)
+        write_report_footer(doc)
+    doc.end()
+
+def generate_report(analysis: Analysis, html: bool = False) -> str:
+    """Generates a string containing the full test and traceability report
+
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
+
+    :param html: true if the report is generated as an html page instead of markdown
+    :type html: bool, optional
+
+    :returns: a string containing the full test and traceability report
     :rtype: str
     """
-    report = ""
+    out = io.StringIO()
+    write_report(analysis, out, html)
+    return out.getvalue()
+
+def write_report_warning_section(doc: DocumentWriter) -> None:
+    """Writes messages logged in this tool during the report generation
+
+    :param doc: document the section is written to
+    :type doc: DocumentWriter
+    """
     for msg in log_error.msgs:
-        report += "\n> [!CAUTION]\n"
-        report += "> <samp>{}</samp>\n".format(msg)
+        doc.alert(AlertKind.CAUTION, "<samp>{}</samp>".format(msg))
     for msg in log_imp.msgs:
-        report += "\n> [!IMPORTANT]\n"
-        report += "> <samp>{}</samp>\n".format(msg)
+        doc.alert(AlertKind.IMPORTANT, "<samp>{}</samp>".format(msg))
     for msg in log_warn.msgs:
-        report += "\n> [!WARNING]\n"
-        report += "> <samp>{}</samp>\n".format(msg)
-    return report
+        doc.alert(AlertKind.WARNING, "<samp>{}</samp>".format(msg))
+
+def generate_report_warning_section() -> str:
+    """Generates a string containing messages logged in this tool during the report generation
+
+    :returns: a string containing messages logged in this tool during the report generation
+    :rtype: str
+    """
+    out = io.StringIO()
+    write_report_warning_section(DocumentWriter(out))
+    return out.getvalue()
+
+def write_report_summary(analysis: Analysis, doc: DocumentWriter) -> None:
+    """Writes the summary section of the report
+
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
+
+    :param doc: document the section is written to
+    :type doc: DocumentWriter
+    """
+    doc.heading(1, "Summary", "summary")
+
+    test_result_icon = "✅" if analysis.test_result == 100 else "🚫"
+    traceability_result_icon = "✅" if analysis.traceability_result == 100 else "🚫"
+    doc.write("<table>\n")
+    doc.write("  <tr>\n")
+    doc.write("    <td>{}</td>\n".format(test_result_icon))
+    doc.write("    <td>\n")
+    doc.write("      <a href=\"#test-report\">Test report</a>\n")
+    doc.write("    </td>\n")
+    doc.write("    <td align=\"right\">{}</td>\n".format(str(analysis.test_result) + "%"))
+    doc.write("  </tr>\n")
+    doc.write("  <tr>\n")
+    doc.write("    <td>{}</td>\n".format(traceability_result_icon))
+    doc.write("    <td>\n")
+    doc.write("      <a href=\"#traceability-report\">Traceability report</a>\n")
+    doc.write("    </td>\n")
+    doc.write("    <td align=\"right\">{}</td>\n".format(str(analysis.traceability_result) + "%"))
+    doc.write("  </tr>\n")
+    doc.write("</table>\n")
 
 def generate_report_summary(analysis: Analysis) -> str:
     """Generates a string containing the summary section of the report
@@ -55,130 +158,279 @@ def generate_report_summary(analysis: Analysis) -> str:
     :returns: a string containing the summary section of the report
     :rtype: str
     """
-    report = "# <a id=\"summary\"></a> Summary\n"
+    out = io.StringIO()
+    write_report_summary(analysis, DocumentWriter(out))
+    return out.getvalue()
 
-    test_result_icon = "✅" if analysis.test_result == 100 else "🚫"
-    traceability_result_icon = "✅" if analysis.traceability_result == 100 else "🚫"
-    report += "<table>\n"
-    report += "  <tr>\n"
-    report += "    <td>{}</td>\n".format(test_result_icon)
-    report += "    <td>\n"
-    report += "      <a href=\"#test-report\">Test report</a>\n"
-    report += "    </td>\n"
-    report += "    <td align=\"right\">{}</td>\n".format(str(analysis.test_result) + "%")
-    report += "  </tr>\n"
-    report += "  <tr>\n"
-    report += "    <td>{}</td>\n".format(traceability_result_icon)
-    report += "    <td>\n"
-    report += "      <a href=\"#traceability-report\">Traceability report</a>\n"
-    report += "    </td>\n"
-    report += "    <td align=\"right\">{}</td>\n".format(str(analysis.traceability_result) + "%")
-    report += "  </tr>\n"
-    report += "</table>\n"
-
-    return report
+def write_test_report(analysis: Analysis, doc: DocumentWriter) -> None:
+    """Writes the test section of the report
 
-def generate_test_report(analysis: Analysis) -> str:
-    """Generates a string containing the test section of the report
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
+
+    :param doc: document the section is written to
+    :type doc: DocumentWriter
+    """
+    doc.write("\n")
+    doc.heading(2, "Test report", "test-report")
+    write_test_summary_table(analysis, doc)
+
+    doc.write("\n")
+    doc.heading(3, "Run tests")
+    doc.write("\n")
+    write_checks_table(analysis, analysis.testsuites, doc)
+
+    write_skipped_checks(analysis, doc)
+    write_unknown_checks(analysis, doc)
+
+def write_test_summary_table(analysis: Analysis, doc: DocumentWriter, pages: dict[str, str] = None) -> None:
+    """Writes the table of the test counters
 
     :param analysis: the analysis from which data shall be used
     :type analysis: Analysis
 
-    :returns: a string containing the test section of the report
-    :rtype: str
+    :param doc: document the table is written to
+    :type doc: DocumentWriter
+
+    :param pages: page of the anchors linked from the table indexed by anchor id, the anchors being in the same page
+                  if not provided
+    :type pages: dict[str, str], optional
+    """
+    doc.write("<table>\n")
+    doc.write("  <thead>\n")
+    doc.write("    <tr>\n")
+    doc.write("      <th></th>\n")
+    doc.write("      <th>Success</th>\n")
+    doc.write("      <th>Failure</th>\n")
+    doc.write("      <th>Skipped</th>\n")
+    doc.write("      <th>Unknown</th>\n")
+    doc.write("      <th>Total</th>\n")
+    doc.write("    </tr>\n")
+    doc.write("  </thead>\n")
+    doc.write("  <tr>\n")
+    doc.write("    <td>Tests</td>\n")
+    doc.write("    <td align=\"right\">{}</td>\n".format(analysis.num_successfull_checks - analysis.num_successfull_unknown_checks))
+    doc.write("    <td align=\"right\">{}</td>\n".format(surround_with_link_if(analysis.num_failed_checks > 0, anchor_href("first-failed-check", pages), str(analysis.num_failed_checks - analysis.num_failed_unknown_checks))))
+    doc.write("    <td align=\"right\">{}</td>\n".format(surround_with_link_if(len(analysis.skipped_checks) > 0, anchor_href("skipped-checks", pages), str(len(analysis.skipped_checks)))))
+    doc.write("    <td align=\"right\">{}</td>\n".format(surround_with_link_if(len(analysis.unknown_checks) > 0, anchor_href("unknown-checks", pages), str(len(analysis.unknown_checks)))))
+    doc.write("    <td align=\"right\">{}</td>\n".format(len(analysis.checks) - len(analysis.unknown_checks)))
+    doc.write("  </tr>\n")
+    doc.write("</table>\n")
+
+def write_checks_table(analysis: Analysis, testsuites: list[str], doc: DocumentWriter) -> None:
+    """Writes the table of the checks of testsuites with their status
+
+    An anchor is placed on the first failed check of the table.
+
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
+
+    :param testsuites: names of the testsuites which checks are written
+    :type testsuites: list[str]
+
+    :param doc: document the table is written to
+    :type doc: DocumentWriter
     """
-    report = "\n## <a id=\"test-report\"></a> Test report\n"
-    report += "<table>\n"
-    report += "  <thead>\n"
-    report += "    <tr>\n"
-    report += "      <th></th>\n"
-    report += "      <th>Success</th>\n"
-    report += "      <th>Failure</th>\n"
-    report += "      <th>Skipped</th>\n"
-    report += "      <th>Unknown</th>\n"
-    report += "      <th>Total</th>\n"
-    report += "    </tr>\n"
-    report += "  </thead>\n"
-    report += "  <tr>\n"
-    report += "    <td>Tests</td>\n"
-    report += "    <td align=\"right\">{}</td>\n".format(analysis.num_successfull_checks - analysis.num_successfull_unknown_checks)
-    report += "    <td align=\"right\">{}</td>\n".format(surround_with_link_if(analysis.num_failed_checks > 0, "#first-failed-check", str(analysis.num_failed_checks - analysis.num_failed_unknown_checks)))
-    report += "    <td align=\"right\">{}</td>\n".format(surround_with_link_if(len(analysis.skipped_checks) > 0, "#skipped-checks", str(len(analysis.skipped_checks))))
-    report += "    <td align=\"right\">{}</td>\n".format(surround_with_link_if(len(analysis.unknown_checks) > 0, "#unknown-checks", str(len(analysis.unknown_checks))))
-    report += "    <td align=\"right\">{}</td>\n".format(len(analysis.checks) - len(analysis.unknown_checks))
-    report += "  </tr>\n"
-    report += "</table>\n"
-
-    report += "\n### Run tests\n\n"
-    report += "<table>\n"
-    report += "  <thead>\n"
-    report += "    <tr>\n"
-    report += "      <th>Testsuite</th>\n"
-    report += "      <th>Testcase</th>\n"
-    report += "      <th>Check ID</th>\n"
-    report += "      <th>Status</th>\n"
-    report += "      <th>Log</th>\n"
-    report += "    </tr>\n"
-    report += "  </thead>\n"
+    doc.write("<table>\n")
+    doc.write("  <thead>\n")
+    doc.write("    <tr>\n")
+    doc.write("      <th>Testsuite</th>\n")
+    doc.write("      <th>Testcase</th>\n")
+    doc.write("      <th>Check ID</th>\n")
+    doc.write("      <th>Status</th>\n")
+    doc.write("      <th>Log</th>\n")
+    doc.write("    </tr>\n")
+    doc.write("  </thead>\n")
 
     # Checks table
     failed_test_anchor_placed = False
-    for testsuite in analysis.testsuites:
+    # The unknown checks are indexed once so that skipping them does not scan the list for every row
+    unknown_check_ids = {check.id for check in analysis.unknown_checks}
+    for testsuite in testsuites:
         for i, testcase in enumerate(analysis.testsuites[testsuite]):
             for j, check in enumerate(analysis.testsuites[testsuite][testcase]):
                 # Skip checks that are unknown
-                if check not in analysis.unknown_checks:
+                if check.id not in unknown_check_ids:
                     check_status_icon = "✅" if check.status else "🚫"
-                    report += "  <tr>\n"
+                    doc.write("  <tr>\n")
                     # Insert the name of the testsuite on the first row of each test suite
                     if i == 0 and j == 0:
-                        report += "    <td rowspan=\"{}\">\n".format(analysis.num_checks_in_testsuites[testsuite])
-                        report += "      <samp>{}</samp>\n".format(testsuite)
-                        report += "    </td>\n"
+                        doc.write("    <td rowspan=\"{}\">\n".format(analysis.num_checks_in_testsuites[testsuite]))
+                        doc.write("      <samp>{}</samp>\n".format(testsuite))
+                        doc.write("    </td>\n")
                     # Insert the name of the testcase on the first row of each testcase
                     if j == 0:
-                        report += "    <td rowspan=\"{}\">\n".format(len(analysis.testsuites[testsuite][testcase]))
-                        report += "      <samp>{}</samp>\n".format(testcase)
-                        report += "    </td>\n"
-                    report += "    <td>\n"
-                    report += "      <samp>{}</samp>\n".format(check.id)
-                    report += "    </td>\n"
-                    report += "    <td align=\"center\">\n"
+                        doc.write("    <td rowspan=\"{}\">\n".format(len(analysis.testsuites[testsuite][testcase])))
+                        doc.write("      <samp>{}</samp>\n".format(testcase))
+                        doc.write("    </td>\n")
+                    doc.write("    <td>\n")
+                    doc.write("      <samp>{}</samp>\n".format(check.id))
+                    doc.write("    </td>\n")
+                    doc.write("    <td align=\"center\">\n")
                     # Insert a specific anchor on the first failed check to easily jump to it
                     if not check.status and not failed_test_anchor_placed:
-                        report += "      <a id=\"first-failed-check\"></a>"
+                        doc.write("      <a id=\"first-failed-check\"></a>")
                         failed_test_anchor_placed = True
-                    report += "      {}\n".format(check_status_icon)
-                    report += "    </td>\n"
-                    report += "    <td>{}</td>\n".format(check.error_msg if check.error_msg else "")
-                    report += "  </tr>\n"
-    report += "</table>\n"
+                    doc.write("      {}\n".format(check_status_icon))
+                    doc.write("    </td>\n")
+                    doc.write("    <td>{}</td>\n".format(check.error_msg if check.error_msg else ""))
+                    doc.write("  </tr>\n")
+    doc.write("</table>\n")
+
+def write_skipped_checks(analysis: Analysis, doc: DocumentWriter) -> None:
+    """Writes the table of the skipped checks if any
 
-    # Handle skipped checks if any
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
+
+    :param doc: document the table is written to
+    :type doc: DocumentWriter
+    """
     if len(analysis.skipped_checks) > 0:
-        report += "\n### <a id=\"skipped-checks\"></a> Skipped tests\n\n"
-        report += "<table>\n"
+        doc.write("\n")
+        doc.heading(3, "Skipped tests", "skipped-checks")
+        doc.write("\n")
+        doc.write("<table>\n")
         for check in analysis.skipped_checks:
-            report += "  <tr>\n"
-            report += "    <td>\n"
-            report += "      <samp>{}</samp>\n".format(check.id)
-            report += "    </td>\n"
-            report += "  </tr>\n"
-        report += "</table>\n"
-
-    # Handle unknown checks if any
+            doc.write("  <tr>\n")
+            doc.write("    <td>\n")
+            doc.write("      <samp>{}</samp>\n".format(check.id))
+            doc.write("    </td>\n")
+            doc.write("  </tr>\n")
+        doc.write("</table>\n")
+
+def write_unknown_checks(analysis: Analysis, doc: DocumentWriter) -> None:
+    """Writes the table of the unknown checks if any
+
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
+
+    :param doc: document the table is written to
+    :type doc: DocumentWriter
+    """
     if len(analysis.unknown_checks) > 0:
-        report += "\n### <a id=\"unknown-checks\"></a> Unknown tests\n"
-        report += "<table>\n"
+        doc.write("\n")
+        doc.heading(3, "Unknown tests", "unknown-checks")
+        doc.write("<table>\n")
         for check in analysis.unknown_checks:
-            report += "  <tr>\n"
-            report += "    <td>\n"
-            report += "      <samp>{}</samp>\n".format(check.id)
-            report += "    </td>\n"
-            report += "  </tr>\n"
-        report += "</table>\n"
+            doc.write("  <tr>\n")
+            doc.write("    <td>\n")
+            doc.write("      <samp>{}</samp>\n".format(check.id))
+            doc.write("    </td>\n")
+            doc.write("  </tr>\n")
+        doc.write("</table>\n")
+
+def generate_test_report(analysis: Analysis) -> str:
+    """Generates a string containing the test section of the report
+
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
+
+    :returns: a string containing the test section of the report
+    :rtype: str
+    """
+    out = io.StringIO()
+    write_test_report(analysis, DocumentWriter(out))
+    return out.getvalue()
 
-    return report
+def write_traceability_report(analysis: Analysis, doc: DocumentWriter) -> None:
+    """Writes the traceability section of the report
+
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
+
+    :param doc: document the section is written to
+    :type doc: DocumentWriter
+    """
+    doc.write("\n")
+    doc.heading(2, "Traceability report", "traceability-report")
+    write_traceability_summary_table(analysis, doc)
+
+    for status in [ReqStatus.COVERED, ReqStatus.UNTRACEABLE, ReqStatus.UNCOVERED]:
+        write_reqs_table(analysis, status, REQ_CATEGORIES, doc)
+
+def write_traceability_summary_table(analysis: Analysis, doc: DocumentWriter, pages: dict[str, str] = None) -> None:
+    """Writes the table of the requirement counters
+
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
+
+    :param doc: document the table is written to
+    :type doc: DocumentWriter
+
+    :param pages: page of the anchors linked from the table indexed by anchor id, the anchors being in the same page
+                  if not provided
+    :type pages: dict[str, str], optional
+    """
+    doc.write("<table>\n")
+    doc.write("  <thead>\n")
+    doc.write("    <tr>\n")
+    doc.write("      <th></th>\n")
+    doc.write("      <th>Covered</th>\n")
+    doc.write("      <th>Untraceable</th>\n")
+    doc.write("      <th>Uncovered</th>\n")
+    doc.write("      <th>Allocated</th>\n" if analysis.enable_allocation else "")
+    doc.write("      <th>Unallocated</th>\n" if analysis.enable_allocation else "")
+    doc.write("      <th>Total</th>\n")
+    doc.write("    </tr>\n")
+    doc.write("  </thead>\n")
+    doc.write("  <tr>\n")
+    doc.write("    <td>Requirements</td>\n")
+    doc.write("    <td align=\"right\">{}</td>\n".format(analysis.num_covered_reqs))
+    doc.write("    <td align=\"right\">{}</td>\n".format(surround_with_link_if(analysis.num_untraceable_reqs > 0, anchor_href("untraceable-reqs", pages), str(analysis.num_untraceable_reqs))))
+    doc.write("    <td align=\"right\">{}</td>\n".format(surround_with_link_if(analysis.num_uncovered_reqs > 0, anchor_href("uncovered-reqs", pages), str(analysis.num_uncovered_reqs))))
+    doc.write(("    <td align=\"right\">{}</td>\n".format(analysis.num_allocated_reqs)) if analysis.enable_allocation else "")
+    doc.write(("    <td align=\"right\">{}</td>\n".format(surround_with_link_if((len(analysis.reqs) - analysis.num_allocated_reqs) > 0, anchor_href("first-unallocated-req", pages), len(analysis.reqs) - analysis.num_allocated_reqs))) if analysis.enable_allocation else "")
+    doc.write("    <td align=\"right\">{}</td>\n".format(len(analysis.reqs)))
+    doc.write("  </tr>\n")
+    doc.write("</table>\n")
+
+def write_reqs_table(analysis: Analysis, status: ReqStatus, categories: list[tuple[str, str]], \
+                     doc: DocumentWriter) -> None:
+    """Writes the table of the requirements of categories with a given status, grouped by category
+
+    Nothing is written if no requirement of the categories has the status.
+
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
+
+    :param status: status of the requirements
+    :type status: ReqStatus
+
+    :param categories: title and name of the list of the analysis of each category, e.g. taken from REQ_CATEGORIES
+    :type categories: list[tuple[str, str]]
+
+    :param doc: document the table is written to
+    :type doc: DocumentWriter
+    """
+    # Get lists of requirements with the status based on their type
+    filtered_reqs = [(title, [req for req in getattr(analysis, name) if req.status == status]) \
+                        for title, name in categories]
+    if sum(len(reqs) for _, reqs in filtered_reqs) == 0:
+        return
+
+    title, anchor, columns = REQ_STATUS_TABLES[status]
+    colspan = 3 + (1 if analysis.enable_allocation else 0) + len(columns)
+
+    doc.write("\n")
+    doc.heading(3, title, anchor)
+    doc.write("<table>\n")
+    doc.write("  <thead>\n")
+    doc.write("    <tr>\n")
+    doc.write("      <th>Requirement</th>\n")
+    doc.write("      <th>Description</th>\n")
+    doc.write("      <th>Derived from</th>\n")
+    doc.write("      <th>Allocated to</th>\n" if analysis.enable_allocation else "")
+    for column in columns:
+        doc.write("      <th>{}</th>\n".format(column))
+    doc.write("    </tr>\n")
+    doc.write("  </thead>\n")
+    # Add rows for each type of requirements
+    for category_title, reqs in filtered_reqs:
+        if len(reqs) > 0:
+            doc.write("  <thead><tr><th colspan=\"{}\"><i>{}</i></th></tr></thead>\n".format(colspan, category_title))
+            write_req_list_table_rows(analysis, reqs, doc)
+    doc.write("</table>\n")
 
 def generate_traceability_report(analysis: Analysis) -> str:
     """Generates a string containing the traceability section of the report
@@ -189,176 +441,17 @@ def generate_traceability_report(analysis: Analysis) -> str:
     :returns: a string containing the traceability section of the report
     :rtype: str
     """
-    report = "\n## <a id=\"traceability-report\"></a> Traceability report\n"
-    report += "<table>\n"
-    report += "  <thead>\n"
-    report += "    <tr>\n"
-    report += "      <th></th>\n"
-    report += "      <th>Covered</th>\n"
-    report += "      <th>Untraceable</th>\n"
-    report += "      <th>Uncovered</th>\n"
-    report += "      <th>Allocated</th>\n" if analysis.enable_allocation else ""
-    report += "      <th>Unallocated</th>\n" if analysis.enable_allocation else ""
-    report += "      <th>Total</th>\n"
-    report += "    </tr>\n"
-    report += "  </thead>\n"
-    report += "  <tr>\n"
-    report += "    <td>Requirements</td>\n"
-    report += "    <td align=\"right\">{}</td>\n".format(analysis.num_covered_reqs)
-    report += "    <td align=\"right\">{}</td>\n".format(surround_with_link_if(analysis.num_untraceable_reqs > 0, "#untraceable-reqs", str(analysis.num_untraceable_reqs)))
-    report += "    <td align=\"right\">{}</td>\n".format(surround_with_link_if(analysis.num_uncovered_reqs > 0, "#uncovered-reqs", str(analysis.num_uncovered_reqs)))
-    report += ("    <td align=\"right\">{}</td>\n".format(analysis.num_allocated_reqs)) if analysis.enable_allocation else ""
-    report += ("    <td align=\"right\">{}</td>\n".format(surround_with_link_if((len(analysis.reqs) - analysis.num_allocated_reqs) > 0, "#first-unallocated-req", len(analysis.reqs) - analysis.num_allocated_reqs))) if analysis.enable_allocation else ""
-    report += "    <td align=\"right\">{}</td>\n".format(len(analysis.reqs))
-    report += "  </tr>\n"
-    report += "</table>\n"
-
-    # Handle covered requirements if any
-    if analysis.num_covered_reqs > 0:
-        # Get lists of covered requirements based on their type
-        filtered_user_reqs               = list(filter(lambda r: r.status == ReqStatus.COVERED, analysis.user_reqs))
-        filtered_external_interface_reqs = list(filter(lambda r: r.status == ReqStatus.COVERED, analysis.external_interface_reqs))
-        filtered_functional_reqs         = list(filter(lambda r: r.status == ReqStatus.COVERED, analysis.functional_reqs))
-        filtered_architecture_reqs       = list(filter(lambda r: r.status == ReqStatus.COVERED, analysis.architecture_reqs))
-        filtered_design_reqs             = list(filter(lambda r: r.status == ReqStatus.COVERED, analysis.design_reqs))
-        filtered_non_functional_reqs     = list(filter(lambda r: r.status == ReqStatus.COVERED, analysis.non_functional_reqs))
-        filtered_other_reqs              = list(filter(lambda r: r.status == ReqStatus.COVERED, analysis.other_reqs))
-        
-        colspan = 7 if analysis.enable_allocation else 6
-
-        report += "\n### Covered requirements\n"
-        report += "<table>\n"
-        report += "  <thead>\n"
-        report += "    <tr>\n"
-        report += "      <th>Requirement</th>\n"
-        report += "      <th>Description</th>\n"
-        report += "      <th>Derived from</th>\n"
-        report += "      <th>Allocated to</th>\n" if analysis.enable_allocation else ""
-        report += "      <th>Covered by</th>\n"
-        report += "      <th>Tested by</th>\n"
-        report += "      <th>Test results</th>\n"
-        report += "    </tr>\n"
-        report += "  </thead>\n"
-        # Add rows for each type of covered requirements
-        if len(filtered_user_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>User Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_user_reqs)
-        if len(filtered_external_interface_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>External Interface Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_external_interface_reqs)
-        if len(filtered_functional_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>Functional Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_functional_reqs)
-        if len(filtered_architecture_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>Architecture Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_architecture_reqs)
-        if len(filtered_design_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>Design Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_design_reqs)
-        if len(filtered_non_functional_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>Non-Functional Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_non_functional_reqs)
-        if len(filtered_other_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>Other Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_other_reqs)
-        report += "</table>\n"
-
-    # Handle untraceable requirements if any
-    if analysis.num_untraceable_reqs > 0:
-        # Get lists of untraceable requirements based on their type
-        filtered_user_reqs               = list(filter(lambda r: r.status == ReqStatus.UNTRACEABLE, analysis.user_reqs))
-        filtered_external_interface_reqs = list(filter(lambda r: r.status == ReqStatus.UNTRACEABLE, analysis.external_interface_reqs))
-        filtered_functional_reqs         = list(filter(lambda r: r.status == ReqStatus.UNTRACEABLE, analysis.functional_reqs))
-        filtered_architecture_reqs       = list(filter(lambda r: r.status == ReqStatus.UNTRACEABLE, analysis.architecture_reqs))
-        filtered_design_reqs             = list(filter(lambda r: r.status == ReqStatus.UNTRACEABLE, analysis.design_reqs))
-        filtered_non_functional_reqs     = list(filter(lambda r: r.status == ReqStatus.UNTRACEABLE, analysis.non_functional_reqs))
-        filtered_other_reqs              = list(filter(lambda r: r.status == ReqStatus.UNTRACEABLE, analysis.other_reqs))
-
-        colspan = 5 if analysis.enable_allocation else 4
-
-        report += "\n### <a id=\"untraceable-reqs\"></a> Untraceable requirements\n"
-        report += "<table>\n"
-        report += "  <thead>\n"
-        report += "    <tr>\n"
-        report += "      <th>Requirement</th>\n"
-        report += "      <th>Description</th>\n"
-        report += "      <th>Derived from</th>\n"
-        report += "      <th>Allocated to</th>\n" if analysis.enable_allocation else ""
-        report += "      <th>Justification</th>\n"
-        report += "    </tr>\n"
-        report += "  </thead>\n"
-        # Add rows for each type of untraceable requirements
-        if len(filtered_user_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>User Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_user_reqs)
-        if len(filtered_external_interface_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>External Interface Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_external_interface_reqs)
-        if len(filtered_functional_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>Functional Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_functional_reqs)
-        if len(filtered_architecture_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>Architecture Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_architecture_reqs)
-        if len(filtered_design_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>Design Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_design_reqs)
-        if len(filtered_non_functional_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>Non-Functional Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_non_functional_reqs)
-        if len(filtered_other_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>Other Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_other_reqs)
-        report += "</table>\n"
-
-    # Handle untraceable requirements if any
-    if analysis.num_uncovered_reqs > 0:
-        # Get lists of uncovered requirements based on their type
-        filtered_user_reqs               = list(filter(lambda r: r.status == ReqStatus.UNCOVERED, analysis.user_reqs))
-        filtered_external_interface_reqs = list(filter(lambda r: r.status == ReqStatus.UNCOVERED, analysis.external_interface_reqs))
-        filtered_functional_reqs         = list(filter(lambda r: r.status == ReqStatus.UNCOVERED, analysis.functional_reqs))
-        filtered_architecture_reqs       = list(filter(lambda r: r.status == ReqStatus.UNCOVERED, analysis.architecture_reqs))
-        filtered_design_reqs             = list(filter(lambda r: r.status == ReqStatus.UNCOVERED, analysis.design_reqs))
-        filtered_non_functional_reqs     = list(filter(lambda r: r.status == ReqStatus.UNCOVERED, analysis.non_functional_reqs))
-        filtered_other_reqs              = list(filter(lambda r: r.status == ReqStatus.UNCOVERED, analysis.other_reqs))
-
-        colspan = 4 if analysis.enable_allocation else 3
-            
-        report += "\n### <a id=\"uncovered-reqs\"></a> Uncovered requirements\n"
-        report += "<table>\n"
-        report += "  <thead>\n"
-        report += "    <tr>\n"
-        report += "      <th>Requirement</th>\n"
-        report += "      <th>Description</th>\n"
-        report += "      <th>Derived from</th>\n"
-        report += "      <th>Allocated to</th>\n" if analysis.enable_allocation else ""
-        report += "    </tr>\n"
-        report += "  </thead>\n"
-        # Add rows for each type of uncovered requirements
-        if len(filtered_user_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>User Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_user_reqs)
-        if len(filtered_external_interface_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>External Interface Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_external_interface_reqs)
-        if len(filtered_functional_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>Functional Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_functional_reqs)
-        if len(filtered_architecture_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>Architecture Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_architecture_reqs)
-        if len(filtered_design_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>Design Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_design_reqs)
-        if len(filtered_non_functional_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>Non-Functional Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_non_functional_reqs)
-        if len(filtered_other_reqs) > 0:
-            report += "  <thead><tr><th colspan=\"{}\"><i>Other Requirements</i></th></tr></thead>\n".format(colspan)
-            report += req_list_to_table_rows(analysis, filtered_other_reqs)
-        report += "</table>\n"
-
-    return report
+    out = io.StringIO()
+    write_traceability_report(analysis, DocumentWriter(out))
+    return out.getvalue()
+
+def write_report_footer(doc: DocumentWriter) -> None:
+    """Writes the report footer
+
+    :param doc: document the footer is written to
+    :type doc: DocumentWriter
+    """
+    doc.paragraph(generate_report_footer())
 
 def generate_report_footer() -> str:
     """Generates a string containing the report footer
@@ -366,11 +459,11 @@ def generate_report_footer() -> str:
     footer = "<a href=\"#summary\">Back to top</a>"
     return footer
 
-def generate_test_result_badge(analysis: Analysis) -> str:
+def generate_test_result_badge(analysis: Analysis | ResultsSummary) -> str:
     """Generate badge data indicating the test result, which color changes on the result
 
-    :param analysis: the analysis from which data shall be used
-    :type analysis: Analysis
+    :param analysis: the analysis or testdata summary from which the test result shall be used
+    :type analysis: Analysis | ResultsSummary
 
     :returns: a json string containing the badge data
     :rtype: str
@@ -400,6 +493,22 @@ def generate_traceability_result_badge(analysis: Analysis) -> str:
     badge += "}"
     return badge
 
+def anchor_href(anchor: str, pages: dict[str, str] = None) -> str:
+    """Returns the link to an anchor, located in another page if provided in pages
+
+    :param anchor: id of the anchor
+    :type anchor: str
+
+    :param pages: page of the anchors indexed by anchor id
+    :type pages: dict[str, str], optional
+
+    :returns: the link to the anchor
+    :rtype: str
+    """
+    if pages is None or anchor not in pages:
+        return "#" + anchor
+    return "{}#{}".format(pages[anchor], anchor)
+
 def surround_with_link_if(cond: bool, href: str, content: str) -> str:
     """Returns the content string surrounded by a link to href if cond is true
 
@@ -467,52 +576,63 @@ def req_list_to_table_rows(analysis: Analysis, reqs: list[Req]) -> str:
     :param reqs: the list of reqs to convert
     :type reqs: list[Req]
 
-    :param enable_allocation: enable the allocation column
-    :type enable_allocation: bool
-
     :returns: html table rows containing the list of reqs
     :rtype: str
     """
+    out = io.StringIO()
+    write_req_list_table_rows(analysis, reqs, DocumentWriter(out))
+    return out.getvalue()
+
+def write_req_list_table_rows(analysis: Analysis, reqs: list[Req], doc: DocumentWriter) -> None:
+    """Writes a list of reqs as html table rows
+
+    :param analysis: the analysis from which data shall be used
+    :type analysis: Analysis
+
+    :param reqs: the list of reqs to convert
+    :type reqs: list[Req]
+
+    :param doc: document the rows are written to
+    :type doc: DocumentWriter
+    """
     unallocated_anchor_placed = False
 
-    result = ""
     for req in reqs:
-        result += "  <tr>\n"
-        result += "    <td valign=\"top\">\n"
-        result += "      <samp><b>{}</b></samp>\n".format(req.id)
-        result += "    </td>\n"
-        result += "    <td valign=\"top\">{}</td>\n".format(latex_to_html(req.description))
+        doc.write("  <tr>\n")
+        doc.write("    <td valign=\"top\">\n")
+        doc.write("      <samp><b>{}</b></samp>\n".format(req.id))
+        doc.write("    </td>\n")
+        doc.write("    <td valign=\"top\">{}</td>\n".format(latex_to_html(req.description)))
         # Adds the list of derived from reqs
         if req.derived_from:
-            result += "    <td valign=\"top\"><samp>{}</samp></td>\n".format("<br>".join([rid for rid in req.derived_from]))
+            doc.write("    <td valign=\"top\"><samp>{}</samp></td>\n".format("<br>".join([rid for rid in req.derived_from])))
         else:
-            result += "    <td></td>\n"
+            doc.write("    <td></td>\n")
         # Adds the list of allocations
         if analysis.enable_allocation:
             if req.allocation:
-                result += "    <td valign=\"top\"><samp>{}</samp></td>\n".format("<br>".join([mid for mid in req.allocation]))
+                doc.write("    <td valign=\"top\"><samp>{}</samp></td>\n".format("<br>".join([mid for mid in req.allocation])))
             else:
                 # This is performed multiple times but the link will point to the first one
                 if not unallocated_anchor_placed:
-                    result += "      <a id=\"first-unallocated-req\"></a>"
+                    doc.write("      <a id=\"first-unallocated-req\"></a>")
                     unallocated_anchor_placed = True
-                result += "    <td></td>\n"
+                doc.write("    <td></td>\n")
         if req.status == ReqStatus.COVERED:
             # Adds the list of covering reqs
             if req.id in analysis.ids_reqs_covering_reqs:
-                result += "    <td valign=\"top\"><samp>{}</samp></td>\n".format("<br>".join([rid for rid in analysis.ids_reqs_covering_reqs[req.id]]))
+                doc.write("    <td valign=\"top\"><samp>{}</samp></td>\n".format("<br>".join([rid for rid in analysis.ids_reqs_covering_reqs[req.id]])))
             else:
-                result += "    <td></td>\n"
+                doc.write("    <td></td>\n")
             # Adds the list of covering checks
             if req.id in analysis.ids_checks_covering_reqs:
-                result += "    <td valign=\"top\"><samp>{}</samp></td>\n".format("<br>".join([cid for cid in analysis.ids_checks_covering_reqs[req.id]]))
-                result += "    <td valign=\"top\" align=\"center\">\n"
-                result += "      {}\n".format(gen_result_badge(req.result))
-                result += "    </td>\n"
+                doc.write("    <td valign=\"top\"><samp>{}</samp></td>\n".format("<br>".join([cid for cid in analysis.ids_checks_covering_reqs[req.id]])))
+                doc.write("    <td valign=\"top\" align=\"center\">\n")
+                doc.write("      {}\n".format(gen_result_badge(req.result)))
+                doc.write("    </td>\n")
             else:
-                result += "    <td></td>\n"
-                result += "    <td></td>\n"
+                doc.write("    <td></td>\n")
+                doc.write("    <td></td>\n")
         if req.status == ReqStatus.UNTRACEABLE:
-            result += "    <td valign=\"top\">{}</td>\n".format(analysis.justif_reqs_untraceable[req.id])
-        result += "  </tr>\n"
-    return result
+            doc.write("    <td valign=\"top\">{}</td>\n".format(analysis.justif_reqs_untraceable[req.id]))
+        doc.write("  </tr>\n")
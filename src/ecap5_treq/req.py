@@ -27,6 +27,14 @@ import glob
 
 from ecap5_treq.log import log_error, log_warn
 from ecap5_treq.config import SpecFormat
+from ecap5_treq.cache import Cache
+from ecap5_treq.parallel import parse_files
+from ecap5_treq.source import open_source, source_location
+
+# Start of a req in latex specification source files, up to the opening curly bracket of its id
+TEX_REQ_PATTERN = re.compile(rb"\\req\s*{")
+# Line breaks following the closing token of a field of a req in latex specification source files
+TEX_NEWLINES_PATTERN = re.compile(rb"[\r\n]*")
 
 class ReqStatus:
     """A ReqStatus details the traceability status of requirements
@@ -37,8 +45,13 @@ class ReqStatus:
 
 class Req:
     """A Req represents a requirement
+
+    Requirements are compact records which ids are interned as they are shared by the requirements, the matrix and
+    the analysis indexes. Requirements are hashed by id.
     """
 
+    __slots__ = ("id", "description", "derived_from", "allocation", "status", "result")
+
     def __init__(self,                                    \
                  id: str,                                 \
                  description: str,                        \
@@ -56,7 +69,7 @@ class Req:
         :param options: a dictionary containing the options of the requirement
         :type options: dict[str, list[str]]
         """
-        self.id = id.replace("\\", "")
+        self.id = sys.intern(id.replace("\\", ""))
         self.description = description
         self.derived_from = None
         self.allocation = None
@@ -66,7 +79,7 @@ class Req:
         # Validate the requirement options
         if options:
             if "derivedfrom" in options:
-                self.derived_from = [x for x in options["derivedfrom"]]
+                self.derived_from = [sys.intern(x) for x in options["derivedfrom"]]
             if "allocation" in options:
                 self.allocation = [x for x in options["allocation"]]
 
@@ -109,7 +122,17 @@ class Req:
                 self.status == other.status and \
                 self.result == other.result)
 
-def import_reqs(path: str, spec_format: SpecFormat) -> list[Req]:
+    def __hash__(self) -> int:
+        """Override of the __hash__ function used to store requirements in sets and as dictionary keys
+
+        The hash only depends on the id which is not modified by the analysis.
+
+        :returns: the hash of the requirement
+        :rtype: int
+        """
+        return hash(self.id)
+
+def import_reqs(path: str, spec_format: SpecFormat, cache: Cache = None, jobs: int = 1) -> list[Req]:
     """Imports reqs from the specification source files
 
     :param path: path to the root of the specification source files
@@ -118,14 +141,20 @@ def import_reqs(path: str, spec_format: SpecFormat) -> list[Req]:
     :param spec_format: language format of the specification
     :type spec_format: SpecFormat
 
+    :param cache: cache of previously parsed source files
+    :type cache: Cache, optional
+
+    :param jobs: number of processes used to parse the source files
+    :type jobs: int, optional
+
     :returns: a list of checks from the specification source files
     :rtype: list[Req]
     """
     match spec_format:
         case SpecFormat.RST:
-            return rst_import_reqs(path)
+            return rst_import_reqs(path, cache, jobs)
         case SpecFormat.TEX:
-            return tex_import_reqs(path)
+            return tex_import_reqs(path, cache, jobs)
         case _:
             log_error("Unknown specification format: {}".format(spec_format))
             # The program is interrupted here as this is a critical error
@@ -135,43 +164,62 @@ def import_reqs(path: str, spec_format: SpecFormat) -> list[Req]:
 # rst parsing
 #
 
-def rst_import_reqs(path: str) -> list[Req]:
+def rst_import_reqs(path: str, cache: Cache = None, jobs: int = 1) -> list[Req]:
     """Imports reqs from the specification rst source files
 
     :param path: path to the root of the specification source files
     :type path: str
 
+    :param cache: cache of previously parsed source files
+    :type cache: Cache, optional
+
+    :param jobs: number of processes used to parse the source files
+    :type jobs: int, optional
+
     :returns: a list of checks from the specification source files
     :rtype: list[Req]
     """
-    reqs = []
     # Get the list of specification source files
     files = glob.glob(path + "/**/*.rst", recursive=True)
-    for file in files:
-        # Get the content of the specification source file
-        lines = [l[:-1] for l in open(file, encoding="utf-8")]
-        cur = 0
-        while cur < len(lines):
-            matches = list(re.finditer(r"\.\.\s*requirement::", lines[cur]))
-
-            if len(matches) == 0:
-                cur += 1
-                continue
-
-            cur, id      = rst_process_id(cur, lines)
-            cur          = rst_skip_empty_lines(cur, lines)
-            cur, options = rst_process_options(cur, lines)
-            cur          = rst_skip_empty_lines(cur, lines)
-            cur, desc    = rst_process_desc(cur, lines)
-
-            if len(id) == 0:
-                log_error("Missing id for requirement")
-                # The program is interrupted here as this is a critical error
-                sys.exit(-1)
-            if len(("".join(desc.split("\n"))).strip()) == 0:
-                log_warn("Missing description for requirement: \"{}\"".format(id))
+    reqs = parse_files(cache, "rst", files, rst_import_reqs_from_file, jobs)
+    if cache:
+        cache.save()
+    return reqs
+
+def rst_import_reqs_from_file(file: str) -> list[Req]:
+    """Imports reqs from a specification rst source file
+
+    :param file: path to the specification source file
+    :type file: str
 
-            reqs += [Req(id, desc, options)]
+    :returns: a list of reqs from the specification source file
+    :rtype: list[Req]
+    """
+    reqs = []
+    # Get the content of the specification source file
+    lines = [l[:-1] for l in open(file, encoding="utf-8")]
+    cur = 0
+    while cur < len(lines):
+        matches = list(re.finditer(r"\.\.\s*requirement::", lines[cur]))
+
+        if len(matches) == 0:
+            cur += 1
+            continue
+
+        cur, id      = rst_process_id(cur, lines)
+        cur          = rst_skip_empty_lines(cur, lines)
+        cur, options = rst_process_options(cur, lines)
+        cur          = rst_skip_empty_lines(cur, lines)
+        cur, desc    = rst_process_desc(cur, lines)
+
+        if len(id) == 0:
+            log_error("Missing id for requirement")
+            # The program is interrupted here as this is a critical error
+            sys.exit(-1)
+        if len(("".join(desc.split("\n"))).strip()) == 0:
+            log_warn("Missing description for requirement: \"{}\"".format(id))
+
+        reqs += [Req(id, desc, options)]
     return reqs
 
 def rst_process_id(cur: int, lines: list[str]) -> tuple[int, str]:
@@ -303,78 +351,107 @@ def rst_skip_empty_lines(cur: int, lines: list[str]) -> int:
 # tex parsing
 #
 
-def tex_import_reqs(path: str) -> list[Req]:
+def tex_import_reqs(path: str, cache: Cache = None, jobs: int = 1) -> list[Req]:
     """Imports reqs from the specification latex source files
 
     :param path: path to the root of the specification source files
     :type path: str
 
+    :param cache: cache of previously parsed source files
+    :type cache: Cache, optional
+
+    :param jobs: number of processes used to parse the source files
+    :type jobs: int, optional
+
     :returns: a list of checks from the specification source files
     :rtype: list[Req]
     """
-    reqs = []
     # Get the list of specification source files
     files = glob.glob(path + "/**/*.tex", recursive=True)
-    for file in files:
-        # Get the content of the specification source file
-        content = "".join(l[:-1] for l in open(file, encoding="utf-8"))
-        # Find reqs in the file
-        for i in [m.start() for m in re.finditer(r"\\req[\s]*{", content)]:
-            # The format of the reqs is
-            #
-            #     \req{<id>}{<description>}[<options>]
-            #         1     2              3         4
-            cur = tex_process_keyword(i, content)                                 # Go to 1
-            cur, id          = tex_process_matching_token(cur, content, "{", "}") # Go from 1 to 2
-            cur, description = tex_process_matching_token(cur, content, "{", "}") # Go from 2 to 3
-            cur, options     = tex_process_matching_token(cur, content, "[", "]") # Go from 3 to 4
-
-            if len(id) == 0:
-                log_error("Missing id for requirement: \"{}\"".format(content[i:cur]))
-                # The program is interrupted here as this is a critical error
-                sys.exit(-1)
-            if not description or len(description) == 0:
-                log_warn("Missing description for requirement: \"{}\"".format(content[i:cur]))
+    reqs = parse_files(cache, "tex", files, tex_import_reqs_from_file, jobs)
+    if cache:
+        cache.save()
+    return reqs
+
+def tex_import_reqs_from_file(file: str) -> list[Req]:
+    """Imports reqs from a specification latex source file
 
-            # convert the options string to a dictionary
-            options_dict = None
-            if options:
-                options_dict = tex_process_options(options)
+    The content of the file is scanned as bytes in a single pass, each req being searched for after the end of the
+    previous one. Large files are mapped in memory and only the fields of the reqs are decoded.
 
-            reqs += [Req(id, description, options_dict)]
+    :param file: path to the specification source file
+    :type file: str
+
+    :returns: a list of reqs from the specification source file
+    :rtype: list[Req]
+    """
+    reqs = []
+    # Get the raw content of the specification source file
+    with open_source(file) as content:
+        # Find reqs in the file
+        match = TEX_REQ_PATTERN.search(content)
+        while match:
+            cur, req = tex_process_req(match, content, file)
+            reqs += [req]
+            match = TEX_REQ_PATTERN.search(content, cur)
     return reqs
 
-def tex_process_keyword(cur: int, content: str) -> int:
-    """Increments cur to point to the char following the next curly bracket in latex content
+def tex_process_req(match: re.Match, content: bytes, file: str = None) -> tuple[int, Req]:
+    """Converts a req found in the raw content of a latex specification source file to a Req
 
-    :param cur: pointer to a char in content
-    :type cur: int
+    :param match: match of the start of the req in content
+    :type match: re.Match
 
-    :param content: content string
-    :type content: str
+    :param content: raw content of the specification source file
+    :type content: bytes
 
-    :returns: the incremented cur pointing to the char following the next curly bracket in content
-    :rtype: int
-    """
-    cur_start = cur
-    # Go to the next {
-    while cur < len(content) and content[cur] != "{":
-        cur += 1
+    :param file: path to the specification source file used to locate syntax errors
+    :type file: str, optional
 
-    if cur == len(content):
-        log_error("Syntax error while processing keyword \"{}\"".format(content[cur_start:cur]))
+    :returns: a tuple containing both a pointer to the byte following the req and the converted req
+    :rtype: tuple[int, Req]
+    """
+    # The format of the reqs is
+    #
+    #     \req{<id>}{<description>}[<options>]
+    #         1     2              3         4
+    start = match.start()
+    cur = match.end() - 1                                                          # Go to 1
+    cur, id          = tex_process_matching_token(cur, content, "{", "}", file)     # Go from 1 to 2
+    cur              = tex_skip_newlines(cur, content)
+    cur, description = tex_process_matching_token(cur, content, "{", "}", file)     # Go from 2 to 3
+    cur              = tex_skip_newlines(cur, content)
+    cur, options     = tex_process_matching_token(cur, content, "[", "]", file)     # Go from 3 to 4
+
+    # Line breaks are ignored in the messages as in the content of the req
+    req_str = tex_decode(content[start:cur])
+    if len(id) == 0:
+        log_error("Missing id for requirement at {}: \"{}\"".format(source_location(start, content, file), req_str))
+        # The program is interrupted here as this is a critical error
         sys.exit(-1)
+    if not description or len(description) == 0:
+        log_warn("Missing description for requirement: \"{}\"".format(req_str))
 
-    return cur
+    # convert the options string to a dictionary
+    options_dict = None
+    if options:
+        options_dict = tex_process_options(options)
+
+    return (cur, Req(id, description, options_dict))
 
-def tex_process_matching_token(cur: int, content: str, opening_token: str, closing_token: str) -> tuple[int, str]:
+def tex_process_matching_token(cur: int, content: bytes, opening_token: str, closing_token: str, \
+                               file: str = None) -> tuple[int, str]:
     """Recovers a string containined in matching tokens provided as parameters for latex specification
 
-    :param cur: pointer to the starting char in content
+    The content is searched from one closing token to the next instead of byte by byte and the string is sliced out
+    of content and decoded once the matching closing token is found. Line breaks are removed from the recovered
+    string.
+
+    :param cur: pointer to the starting byte in content
     :type cur: int
 
-    :param content: content string
-    :type content: str
+    :param content: raw content
+    :type content: bytes
     
     :param opening_token: opening token used for the token matching
     :type opening_token: str
@@ -382,35 +459,60 @@ def tex_process_matching_token(cur: int, content: str, opening_token: str, closi
     :param closing_token: closing token used for the token matching
     :type closing_token: str
 
-    :returns: a tuple containing both an incremented cur pointing to the next char fater the closing token and the 
+    :param file: path to the file of the content used to locate syntax errors
+    :type file: str, optional
+
+    :returns: a tuple containing both an incremented cur pointing to the next byte fater the closing token and the 
         recovered string
     :rtype: tuple[int, str]
     """
-    cur_start = cur
+    opening = opening_token.encode("utf-8")
+    closing = closing_token.encode("utf-8")
 
     # Return if the opening_token is not found
-    if content[cur] != opening_token:
+    if content[cur:cur + 1] != opening:
         return (cur, None)
 
-    result = ""
-    cur += 1
     # indent is used to keep track of the opened tokens waiting for their closing token
-    ident = 1
-    while cur < len(content) and ident > 0:
-        if content[cur] == opening_token:
-            ident += 1
-        if content[cur] == closing_token:
-            ident -= 1
-        result += content[cur]
-        cur += 1
-    
-    if cur == len(content) and ident > 0:
-        log_error("Syntax error while processing matching tokens \"{}\"".format(content[cur_start:cur]))
-        sys.exit(-1)
+    indent = 1
+    end = cur
+    while indent > 0:
+        start = end + 1
+        end = content.find(closing, start)
+        if end < 0:
+            log_error("Syntax error while processing matching tokens at {}: missing \"{}\" matching \"{}\"" \
+                        .format(source_location(cur, content, file), closing_token, opening_token))
+            # The program is interrupted here as this is a critical error
+            sys.exit(-1)
+        # The tokens opened before the closing token are counted without visiting each byte
+        indent += content[start:end].count(opening) - 1
+
+    return (end + 1, tex_decode(content[cur + 1:end]).strip())
+
+def tex_skip_newlines(cur: int, content: bytes) -> int:
+    """Increments cur to point to the next byte of latex content which is not a line break
+
+    :param cur: pointer to a byte in content
+    :type cur: int
 
-    # Remove the closing token
-    result = result[:-1]
-    return (cur, result.strip())
+    :param content: raw content
+    :type content: bytes
+
+    :returns: the incremented cur pointing to the next byte which is not a line break
+    :rtype: int
+    """
+    return TEX_NEWLINES_PATTERN.match(content, cur).end()
+
+def tex_decode(fragment: bytes) -> str:
+    """Decodes a fragment of latex content, removing its line breaks
+
+    :param fragment: raw fragment of content
+    :type fragment: bytes
+
+    :returns: the decoded fragment without line breaks
+    :rtype: str
+    """
+    return fragment.decode("utf-8").replace("\r", "").replace("\n", "")
 
 def tex_process_options(options: str) -> dict[str, list[str]]:
     """Converts the latex options string to a dictionary
@@ -0,0 +1,70 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+# 
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+# 
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import mmap
+import contextlib
+from typing import Iterator
+
+# Size from which source files are mapped in memory instead of being read
+MMAP_MIN_SIZE = 1 << 20
+
+@contextlib.contextmanager
+def open_source(file: str) -> Iterator[bytes]:
+    """Provides the raw content of a source file
+
+    Large files are mapped in memory so that they can be scanned without being copied, the scanners decoding only
+    the matched fragments. The content shall not be accessed after leaving the context.
+
+    :param file: path to the source file
+    :type file: str
+
+    :returns: the content of the source file as a bytes-like object supporting slicing, find and regex matching
+    :rtype: Iterator[bytes]
+    """
+    with open(file, "rb") as source:
+        if os.fstat(source.fileno()).st_size < MMAP_MIN_SIZE:
+            yield source.read()
+        else:
+            with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                yield content
+
+def source_location(cur: int, content: bytes, file: str = None) -> str:
+    """Returns the position of a byte of a source file as a file:line:column string to be used in logged messages
+
+    :param cur: pointer to a byte in content
+    :type cur: int
+
+    :param content: raw content of the source file
+    :type content: bytes
+
+    :param file: path to the source file
+    :type file: str, optional
+
+    :returns: the position of the byte, lines and columns starting at 1
+    :rtype: str
+    """
+    # The preceding content is only copied when reporting errors
+    preceding = content[:cur]
+    line_start = preceding.rfind(b"\n") + 1
+    line = preceding.count(b"\n", 0, line_start) + 1
+    column = len(preceding[line_start:].decode("utf-8", errors="replace")) + 1
+    return "{}:{}:{}".format(file if file else "<content>", line, column)
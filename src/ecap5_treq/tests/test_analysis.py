@@ -24,12 +24,17 @@ import contextlib
 from mock import patch, Mock, mock_open, call
 import pytest
 import io
+import random
 
-from ecap5_treq.check import Check
+from ecap5_treq.cache import Cache
+from ecap5_treq.check import Check, import_testdata
+from ecap5_treq.config import MergePolicy
+from ecap5_treq.merge import merge_testdata, merged_check
 from ecap5_treq.req import Req, ReqStatus
-from ecap5_treq.analysis import Analysis
+from ecap5_treq.analysis import Analysis, ResultsSummary, find_duplicates, same_order
 from ecap5_treq.matrix import Matrix
 from ecap5_treq.log import log_error, log_warn, log_clear, log_imp
+from ecap5_treq.profiling import profiler
 
 #
 # Fixture definitions
@@ -199,6 +204,47 @@ def test_Analysis_analyse_tests_03(stub_analyse):
     ]
     assert analysis.test_result == 37
 
+class CountingId(str):
+    """Check id counting the hashes and comparisons performed on the ids, e.g. to index or look up checks by id
+    """
+    count = 0
+
+    def __hash__(self):
+        CountingId.count += 1
+        return super().__hash__()
+
+    def __eq__(self, other):
+        CountingId.count += 1
+        return super().__eq__(other)
+
+def count_analyse_tests_operations(num_checks: int) -> int:
+    """Counts the hashes and comparisons of check ids performed by analyse_tests with num_checks checks where half
+    of them are skipped and unknown
+    """
+    checks = [Check("testsuite{}".format(i % 10), "testcase{}".format(i % 7), "check{}".format(i)) for i in range(num_checks)]
+    testdata = [Check("testsuite{}".format(i % 10), "testcase{}".format(i % 7), "check{}".format(i), i % 2, None) \
+                    for i in range(num_checks // 2, num_checks + num_checks // 2)]
+    for check in checks + testdata:
+        check.id = CountingId(check.id)
+    with patch.object(Analysis, "analyse"):
+        analysis = Analysis([], checks, testdata, None)
+    CountingId.count = 0
+    analysis.analyse_tests()
+    return CountingId.count
+
+def test_Analysis_analyse_tests_04():
+    """Unit test for the analyse_tests method of the Analysis class
+
+    The covered behavior is the linear scaling of the skipped and unknown checks detection. The checks are looked up
+    by id so that multiplying the number of checks by 4 multiplies the number of hashes and comparisons of their ids
+    by about 4, a quadratic implementation would multiply it by 16.
+    """
+    operations_small = count_analyse_tests_operations(400)
+    operations_large = count_analyse_tests_operations(1600)
+
+    assert operations_small > 0
+    assert operations_large <= operations_small * 5
+
 @patch.object(Analysis, "analyse")
 def test_Analysis_analyse_traceability_01(stub_analyse):
     """Unit test for the analyse_traceability method of the Analysis class
@@ -435,6 +481,261 @@ def test_Analysis_analyse_traceability_04(stub_analyse):
     ]
     assert analysis.traceability_result == 88
 
+@patch.object(Analysis, "analyse")
+def test_Analysis_analyse_traceability_05(stub_analyse):
+    """Unit test for the analyse_traceability method of the Analysis class
+
+    The covered behavior is the requirement test result with successfull, failed and skipped covering checks
+
+    The analyse method is stubbed so the analyse_traceability is called on its own.
+    """
+    reqs = [ \
+        Req("F_req1", "description1", {}), \
+        Req("F_req2", "description2", {}) \
+    ]
+    checks = [ \
+        Check("testsuite1", "testcase1", "check1"), \
+        Check("testsuite1", "testcase1", "check2"), \
+        Check("testsuite1", "testcase1", "check3"), \
+        Check("testsuite1", "testcase1", "check4") \
+    ]
+    testdata = [ \
+        Check("testsuite1", "testcase1", "check1", 1, None), \
+        Check("testsuite1", "testcase1", "check2", 1, None), \
+        Check("testsuite1", "testcase1", "check3", 0, "msg1") \
+    ]
+    matrix = Matrix()
+    matrix.add("testsuite1.testcase1.check1", ["F_req1", "F_req2"])
+    matrix.add("testsuite1.testcase1.check2", ["F_req1"])
+    matrix.add("testsuite1.testcase1.check3", ["F_req1"])
+    matrix.add("testsuite1.testcase1.check4", ["F_req1", "F_req2"])
+
+    analysis = Analysis(reqs, checks, testdata, matrix)
+    analysis.analyse_traceability()
+
+    assert analysis.functional_reqs == [ \
+        Req("F_req1", "description1", {}, ReqStatus.COVERED, 50), \
+        Req("F_req2", "description2", {}, ReqStatus.COVERED, 50) \
+    ]
+
+def update_data(version: int) -> tuple:
+    """Returns new requirements, checks, testdata and matrix objects for the given version of the data
+
+    Version 1 is the initial data and version 2 modifies each kind of data.
+    """
+    reqs = [ \
+        Req("U_req1", "description1", {}), \
+        Req("F_req1", "description2", {"derivedfrom": ["U_req1"]}), \
+        Req("F_req2", "description3", {"derivedfrom": ["U_req1"], "allocation": ["block1"]}), \
+        Req("D_req1", "description4", {}), \
+        Req("D_req2", "description5", {}) \
+    ]
+    checks = [Check("testsuite1", "testcase1", "check{}".format(i)) for i in range(1, 5)]
+    testdata = [Check("testsuite1", "testcase1", "check{}".format(i), i % 2, None) for i in range(1, 5)]
+    matrix = Matrix()
+    matrix.add("testsuite1.testcase1.check1", ["F_req1"])
+    matrix.add("testsuite1.testcase1.check2", ["F_req1", "F_req2"])
+    matrix.add("testsuite1.testcase1.check3", ["D_req1"])
+    matrix.add("testsuite1.testcase1.check4", [])
+    matrix.add_untraceable("D_req2", "justification")
+
+    if version == 2:
+        # Modified, added and removed requirements
+        reqs[2] = Req("F_req2", "description3", {"derivedfrom": ["D_req1"]})
+        reqs[3] = Req("D_req1", "modified", {"allocation": ["block2"]})
+        del reqs[0]
+        reqs += [Req("A_req1", "description6", {"derivedfrom": ["F_req1"]})]
+        # Added and removed checks with a modified result
+        del checks[0]
+        checks += [Check("testsuite2", "testcase1", "check5")]
+        testdata[1] = Check("testsuite1", "testcase1", "check2", 1, None)
+        testdata += [Check("testsuite2", "testcase1", "check5", 0, "msg1")]
+        # Modified rows and untraceable requirements
+        matrix.add("testsuite1.testcase1.check4", ["D_req2", "F_req2"])
+        matrix.add("testsuite2.testcase1.check5", ["A_req1", "F_req1"])
+        matrix.untraceable = {"F_req1": ""}
+
+    return reqs, checks, testdata, matrix
+
+def assert_same_analysis(analysis: Analysis, expected: Analysis) -> None:
+    """Checks that the results of an updated analysis match the results of a full analysis
+    """
+    for attr in ["reqs", "testsuites", "num_checks_in_testsuites", "skipped_checks", "unknown_checks", \
+                 "num_successfull_checks", "num_failed_checks", "num_successfull_unknown_checks", \
+                 "num_failed_unknown_checks", "check_status_by_check_id", "test_result", "num_covered_reqs", \
+                 "num_untraceable_reqs", "num_uncovered_reqs", "num_allocated_reqs", "ids_reqs_covering_reqs", \
+                 "ids_checks_covering_reqs", "justif_reqs_untraceable", "user_reqs", "external_interface_reqs", \
+                 "functional_reqs", "architecture_reqs", "design_reqs", "non_functional_reqs", "other_reqs", \
+                 "traceability_result", "reqs_ids"]:
+        assert getattr(analysis, attr) == getattr(expected, attr), attr
+    assert analysis.checks == expected.checks
+    assert [check.status for check in analysis.checks] == [check.status for check in expected.checks]
+
+def test_Analysis_update_01():
+    """Unit test for the update method of the Analysis class
+
+    The covered behavior is the update of the test results without analysing the data again
+    """
+    analysis = Analysis(*update_data(1))
+
+    reqs, checks, testdata, matrix = update_data(1)
+    testdata[0] = Check("testsuite1", "testcase1", "check1", 0, "msg1")
+    testdata[1] = Check("testsuite1", "testcase1", "check2", 1, None)
+    with patch.object(Analysis, "analyse_tests") as stub_analyse_tests, \
+         patch.object(Analysis, "analyse_traceability") as stub_analyse_traceability:
+        analysis.update(reqs, checks, testdata, matrix)
+        stub_analyse_tests.assert_not_called()
+        stub_analyse_traceability.assert_not_called()
+
+    assert_same_analysis(analysis, Analysis(*update_data(1)[:2], testdata, update_data(1)[3]))
+    assert analysis.testdata[0].error_msg == "msg1"
+
+def test_Analysis_update_02():
+    """Unit test for the update method of the Analysis class
+
+    The covered behaviors are:
+        * added, removed and modified requirements
+        * added and removed checks and testdata
+        * modified matrix rows and untraceable requirements
+        * consistency messages logged again
+    """
+    analysis = Analysis(*update_data(1))
+    log_clear()
+
+    with patch.object(Analysis, "analyse_traceability") as stub_analyse_traceability:
+        analysis.update(*update_data(2))
+        stub_analyse_traceability.assert_not_called()
+    msgs = (log_warn.msgs, log_imp.msgs)
+    log_clear()
+
+    assert_same_analysis(analysis, Analysis(*update_data(2)))
+    assert msgs == (log_warn.msgs, log_imp.msgs)
+
+    # Reverting the changes
+    analysis.update(*update_data(1))
+    assert_same_analysis(analysis, Analysis(*update_data(1)))
+
+@patch.object(Analysis, "analyse")
+def test_Analysis_update_03(stub_analyse):
+    """Unit test for the update method of the Analysis class
+
+    The covered behaviors are full analyses performed when:
+        * ids are not unique
+        * requirements are moved
+        * checks are moved
+        * the allocation feature is toggled
+    """
+    analysis = Analysis(*update_data(1))
+    analysis.reqs_by_id = {req.id: req for req in analysis.reqs}
+    analysis.checks_by_id = {check.id: check for check in analysis.checks}
+    analysis.testdata_by_id = {check.id: check for check in analysis.testdata}
+    stub_analyse.reset_mock()
+
+    reqs, checks, testdata, matrix = update_data(1)
+    analysis.update(reqs + [reqs[0]], checks, testdata, matrix)
+    stub_analyse.assert_called_once()
+    assert len(analysis.reqs) == 6
+
+    for data in [(reqs[::-1], checks), (reqs, checks[::-1])]:
+        analysis = Analysis(*update_data(1))
+        analysis.reqs_by_id = {req.id: req for req in analysis.reqs}
+        analysis.checks_by_id = {check.id: check for check in analysis.checks}
+        analysis.testdata_by_id = {check.id: check for check in analysis.testdata}
+        stub_analyse.reset_mock()
+
+        analysis.update(*data, testdata, matrix)
+        stub_analyse.assert_called_once()
+
+    analysis.update(reqs, checks, testdata, matrix, False)
+    assert analysis.enable_allocation == False
+    assert stub_analyse.call_count == 2
+
+def test_Analysis_update_04():
+    """Unit test for the update method of the Analysis class
+
+    The covered behavior is the updated analysis matching a full analysis of randomly reordered and modified testdata
+    """
+    rand = random.Random(0)
+    for _ in range(50):
+        analysis = Analysis(*update_data(1))
+        reqs, checks, testdata, matrix = update_data(1)
+        # Unknown checks are listed in the order of the testdata
+        testdata += [Check("testsuite3", "testcase1", "check1", 1, None), \
+                     Check("testsuite2", "testcase1", "check1", 0, "msg1")]
+        analysis.update(reqs, checks, testdata, matrix)
+
+        reqs, checks, testdata, matrix = update_data(1)
+        testdata += [Check("testsuite3", "testcase1", "check1", 1, None), \
+                     Check("testsuite2", "testcase1", "check1", 0, "msg1")]
+        rand.shuffle(testdata)
+        for i in rand.sample(range(len(testdata)), 2):
+            check = testdata[i]
+            testdata[i] = Check(check.testsuite, check.testcase, check.shortid, 1 - check.status, \
+                                None if check.status == 0 else "msg2")
+        analysis.update(reqs, checks, testdata, matrix)
+
+        expected = Analysis(*update_data(1)[:2], testdata, update_data(1)[3])
+        assert_same_analysis(analysis, expected)
+        assert [check.id for check in analysis.testdata] == [check.id for check in expected.testdata]
+        assert [check.status for check in analysis.testdata] == [check.status for check in expected.testdata]
+
+def test_Analysis_update_05():
+    """Unit test for the update method of the Analysis class
+
+    The covered behaviors are:
+        * check run several times replaced by a single run with the same status
+        * previous testdata checks not modified
+    """
+    reqs, checks, testdata, matrix = update_data(1)
+    testdata[0] = merged_check(testdata[0], 1, None, 2)
+    previous_testdata = testdata
+    analysis = Analysis(reqs, checks, testdata, matrix)
+
+    reqs, checks, testdata, matrix = update_data(1)
+    testdata[1] = merged_check(testdata[1], 1, None, 1)
+    with patch.object(Analysis, "analyse_tests") as stub_analyse_tests:
+        analysis.update(reqs, checks, testdata, matrix)
+        stub_analyse_tests.assert_not_called()
+
+    assert_same_analysis(analysis, Analysis(*update_data(1)[:2], testdata, update_data(1)[3]))
+    assert [check.runs for check in analysis.testdata] == [1, 1, 1, 1]
+    assert all(check is new_check for check, new_check in zip(analysis.testdata, testdata))
+    assert analysis.testsuites["testsuite1"]["testcase1"][1] is testdata[1]
+    assert previous_testdata[0].runs == 2
+    assert not previous_testdata[1].status
+
+    # The unchanged check is not updated again
+    with patch.object(Analysis, "update_testdata") as stub_update_testdata:
+        analysis.update(*update_data(1)[:2], testdata, update_data(1)[3])
+        stub_update_testdata.assert_not_called()
+
+def test_Analysis_update_06(tmp_path):
+    """Unit test for the update method of the Analysis class
+
+    The covered behavior is a testdata shard added and removed, the testdata checks being shared with an in-memory
+    cache
+    """
+    cache = Cache(None)
+    testdata_path = tmp_path / "testdata"
+    testdata_path.mkdir()
+    (testdata_path / "a.csv").write_text("testsuite1.testcase1.check1;1\n")
+    reqs, checks, _, matrix = update_data(1)
+
+    def load():
+        return merge_testdata(import_testdata(str(testdata_path), cache=cache), MergePolicy.ANY_FAIL)
+
+    analysis = Analysis(reqs, checks, load(), matrix)
+    (testdata_path / "b.csv").write_text("testsuite1.testcase1.check1;0;msg1\n")
+    analysis.update(reqs, checks, load(), matrix)
+    assert_same_analysis(analysis, Analysis(*update_data(1)[:2], load(), update_data(1)[3]))
+    assert (analysis.num_successfull_checks, analysis.num_failed_checks) == (0, 1)
+
+    (testdata_path / "b.csv").unlink()
+    analysis.update(reqs, checks, load(), matrix)
+    assert_same_analysis(analysis, Analysis(*update_data(1)[:2], load(), update_data(1)[3]))
+    assert (analysis.num_successfull_checks, analysis.num_failed_checks) == (1, 0)
+    assert load()[0].status
+
 def test_Analysis_analyse_consistency_01():
     """Unit test for the analyse_consistency method of the Analysis class
 
@@ -831,3 +1132,107 @@ def test_Analysis_analyse_consistency_11():
     assert len(log_imp.msgs) == 0
     assert len(log_warn.msgs) == 3
     assert len(log_error.msgs) == 0
+
+def test_Analysis_analyse_consistency_12():
+    """Unit test for the analyse_consistency method of the Analysis class
+
+    The covered behaviors are:
+        * indexes of the requirement ids and derivedfrom links
+        * consistency rules recorded as profiler stages
+    """
+    reqs = [Req("U_req1", "description1", {}), Req("F_req1", "description2", {"derivedfrom": ["U_req1"]})]
+    profiler.start(trace_memory=False)
+    try:
+        analysis = Analysis(reqs, [], [], Matrix())
+    finally:
+        profiler.stop()
+
+    assert analysis.reqs_ids == {"U_req1", "F_req1"}
+    assert analysis.derived_from_links == [("F_req1", ["U_req1"])]
+    assert [stage.name for stage in profiler.stages] == [ \
+        "consistency:matrix_up_to_date", \
+        "consistency:untraceable_reqs_traced", \
+        "consistency:matrix_reqs_exist", \
+        "consistency:matrix_duplicate_traces", \
+        "consistency:untraceable_justifications", \
+        "consistency:duplicate_reqs", \
+        "consistency:derived_from_reqs_exist", \
+        "consistency:derived_from_itself", \
+        "consistency:derived_from_duplicates", \
+        "consistency:duplicate_checks" \
+    ]
+
+#
+# Tests targetting functions from the analysis module
+#
+
+#
+# Tests targetting ResultsSummary class
+#
+
+def test_ResultsSummary_01():
+    """Unit test for the ResultsSummary class
+
+    The covered behavior is the aggregation of the same counters as the analyse_tests method of the Analysis class
+    """
+    checks = [Check("testsuite{}".format(i % 3), "testcase1", "check{}".format(i)) for i in range(8)]
+    testdata = [Check("testsuite{}".format(i % 4), "testcase1", "check{}".format(i), i % 3 > 0, "msg") \
+                    for i in range(2, 12)]
+    with patch.object(Analysis, "analyse"):
+        analysis = Analysis([], checks, testdata, None)
+    analysis.analyse_tests()
+
+    # The testdata is only iterated once
+    summary = ResultsSummary(checks).add_all(iter(testdata))
+    assert summary.num_successfull_checks == analysis.num_successfull_checks
+    assert summary.num_failed_checks == analysis.num_failed_checks
+    assert summary.num_successfull_unknown_checks == analysis.num_successfull_unknown_checks
+    assert summary.num_failed_unknown_checks == analysis.num_failed_unknown_checks
+    assert summary.num_checks_in_testsuites == analysis.num_checks_in_testsuites
+    assert summary.check_status_by_check_id == analysis.check_status_by_check_id
+    assert summary.unknown_checks == analysis.unknown_checks
+    assert summary.test_result == analysis.test_result == 87
+
+def test_ResultsSummary_02():
+    """Unit test for the ResultsSummary class
+
+    The covered behavior is the counters updated as each check is added
+    """
+    summary = ResultsSummary([Check("testsuite1", "testcase1", "check1")])
+    assert summary.test_result == 0
+
+    summary.add(Check("testsuite1", "testcase1", "check1", 1, None))
+    summary.add(Check("testsuite2", "testcase1", "check2", 0, "msg"))
+    assert summary.num_successfull_checks == 1
+    assert summary.num_failed_checks == 1
+    assert summary.num_failed_unknown_checks == 1
+    assert summary.num_checks_in_testsuites == {"testsuite1": 1, "testsuite2": 1}
+    assert summary.check_status_by_check_id == {"testsuite1.testcase1.check1": True, "testsuite2.testcase1.check2": False}
+
+    summary.compute_test_result()
+    assert summary.test_result == 100
+
+    summary = ResultsSummary([]).add_all([Check("testsuite1", "testcase1", "check1", 1, None)])
+    assert summary.test_result == 0
+
+def test_find_duplicates():
+    """Unit test for the find_duplicates function
+
+    The covered behaviors are:
+        * no duplicates
+        * ids duplicated multiple times
+    """
+    assert find_duplicates([]) == []
+    assert find_duplicates(["id1", "id2"]) == []
+    assert find_duplicates(["id1", "id2", "id1", "id3", "id2", "id1"]) == ["id1", "id2"]
+
+def test_same_order():
+    """Unit test for the same_order function
+    """
+    reqs = [Req("req{}".format(i), "", {}) for i in range(4)]
+    reqs_by_id = {req.id: req for req in reqs}
+
+    assert same_order(reqs, reqs, reqs_by_id, reqs_by_id)
+    # Added and removed items are ignored
+    assert same_order(reqs[:3], reqs[1:], {req.id: req for req in reqs[:3]}, {req.id: req for req in reqs[1:]})
+    assert not same_order(reqs, reqs[::-1], reqs_by_id, reqs_by_id)
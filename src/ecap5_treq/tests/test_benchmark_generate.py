@@ -0,0 +1,95 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+# 
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+# 
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import pytest
+
+from ecap5_treq.analysis import Analysis
+from ecap5_treq.benchmark.generate import generate
+from ecap5_treq.check import import_checks, import_testdata
+from ecap5_treq.config import SpecFormat
+from ecap5_treq.log import log_error, log_warn, log_imp, log_clear
+from ecap5_treq.matrix import Matrix
+from ecap5_treq.req import import_reqs
+
+#
+# Fixture definitions
+#
+
+@pytest.fixture(autouse=True)
+def reset():
+    log_clear()
+
+def read_files(path: str) -> dict[str, str]:
+    contents = {}
+    for root, _, filenames in os.walk(path):
+        for filename in filenames:
+            with open(os.path.join(root, filename), encoding="utf-8") as file:
+                contents[os.path.relpath(os.path.join(root, filename), path)] = file.read()
+    return contents
+
+#
+# Tests targetting functions from the generate module
+#
+
+@pytest.mark.parametrize("spec_format", [SpecFormat.TEX, SpecFormat.RST])
+def test_generate_01(tmp_path, spec_format):
+    """Unit test for the generate function
+
+    The covered behaviors are:
+        * number of imported requirements, checks and testdata
+        * analysis without any logged message
+    """
+    config = generate(str(tmp_path), 250, spec_format)
+
+    reqs = import_reqs(config.get("spec_dir_path"), config.get("spec_format"))
+    checks = import_checks(config.get("test_dir_path"))
+    testdata = import_testdata(config.get("testdata_dir_path"))
+    matrix = Matrix(config.get("matrix_path"))
+    assert len(reqs) == 250
+    assert len(checks) == 187
+    assert set(check.id for check in testdata) == set(check.id for check in checks)
+    assert len(os.listdir(config.get("spec_dir_path"))) == 3
+    assert len(os.listdir(config.get("test_dir_path"))) == 2
+    req = next(req for req in reqs if req.id == "F_req1")
+    assert req.derived_from == ["U_req0"]
+    assert req.allocation == ["memory"]
+
+    analysis = Analysis(reqs, checks, testdata, matrix)
+    assert len(log_error.msgs) == 0
+    assert len(log_warn.msgs) == 0
+    assert len(log_imp.msgs) == 0
+    assert 0 < analysis.test_result < 100
+    assert len(matrix.untraceable) == 2
+
+def test_generate_02(tmp_path):
+    """Unit test for the generate function
+
+    The covered behaviors are:
+        * same data generated with the same seed
+        * different data generated with another seed
+    """
+    generate(str(tmp_path / "data1"), 100)
+    generate(str(tmp_path / "data2"), 100)
+    generate(str(tmp_path / "data3"), 100, seed=1)
+
+    assert read_files(str(tmp_path / "data1")) == read_files(str(tmp_path / "data2"))
+    assert read_files(str(tmp_path / "data1")) != read_files(str(tmp_path / "data3"))
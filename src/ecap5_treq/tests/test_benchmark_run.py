@@ -0,0 +1,121 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+# 
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+# 
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+from mock import patch
+import pytest
+
+from ecap5_treq.benchmark.run import STAGES, run_stages, run, compare, format_results, main
+from ecap5_treq.benchmark.generate import generate
+
+#
+# Tests targetting functions from the run module
+#
+
+def test_run_stages(tmp_path):
+    """Unit test for the run_stages function
+
+    The covered behaviors are:
+        * duration of each stage
+        * testdata restored after the cached analyses
+    """
+    config = generate(str(tmp_path), 20)
+    testdata = {name: (tmp_path / "testdata" / name).read_text() for name in os.listdir(str(tmp_path / "testdata"))}
+    timings = run_stages(config)
+    assert list(timings.keys()) == STAGES
+    assert all(duration >= 0 for duration in timings.values())
+    assert {name: (tmp_path / "testdata" / name).read_text() for name in os.listdir(str(tmp_path / "testdata"))} \
+                == testdata
+
+def test_run(tmp_path):
+    """Unit test for the run function
+
+    The covered behaviors are:
+        * data generated for each scale
+        * fastest duration of each stage kept
+    """
+    with patch("ecap5_treq.benchmark.run.run_stages", side_effect=[{"stage": 2}, {"stage": 1}, {"stage": 3}, \
+                                                                    {"stage": 5}, {"stage": 4}, {"stage": 6}]):
+        results = run([10, 20], str(tmp_path), repeat=3)
+    assert results == {"10": {"stage": 1}, "20": {"stage": 4}}
+    assert (tmp_path / "10" / "matrix.csv").exists()
+    assert (tmp_path / "20" / "matrix.csv").exists()
+
+def test_compare():
+    """Unit test for the compare function
+
+    The covered behaviors are:
+        * regression above the tolerance
+        * slow down within the tolerance
+        * slow down below the noise threshold
+        * scale and stage missing from the baseline
+    """
+    baseline = {"1000": {"stage1": 1.0, "stage2": 1.0, "stage3": 0.01}}
+    results = {
+        "1000": {"stage1": 1.5, "stage2": 1.2, "stage3": 0.04, "stage4": 1.0},
+        "10000": {"stage1": 10.0}
+    }
+    assert compare(results, baseline) == [("1000", "stage1", 1.0, 1.5)]
+    assert compare(results, baseline, 0.1) == [("1000", "stage1", 1.0, 1.5), ("1000", "stage2", 1.0, 1.2)]
+
+def test_format_results():
+    """Unit test for the format_results function
+
+    The covered behaviors are:
+        * without baseline
+        * with baseline
+    """
+    results = {"1000": {"stage1": 1.5, "stage2": 0.5}}
+    lines = format_results(results).split("\n")
+    assert len(lines) == 4
+    assert lines[1].split() == ["1000", "stage1", "1.500"]
+    assert lines[3].split() == ["1000", "total", "2.000"]
+
+    lines = format_results(results, {"1000": {"stage1": 1.0}}).split("\n")
+    assert lines[1].split() == ["1000", "stage1", "1.500", "1.000", "1.50"]
+    assert lines[2].split() == ["1000", "stage2", "0.500"]
+
+@patch("builtins.print")
+@patch("ecap5_treq.benchmark.run.run")
+def test_main(stub_run, stub_print, tmp_path):
+    """Unit test for the main function
+
+    The covered behaviors are:
+        * baseline saved
+        * baseline compared without regression
+        * regression exit code
+    """
+    path = str(tmp_path / "baseline.json")
+    stub_run.return_value = {"1000": {"stage1": 1.0}}
+    main(["--scales", "1000", "--dir", str(tmp_path), "--baseline", path, "--save-baseline"])
+    stub_run.assert_called_once_with([1000], str(tmp_path), "TEX", 1, 0)
+    with open(path, encoding="utf-8") as file:
+        assert json.load(file) == {"1000": {"stage1": 1.0}}
+
+    stub_run.return_value = {"1000": {"stage1": 1.1}}
+    main(["--baseline", path, "--repeat", "2"])
+    assert stub_run.call_args.args[3] == 2
+
+    stub_run.return_value = {"1000": {"stage1": 2.0}}
+    with pytest.raises(SystemExit) as e:
+        main(["--baseline", path])
+    assert e.value.code == 1
@@ -0,0 +1,250 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+# 
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+# 
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import pickle
+from mock import patch, Mock, call
+import pytest
+
+from ecap5_treq.cache import Cache, CACHE_VERSION, cached_parse, hash_file
+from ecap5_treq.log import log_warn, log_clear
+
+#
+# Fixture definitions
+#
+
+@pytest.fixture(autouse=True)
+def reset():
+    log_clear()
+
+@pytest.fixture()
+def source_file(tmp_path):
+    path = tmp_path / "source.tex"
+    path.write_text("content")
+    return str(path)
+
+def touch(path, content = None):
+    """Modifies the modification time of a file and optionally its content
+    """
+    if content is not None:
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+#
+# Tests targetting Cache class
+#
+
+def test_Cache_constructor(tmp_path):
+    """Unit test for the constructor of the Cache class
+    """
+    cache = Cache(str(tmp_path / "cache"))
+    assert cache.path == str(tmp_path / "cache")
+    assert cache.use_hash == False
+    assert cache.tables == {}
+
+    cache = Cache(str(tmp_path / "cache"), True)
+    assert cache.use_hash == True
+
+def test_Cache_get_01(tmp_path, source_file):
+    """Unit test for the get method of the Cache class
+
+    The covered behaviors are:
+        * missing entry
+        * valid entry with warnings logged again
+    """
+    cache = Cache(str(tmp_path / "cache"))
+    assert cache.get("tex", source_file) is None
+
+    cache.set("tex", source_file, ["record1", "record2"], ["warning1"])
+    assert cache.get("tex", source_file) == ["record1", "record2"]
+    assert log_warn.msgs == ["warning1"]
+
+def test_Cache_get_02(tmp_path, source_file):
+    """Unit test for the get method of the Cache class
+
+    The covered behaviors are:
+        * entry invalidated by a modification time change
+        * entry invalidated by a size change
+    """
+    cache = Cache(str(tmp_path / "cache"))
+    cache.set("tex", source_file, ["record1"], [])
+    touch(source_file)
+    assert cache.get("tex", source_file) is None
+
+    cache.set("tex", source_file, ["record1"], [])
+    with open(source_file, "a", encoding="utf-8") as file:
+        file.write("more content")
+    assert cache.get("tex", source_file) is None
+
+def test_Cache_get_03(tmp_path, source_file):
+    """Unit test for the get method of the Cache class
+
+    The covered behaviors are, with hashing enabled:
+        * touched file with unchanged content
+        * touched file with changed content
+    """
+    cache = Cache(str(tmp_path / "cache"), True)
+    cache.set("tex", source_file, ["record1"], [])
+    cache.save()
+
+    touch(source_file)
+    assert cache.get("tex", source_file) == ["record1"]
+    assert "tex" in cache.dirty
+    # The entry is updated with the new modification time
+    assert cache.tables["tex"][source_file]["mtime"] == os.stat(source_file).st_mtime_ns
+
+    touch(source_file, "other")
+    assert cache.get("tex", source_file) is None
+
+def test_Cache_save(tmp_path, source_file):
+    """Unit test for the save method of the Cache class
+
+    The covered behaviors are:
+        * entries are reloaded by another cache object
+        * entries of files not accessed during the run are discarded
+        * unmodified tables are not written
+    """
+    cache = Cache(str(tmp_path / "cache"))
+    cache.set("tex", source_file, ["record1"], ["warning1"])
+    cache.save()
+
+    assert os.path.exists(str(tmp_path / "cache" / "tex.pickle"))
+
+    cache = Cache(str(tmp_path / "cache"))
+    assert cache.get("tex", source_file) == ["record1"]
+
+    # A table with an entry that was not accessed is rewritten without it
+    cache = Cache(str(tmp_path / "cache"))
+    cache.load("tex")
+    cache.save()
+    cache = Cache(str(tmp_path / "cache"))
+    assert cache.get("tex", source_file) is None
+
+    # A table that was not modified is not rewritten
+    cache = Cache(str(tmp_path / "cache"))
+    with patch("builtins.open") as stub_open:
+        cache.load("checks")
+        cache.save()
+        stub_open.assert_called_once()
+
+def test_Cache_load(tmp_path, source_file):
+    """Unit test for the load method of the Cache class
+
+    The covered behaviors are:
+        * missing cache file
+        * corrupted cache file
+        * cache file from another version
+    """
+    cache = Cache(str(tmp_path / "cache"))
+    assert cache.load("tex") == {}
+
+    os.makedirs(str(tmp_path / "cache"))
+    with open(str(tmp_path / "cache" / "tex.pickle"), "wb") as file:
+        file.write(b"corrupted")
+    cache = Cache(str(tmp_path / "cache"))
+    assert cache.load("tex") == {}
+
+    with open(str(tmp_path / "cache" / "tex.pickle"), "wb") as file:
+        pickle.dump({"version": CACHE_VERSION + 1, "entries": {source_file: {}}}, file)
+    cache = Cache(str(tmp_path / "cache"))
+    assert cache.load("tex") == {}
+
+def test_Cache_memory(source_file):
+    """Unit test for the Cache class without cache directory
+
+    The covered behavior is the entries kept in memory without accessing any cache file
+    """
+    cache = Cache(None)
+    with patch("builtins.open") as stub_open:
+        assert cache.get("tex", source_file) is None
+        cache.set("tex", source_file, ["record1"], [])
+        cache.save()
+        stub_open.assert_not_called()
+    assert cache.get("tex", source_file) == ["record1"]
+
+def test_Cache_state(tmp_path):
+    """Unit test for the get_state and set_state methods of the Cache class
+
+    The covered behaviors are:
+        * missing state
+        * stored state read by another run
+        * corrupted state file
+        * state file from another version
+    """
+    cache = Cache(str(tmp_path / "cache"))
+    assert cache.get_state("analysis") is None
+
+    cache.set_state("analysis", {"key": ["value"]})
+    assert os.path.exists(str(tmp_path / "cache" / "analysis.state.pickle"))
+    cache = Cache(str(tmp_path / "cache"))
+    assert cache.get_state("analysis") == {"key": ["value"]}
+
+    with open(str(tmp_path / "cache" / "analysis.state.pickle"), "wb") as file:
+        file.write(b"corrupted")
+    assert cache.get_state("analysis") is None
+
+    with open(str(tmp_path / "cache" / "analysis.state.pickle"), "wb") as file:
+        pickle.dump({"version": CACHE_VERSION + 1, "state": {"key": ["value"]}}, file)
+    assert cache.get_state("analysis") is None
+
+#
+# Tests targetting functions from the cache module
+#
+
+def test_cached_parse_01(source_file):
+    """Unit test for the cached_parse function
+
+    The covered behavior is without cache
+    """
+    parse = Mock(return_value=["record1"])
+    assert cached_parse(None, "tex", source_file, parse) == ["record1"]
+    parse.assert_called_once_with(source_file)
+
+def test_cached_parse_02(tmp_path, source_file):
+    """Unit test for the cached_parse function
+
+    The covered behaviors are:
+        * a first parse storing the records and warnings in the cache
+        * a second parse recovering the records from the cache
+    """
+    def parse(file):
+        log_warn("warning1")
+        return ["record1"]
+    stub_parse = Mock(side_effect=parse)
+
+    cache = Cache(str(tmp_path / "cache"))
+    assert cached_parse(cache, "tex", source_file, stub_parse) == ["record1"]
+    assert cached_parse(cache, "tex", source_file, stub_parse) == ["record1"]
+    stub_parse.assert_called_once_with(source_file)
+    assert log_warn.msgs == ["warning1", "warning1"]
+
+def test_hash_file(tmp_path, source_file):
+    """Unit test for the hash_file function
+    """
+    other_file = str(tmp_path / "other.tex")
+    with open(other_file, "w", encoding="utf-8") as file:
+        file.write("content")
+    assert hash_file(source_file) == hash_file(other_file)
+
+    touch(other_file, "other")
+    assert hash_file(source_file) != hash_file(other_file)
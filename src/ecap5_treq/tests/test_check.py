@@ -24,8 +24,9 @@ import contextlib
 from mock import patch, Mock, mock_open, call
 import pytest
 import io
+from xml.etree.ElementTree import iterparse
 
-from ecap5_treq.check import Check, import_checks, import_testdata, process_check_id, process_keyword, process_string
+from ecap5_treq.check import Check, import_checks, import_checks_from_file, import_testdata, import_testdata_from_file, iter_testdata, iter_testdata_from_junit_file, process_check_id
 from ecap5_treq.log import log_error, log_warn, log_clear
 
 #
@@ -36,16 +37,24 @@ from ecap5_treq.log import log_error, log_warn, log_clear
 def reset():
     log_clear()
     stubbed_glob.file_list = []
+    stubbed_glob.xml_file_list = []
     stubbed_open.file_contents = {}
 
 def stubbed_glob(path, recursive=True):
+    if path.endswith(".xml"):
+        return stubbed_glob.xml_file_list
     return stubbed_glob.file_list
 
 def stubbed_open(path, encoding = "", newline=""):
+    if encoding == "rb":
+        return io.BytesIO(stubbed_open.file_contents[path].encode("utf-8"))
     reader = io.BufferedReader(io.BytesIO(stubbed_open.file_contents[path].encode(encoding)))
     output = io.TextIOWrapper(reader)
     return output
 
+def stubbed_open_source(path):
+    return contextlib.nullcontext(stubbed_open.file_contents[path].encode("utf-8"))
+
 #
 # Tests targetting Check class
 #
@@ -72,6 +81,7 @@ def test_Check_constructor():
     assert check.id == "testsuite.testcase.check1"
     assert check.status == False
     assert check.error_msg == "msg"
+    assert check.runs == 1
 
     check = Check("testsuite", "testcase", "check1", 1, "msg")
     assert check.testsuite == "testsuite"
@@ -95,6 +105,9 @@ def test_Check_to_str():
     check = Check("testsuite", "testcase", "check1", 0, "msg")
     check.to_str()
 
+    check.runs = 2
+    assert "runs=2" in check.to_str()
+
 def test_Check___repr__():
     """Unit test for the __repr__ method of the Check class
 
@@ -141,13 +154,40 @@ def test_Check___eq__():
     other = "foo"
     assert check != other
 
+def test_Check___hash__():
+    """Unit test for the __hash__ method of the Check class
+
+    The covered behaviors are:
+        * checks with the same id and status in sets and as dictionary keys
+        * hash unchanged when the status is modified
+        * interned identifiers
+        * no attribute dictionary
+    """
+    check = Check("testsuite1", "testcase1", "check1")
+    other = Check("testsuite1", "testcase1", "check1")
+    assert len(set([check, other, Check("testsuite1", "testcase1", "check2")])) == 2
+    assert {check: "value"}[other] == "value"
+
+    hash_before = hash(check)
+    check.status = True
+    assert hash(check) == hash_before
+    assert check not in set([other])
+
+    testdata = Check("".join(["testsuite", "1"]), "".join(["testcase", "1"]), "check1", 1, None)
+    assert testdata.testsuite is check.testsuite
+    assert testdata.testcase is check.testcase
+    assert testdata.id is check.id
+
+    with pytest.raises(AttributeError):
+        check.attribute = "value"
+
 #
 # Tests targetting functions from the check module
 #
 
-@patch("builtins.open", side_effect=stubbed_open)
+@patch("ecap5_treq.check.open_source", side_effect=stubbed_open_source)
 @patch("glob.glob", side_effect=stubbed_glob)
-def test_import_checks_01(stub_glob, stub_open):
+def test_import_checks_01(stub_glob, stub_open_source):
     """Unit test for the import_check function
 
     The covered behavior is no test source file
@@ -155,9 +195,9 @@ def test_import_checks_01(stub_glob, stub_open):
     checks = import_checks("path")
     assert len(checks) == 0
 
-@patch("builtins.open", side_effect=stubbed_open)
+@patch("ecap5_treq.check.open_source", side_effect=stubbed_open_source)
 @patch("glob.glob", side_effect=stubbed_glob)
-def test_import_checks_02(stub_glob, stub_open):
+def test_import_checks_02(stub_glob, stub_open_source):
     """Unit test for the import_check function
 
     The covered behavior is two files with no checks
@@ -169,9 +209,9 @@ def test_import_checks_02(stub_glob, stub_open):
     checks = import_checks("path")
     assert len(checks) == 0
 
-@patch("builtins.open", side_effect=stubbed_open)
+@patch("ecap5_treq.check.open_source", side_effect=stubbed_open_source)
 @patch("glob.glob", side_effect=stubbed_glob)
-def test_import_checks_03(stub_glob, stub_open):
+def test_import_checks_03(stub_glob, stub_open_source):
     """Unit test for the import_check function
 
     The covered behaviors are:
@@ -204,9 +244,9 @@ def test_import_checks_03(stub_glob, stub_open):
     assert checks[3].id == "testsuite2.testcase1.check4"
     assert len(log_error.msgs) == 0
 
-@patch("builtins.open", side_effect=stubbed_open)
+@patch("ecap5_treq.check.open_source", side_effect=stubbed_open_source)
 @patch("glob.glob", side_effect=stubbed_glob)
-def test_import_checks_04(stub_glob, stub_open):
+def test_import_checks_04(stub_glob, stub_open_source):
     """Unit test for the import_check function
 
     The covered behaviors are:
@@ -231,6 +271,72 @@ def test_import_checks_04(stub_glob, stub_open):
         assert len(checks) == 0
         assert len(log_error.msgs) == 9
 
+@patch("ecap5_treq.check.open_source", side_effect=stubbed_open_source)
+@patch("glob.glob", side_effect=stubbed_glob)
+def test_import_checks_06(stub_glob, stub_open_source):
+    """Unit test for the import_check function
+
+    The covered behaviors are:
+        * Spaces and line breaks between the keyword, the parenthesis and the id
+        * Checks within line and block comments
+        * Checks within string and char literals
+    """
+    stubbed_glob.file_list = ["file1"]
+    stubbed_open.file_contents["file1"] = """
+        CHECK ( "testsuite1.testcase1.check1", cond, "error message // CHECK(");
+        // CHECK("testsuite1.testcase1.check2", cond, "error message 2");
+        /* CHECK("testsuite1.testcase1.check3", cond, "error message 3");
+           CHECK("testsuite1.testcase1.check4", cond, "error message 4"); */
+        printf("CHECK(\\"testsuite1.testcase1.check5\\")");
+        char quote = '"'; CHECK(
+            "testsuite1.testcase1.check6", cond, "error message 6");
+        MY_CHECK(cond);
+        /* unterminated comment CHECK("testsuite1.testcase1.check7", cond, "error message 7");
+    """
+    checks = import_checks("path")
+
+    assert [check.id for check in checks] == ["testsuite1.testcase1.check1", "testsuite1.testcase1.check6"]
+    assert len(log_error.msgs) == 0
+
+@patch("ecap5_treq.check.open_source", side_effect=stubbed_open_source)
+@patch("glob.glob", side_effect=stubbed_glob)
+def test_import_checks_07(stub_glob, stub_open_source):
+    """Unit test for the import_check function
+
+    The covered behaviors are:
+        * Check without a string literal id
+        * Check without a string literal id at the end of the file
+    """
+    stubbed_glob.file_list = ["file1"]
+    stubbed_open.file_contents["file1"] = "CHECK(\"testsuite1.testcase1.check1\", cond);\n  CHECK(id, cond);\n"
+
+    with pytest.raises(SystemExit):
+        import_checks("path")
+    assert log_error.msgs == ["Syntax error while processing check at file1:2:3: expected a string literal id in \"CHECK(id, cond);\""]
+
+    log_clear()
+    stubbed_open.file_contents["file1"] = "CHECK(id"
+
+    with pytest.raises(SystemExit):
+        import_checks("path")
+    assert log_error.msgs == ["Syntax error while processing check at file1:1:1: expected a string literal id in \"CHECK(id\""]
+
+@patch("ecap5_treq.check.parse_files", return_value=["check1", "check2"])
+@patch("glob.glob", side_effect=stubbed_glob)
+def test_import_checks_05(stub_glob, stub_parse_files):
+    """Unit test for the import_check function
+
+    The covered behavior is importing checks through a cache using multiple jobs
+    """
+    stubbed_glob.file_list = ["file1", "file2"]
+    cache = Mock()
+
+    checks = import_checks("path", cache, 4)
+
+    assert checks == ["check1", "check2"]
+    stub_parse_files.assert_called_once_with(cache, "checks", ["file1", "file2"], import_checks_from_file, 4)
+    cache.save.assert_called_once()
+
 @patch("builtins.open", side_effect=stubbed_open)
 @patch("glob.glob", side_effect=stubbed_glob)
 def test_import_testdata_01(stub_glob, stub_open):
@@ -332,6 +438,187 @@ def test_import_testdata_04(stub_glob, stub_open):
         checks = import_testdata("path")
         assert len(log_error.msgs) == 1
 
+@patch("ecap5_treq.check.cached_parse", return_value=["check"])
+@patch("glob.glob", side_effect=stubbed_glob)
+def test_import_testdata_05(stub_glob, stub_cached_parse):
+    """Unit test for the import_testdata function
+
+    The covered behavior is importing testdata through a cache
+    """
+    stubbed_glob.file_list = ["file1", "file2"]
+    cache = Mock()
+
+    checks = import_testdata("path", cache)
+
+    assert checks == ["check", "check"]
+    stub_cached_parse.assert_has_calls([ \
+        call(cache, "testdata", "file1", import_testdata_from_file), \
+        call(cache, "testdata", "file2", import_testdata_from_file) \
+    ])
+    cache.save.assert_called_once()
+
+@patch("builtins.open", side_effect=stubbed_open)
+@patch("glob.glob", side_effect=stubbed_glob)
+def test_iter_testdata(stub_glob, stub_open):
+    """Unit test for the iter_testdata function
+
+    The covered behaviors are:
+        * files opened as the checks are consumed
+        * same checks as import_testdata
+    """
+    stubbed_glob.file_list = ["file1", "file2"]
+    stubbed_open.file_contents["file1"] = """
+        testsuite1.testcase1.check1;1
+        testsuite1.testcase2.check2;0;error_msg1
+    """
+    stubbed_open.file_contents["file2"] = """
+        testsuite2.testcase3.check3;0
+    """
+    checks = iter_testdata("path")
+    stub_open.assert_not_called()
+
+    assert next(checks) == Check("testsuite1", "testcase1", "check1", 1, None)
+    stub_open.assert_called_once()
+    assert next(checks) == Check("testsuite1", "testcase2", "check2", 0, "error_msg1")
+    stub_open.assert_called_once()
+    assert list(checks) == [Check("testsuite2", "testcase3", "check3", 0, None)]
+
+    assert list(iter_testdata("path")) == import_testdata("path")
+
+@patch("builtins.open", side_effect=stubbed_open)
+@patch("glob.glob", side_effect=stubbed_glob)
+def test_import_testdata_06(stub_glob, stub_open):
+    """Unit test for the import_testdata function
+
+    The covered behavior is importing both CSV and JUnit XML testdata files
+    """
+    stubbed_glob.file_list = ["file1.csv"]
+    stubbed_glob.xml_file_list = ["file2.xml"]
+    stubbed_open.file_contents["file1.csv"] = """
+        testsuite1.testcase1.check1;1
+    """
+    stubbed_open.file_contents["file2.xml"] = """
+        <testsuite><testcase classname="testsuite2.testcase2" name="check2"/></testsuite>
+    """
+    checks = import_testdata("path")
+    assert checks == [Check("testsuite1", "testcase1", "check1", 1, None), \
+                      Check("testsuite2", "testcase2", "check2", 1, None)]
+    assert list(iter_testdata("path")) == checks
+
+@patch("builtins.open", side_effect=stubbed_open)
+def test_iter_testdata_from_junit_file_01(stub_open):
+    """Unit test for the iter_testdata_from_junit_file function
+
+    The covered behaviors are:
+        * nested testsuites
+        * testcase id with and without classname
+        * failure and error with message or text
+        * skipped testcase
+    """
+    stubbed_open.file_contents["file1.xml"] = """<?xml version="1.0" encoding="UTF-8"?>
+        <testsuites>
+            <testsuite name="testsuite1">
+                <properties><property name="seed" value="1"/></properties>
+                <testcase classname="testsuite1.testcase1" name="check1" time="0.1"/>
+                <testcase classname="testsuite1.testcase1" name="check2">
+                    <failure message="error_msg1" type="assert">trace</failure>
+                </testcase>
+                <testcase classname="" name="testsuite1.testcase2.check3">
+                    <system-out>output</system-out>
+                    <error>  error_msg2  </error>
+                </testcase>
+                <testcase classname="testsuite1.testcase2" name="check4">
+                    <failure/>
+                </testcase>
+                <testcase classname="testsuite1.testcase2" name="check5">
+                    <skipped/>
+                </testcase>
+                <system-out>output</system-out>
+            </testsuite>
+            <testsuite name="testsuite2">
+                <testcase name="testsuite2.testcase3.check6"/>
+            </testsuite>
+        </testsuites>
+    """
+    checks = iter_testdata_from_junit_file("file1.xml")
+    stub_open.assert_not_called()
+    assert list(checks) == [
+        Check("testsuite1", "testcase1", "check1", 1, None),
+        Check("testsuite1", "testcase1", "check2", 0, "error_msg1"),
+        Check("testsuite1", "testcase2", "check3", 0, "error_msg2"),
+        Check("testsuite1", "testcase2", "check4", 0, None),
+        Check("testsuite2", "testcase3", "check6", 1, None)
+    ]
+
+@patch("builtins.open", side_effect=stubbed_open)
+def test_iter_testdata_from_junit_file_02(stub_open):
+    """Unit test for the iter_testdata_from_junit_file function
+
+    The covered behaviors are:
+        * ended testcases and testsuites released from the tree
+        * testcases yielded as they are parsed
+    """
+    stubbed_open.file_contents["file1.xml"] = """
+        <testsuites>
+            <testsuite name="testsuite1">
+                <testcase classname="testsuite1.testcase1" name="check1"><system-out>output</system-out></testcase>
+                <testcase classname="testsuite1.testcase1" name="check2"/>
+            </testsuite>
+            <testsuite name="testsuite2">
+                <testcase classname="testsuite2.testcase1" name="check3"/>
+            </testsuite>
+        </testsuites>
+    """
+    parsed = []
+    def recording_iterparse(source, events):
+        for event, element in iterparse(source, events):
+            parsed.append(element)
+            yield event, element
+
+    with patch("xml.etree.ElementTree.iterparse", side_effect=recording_iterparse):
+        checks = iter_testdata_from_junit_file("file1.xml")
+        assert next(checks).id == "testsuite1.testcase1.check1"
+        root = parsed[0]
+        testcase = parsed[2]
+        assert testcase in list(root.iter())
+        # The first testcase is released once the next check is requested
+        assert next(checks).id == "testsuite1.testcase1.check2"
+        assert testcase not in list(root.iter())
+        assert len(testcase) == 0
+        assert next(checks).id == "testsuite2.testcase1.check3"
+        assert list(checks) == []
+        assert len(list(root.iter())) == 1
+
+@patch("builtins.open", side_effect=stubbed_open)
+def test_iter_testdata_from_junit_file_03(stub_open):
+    """Unit test for the iter_testdata_from_junit_file function
+
+    The covered behaviors are:
+        * malformed XML
+        * testcase without a name
+        * wrong check id format
+    """
+    stubbed_open.file_contents["file1.xml"] = """
+        <testsuite><testcase classname="testsuite1.testcase1" name="check1"></testsuite>
+    """
+    with pytest.raises(SystemExit) as e:
+        checks = list(iter_testdata_from_junit_file("file1.xml"))
+    assert len(log_error.msgs) == 1
+
+    stubbed_open.file_contents["file1.xml"] = """
+        <testsuite><testcase classname="testsuite1.testcase1"/></testsuite>
+    """
+    with pytest.raises(SystemExit) as e:
+        checks = list(iter_testdata_from_junit_file("file1.xml"))
+    assert len(log_error.msgs) == 2
+
+    stubbed_open.file_contents["file1.xml"] = """
+        <testsuite><testcase classname="testsuite1" name="check1"/></testsuite>
+    """
+    with pytest.raises(SystemExit) as e:
+        checks = list(iter_testdata_from_junit_file("file1.xml"))
+    assert len(log_error.msgs) == 3
+
 def test_process_check_id_01():
     """Unit test for the process_check_id function
 
@@ -387,64 +674,3 @@ def test_process_check_id_02():
     with pytest.raises(SystemExit) as e:
         testsuite, testcase, shortid = process_check_id(".testcase.shortid")
         assert len(log_error.msgs) == 1
-
-def test_process_keyword_01():
-    """Unit test for the process_keyword function
-
-    The covered behaviors are :
-        * Cur equal zero
-        * Cur greater than zero
-        * Keyword without spaces
-        * Keyword with spaces
-    """
-    cur = process_keyword(0, "CHECK(\"id\")")
-    assert cur == 6
-
-    cur = process_keyword(5, "     CHECK (  \"id\")")
-    assert cur == 14
-
-def test_process_keyword_02():
-    """Unit test for the process_keyword function
-
-    The covered behavior is syntax error in keyword
-    """
-    with pytest.raises(SystemExit) as e:
-        cur = process_keyword(0, "CHECK(id\")")
-        # A syntax error shall be raised
-        assert len(log_error.msgs) == 1
-
-    with pytest.raises(SystemExit) as e:
-        # A syntax error shall be raised
-        cur = process_keyword(0, "CHECK(id)")
-        assert len(log_error.msgs) == 1
-
-def test_process_string_01():
-    """Unit test for the process_string function
-
-    The covered behaviors are:
-        * Cur equal zero
-        * Cur greater than zero
-        * Valid string
-    """
-    cur, result = process_string(0, "\"string content\"")
-    assert cur == 16
-    assert result == "string content"
-
-    cur, result = process_string(5, "     \"string content\"")
-    assert cur == 21
-    assert result == "string content"
-
-def test_process_string_02():
-    """Unit test for the process_string function
-
-    The covered behaviors are:
-        * Missing starting \"
-        * Missing closing \"
-    """
-    with pytest.raises(SystemExit) as e:
-        cur, result = process_string(0, "string content\"")
-        assert len(log_error.msgs) == 1
-
-    with pytest.raises(SystemExit) as e:
-        cur, result = process_string(0, "\"string content")
-        assert len(log_error.msgs) == 2
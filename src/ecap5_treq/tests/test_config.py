@@ -123,13 +123,23 @@ def test_Config_defaults():
 
     assert "spec_format" in config
     assert "disable_allocation" in config
+    assert "cache_hash" in config
+    assert config.get("jobs") == 1
+    assert config.get("incremental") == False
+    assert config.get("testdata_merge") == "last"
+    assert config.get("testdata_pass_rate") == 0.5
 
-    configuration = "{ \"spec_format\": \"spec_format\", \"disable_allocation\": \"disable_allocation\" }"
+    configuration = "{ \"spec_format\": \"spec_format\", \"disable_allocation\": \"disable_allocation\", \"cache_hash\": \"cache_hash\", \"jobs\": 4, \"incremental\": true, \"testdata_merge\": \"any_fail\", \"testdata_pass_rate\": 0.8 }"
     with patch("builtins.open", mock_open(read_data=configuration)):
         config = Config("path")
 
         assert "spec_format" in config
         assert "disable_allocation" in config
+        assert "cache_hash" in config
+        assert config.get("jobs") == 4
+        assert config.get("incremental") == True
+        assert config.get("testdata_merge") == "any_fail"
+        assert config.get("testdata_pass_rate") == 0.8
 
 def test_Config_get(stub_path_to_abs_path):
     """Unit test for the get method of the Config class
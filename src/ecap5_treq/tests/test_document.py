@@ -0,0 +1,65 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+#
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+#
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+import io
+
+from ecap5_treq.document import AlertKind, DocumentWriter, heading_content
+
+#
+# Tests targetting DocumentWriter class
+#
+
+def test_DocumentWriter():
+    """Unit test for the DocumentWriter class
+
+    The covered behaviors are:
+        * raw html content
+        * headings with and without anchor
+        * alerts
+        * paragraphs with and without emphasis
+    """
+    out = io.StringIO()
+    doc = DocumentWriter(out)
+    doc.begin()
+    doc.heading(1, "title1", "anchor1")
+    doc.write("<table></table>\n")
+    doc.heading(3, "title2")
+    doc.alert(AlertKind.WARNING, "<samp>msg1</samp>")
+    doc.paragraph("content1", strong=True)
+    doc.paragraph("content2")
+    doc.end()
+
+    assert out.getvalue() == "# <a id=\"anchor1\"></a> title1\n" \
+                             "<table></table>\n" \
+                             "### title2\n" \
+                             "\n> [!WARNING]\n> <samp>msg1</samp>\n" \
+                             "**content1**" \
+                             "content2"
+
+#
+# Tests targetting functions of the document module
+#
+
+def test_heading_content():
+    """Unit test for the heading_content function
+    """
+    assert heading_content("title1") == "title1"
+    assert heading_content("title1", "anchor1") == "<a id=\"anchor1\"></a> title1"
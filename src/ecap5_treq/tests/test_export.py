@@ -0,0 +1,148 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+# 
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+# 
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import sqlite3
+from mock import patch
+import pytest
+
+from ecap5_treq.analysis import Analysis
+from ecap5_treq.check import Check
+from ecap5_treq.export import export_db
+from ecap5_treq.matrix import Matrix
+from ecap5_treq.req import Req, ReqStatus
+from ecap5_treq.log import log_clear
+
+#
+# Fixture definitions
+#
+
+@pytest.fixture(autouse=True)
+def reset():
+    log_clear()
+
+@pytest.fixture()
+def analysis():
+    reqs = [ \
+        Req("U_req1", "description1", {"allocation": ["block1", "block2"]}), \
+        Req("F_req1", "description2", {"derivedfrom": ["U_req1"]}), \
+        Req("F_req2", "description3", {}) \
+    ]
+    checks = [ \
+        Check("testsuite1", "testcase1", "check1"), \
+        Check("testsuite1", "testcase2", "check2") \
+    ]
+    testdata = [ \
+        Check("testsuite1", "testcase1", "check1", 0, "msg1"), \
+        Check("testsuite2", "testcase1", "check3", 1, None) \
+    ]
+    matrix = Matrix()
+    matrix.add("testsuite1.testcase1.check1", ["F_req1"])
+    matrix.add("testsuite1.testcase2.check2", ["F_req1", "U_req1"])
+    matrix.add_untraceable("F_req2", "just1")
+    return Analysis(reqs, checks, testdata, matrix)
+
+def query(path: str, sql: str) -> list[tuple]:
+    """Returns the rows of a query on the exported database
+    """
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute(sql).fetchall()
+    finally:
+        connection.close()
+
+#
+# Tests targetting functions from the export module
+#
+
+def test_export_db_01(tmp_path, analysis):
+    """Unit test for the export_db function
+
+    The covered behavior is the export of the imported data and of the analysis results
+    """
+    path = str(tmp_path / "export.db")
+    export_db(analysis, path)
+
+    assert query(path, "SELECT id, description, status, result FROM reqs ORDER BY position") == [ \
+        ("U_req1", "description1", ReqStatus.COVERED, 0), \
+        ("F_req1", "description2", ReqStatus.COVERED, 0), \
+        ("F_req2", "description3", ReqStatus.UNTRACEABLE, 0) \
+    ]
+    assert query(path, "SELECT * FROM req_derived_from") == [("F_req1", "U_req1")]
+    assert query(path, "SELECT * FROM req_allocation") == [("U_req1", "block1"), ("U_req1", "block2")]
+    assert query(path, "SELECT id, testsuite, testcase, shortid, status, skipped FROM checks ORDER BY position") == [ \
+        ("testsuite1.testcase1.check1", "testsuite1", "testcase1", "check1", 0, 0), \
+        ("testsuite1.testcase2.check2", "testsuite1", "testcase2", "check2", None, 1) \
+    ]
+    assert query(path, "SELECT id, status, error_msg, runs, unknown FROM testdata ORDER BY position") == [ \
+        ("testsuite1.testcase1.check1", 0, "msg1", 1, 0), \
+        ("testsuite2.testcase1.check3", 1, None, 1, 1) \
+    ]
+    assert query(path, "SELECT check_id FROM traces WHERE req_id = 'F_req1'") == [ \
+        ("testsuite1.testcase1.check1",), \
+        ("testsuite1.testcase2.check2",) \
+    ]
+    assert query(path, "SELECT * FROM untraceable") == [("F_req2", "just1")]
+    results = dict(query(path, "SELECT * FROM results"))
+    assert results["test_result"] == analysis.test_result
+    assert results["traceability_result"] == analysis.traceability_result
+    assert results["num_skipped_checks"] == 1
+    assert results["num_successfull_unknown_checks"] == 1
+    assert results["num_untraceable_reqs"] == 1
+
+    # The lookups by requirement id use an index
+    plan = query(path, "EXPLAIN QUERY PLAN SELECT check_id FROM traces WHERE req_id = 'F_req1'")
+    assert "traces_req_id" in plan[0][3]
+
+def test_export_db_02(tmp_path, analysis):
+    """Unit test for the export_db function
+
+    The covered behaviors are:
+        * previous export replaced
+        * previous export kept on failure
+        * temporary file of an interrupted export discarded
+        * identical export not replaced
+    """
+    path = str(tmp_path / "export.db")
+    export_db(analysis, path)
+    analysis.reqs = analysis.reqs[:1]
+    export_db(analysis, path)
+    assert query(path, "SELECT id FROM reqs") == [("U_req1",)]
+
+    analysis.reqs = [Req("U_req2", "description", {"allocation": [None]})]
+    with pytest.raises(sqlite3.IntegrityError):
+        export_db(analysis, path)
+    assert query(path, "SELECT id FROM reqs") == [("U_req1",)]
+    assert not os.path.exists(path + ".tmp")
+
+    # A temporary file left by an interrupted export is discarded
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        file.write("corrupted")
+    analysis.reqs = [Req("U_req3", "description", {})]
+    export_db(analysis, path)
+    assert query(path, "SELECT id FROM reqs") == [("U_req3",)]
+    assert not os.path.exists(path + ".tmp")
+
+    os.utime(path, ns=(0, 0))
+    export_db(analysis, path)
+    assert os.stat(path).st_mtime_ns == 0
+    assert not os.path.exists(path + ".tmp")
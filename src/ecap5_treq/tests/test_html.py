@@ -24,8 +24,10 @@
 import pytest
 from mock import patch, Mock, mock_open, call
 import re
+import io
 
-from ecap5_treq.html import markdown_to_html, process_alerts
+from ecap5_treq.document import AlertKind
+from ecap5_treq.html import HtmlWriter, markdown_to_html, process_alerts
 
 #
 # Tests targetting functions in log module
@@ -51,3 +53,37 @@ def test_process_alerts():
     result = process_alerts(content)
     assert result == "test\n\ntest\n\ntest\n"
 
+
+@patch("ecap5_treq.html.STYLE", "style")
+@patch("ecap5_treq.html.REPLACE_WARNING", r'<div>\1</div>')
+@patch("ecap5_treq.html.REPLACE_CAUTION", r'<div class="caution">\1</div>')
+def test_HtmlWriter():
+    """Unit test for the HtmlWriter class
+
+    The covered behaviors are:
+        * page beginning and end
+        * headings with and without anchor
+        * alerts
+        * paragraphs with and without emphasis
+    """
+    out = io.StringIO()
+    doc = HtmlWriter(out)
+    doc.begin()
+    doc.heading(1, "title1", "anchor1")
+    doc.write("<table></table>\n")
+    doc.heading(3, "title2")
+    doc.alert(AlertKind.WARNING, "<samp>msg1</samp>")
+    doc.alert(AlertKind.CAUTION, "msg2")
+    doc.paragraph("content1", strong=True)
+    doc.paragraph("content2")
+    doc.end()
+
+    assert out.getvalue() == "<html><head><meta charset=\"utf-8\"><style>style</style></head><body><div id=\"report\">" \
+                             "<h1><a id=\"anchor1\"></a> title1</h1>\n" \
+                             "<table></table>\n" \
+                             "<h3>title2</h3>\n" \
+                             "\n<div><samp>msg1</samp></div>\n" \
+                             "\n<div class=\"caution\">msg2</div>\n" \
+                             "<p><strong>content1</strong></p>" \
+                             "<p>content2</p>" \
+                             "</div></body></html>"
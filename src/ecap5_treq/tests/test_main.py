@@ -26,14 +26,22 @@ import pytest
 import io
 import argparse
 import sys
+import json
+import subprocess
 
-from ecap5_treq.main import cmd_print_reqs, cmd_print_checks, cmd_print_testdata, cmd_prepare_matrix, cmd_gen_report, cmd_gen_test_result_badge, cmd_gen_traceability_result_badge, main
+from ecap5_treq.main import cmd_print_reqs, cmd_print_checks, cmd_print_testdata, cmd_prepare_matrix, cmd_gen_report, cmd_gen_test_result_badge, cmd_gen_traceability_result_badge, cmd_gen_all, cmd_export_db, cmd_watch, load_analysis, open_cache, main
+import ecap5_treq
+from ecap5_treq.benchmark.generate import generate
 from ecap5_treq.config import Config
+from ecap5_treq.cache import Cache
 from ecap5_treq.check import Check
 from ecap5_treq.req import Req, ReqStatus
-from ecap5_treq.analysis import Analysis
-from ecap5_treq.matrix import Matrix
+from ecap5_treq.analysis import Analysis, ResultsSummary
+from ecap5_treq.matrix import Matrix, MatrixDb
 from ecap5_treq.log import log_error, log_warn, log_clear, log_imp
+from ecap5_treq.profiling import profiler
+from ecap5_treq.report import generate_report
+from ecap5_treq.watch import WATCH_INTERVAL
 
 #
 # Fixture definitions
@@ -54,12 +62,14 @@ def reset():
 class MockMatrix:
     def __init__(self, path = None):
         self.data = {}
+        self.untraceable = {}
         self.path = path
         if path:
             self.read(path)
 
     def read(self, path):
         self.data["key1"] = ["content1", "content2"]
+        self.untraceable = {}
 
     def __eq__(self, other):
         return isinstance(other, MockMatrix) and \
@@ -102,27 +112,33 @@ class MockConfig:
 # Stub side_effect definitions
 #
 
-def stubbed_import_reqs(path, spec_format):
+def stubbed_import_reqs(path, spec_format, cache=None, jobs=1):
     return stubbed_import_reqs.reqs
 
-def stubbed_import_checks(path):
+def stubbed_import_checks(path, cache=None, jobs=1):
     return stubbed_import_checks.checks
 
-def stubbed_import_testdata(path):
+def stubbed_import_testdata(path, cache=None):
     return stubbed_import_testdata.testdata
 
+def stubbed_iter_testdata(path):
+    yield from stubbed_import_testdata.testdata
+
 def stubbed_prepare_matrix(checks, previous_matrix):
     return stubbed_prepare_matrix.matrix
 
-def stubbed_markdown_to_html(content):
-    return "html\n" + content
+def stubbed_write_report(analysis, out, html=False):
+    out.write("html\nreport\n" if html else "report\n")
+
+def stubbed_generate_report(analysis, html=False):
+    return "html\nreport\n" if html else "report\n"
 
 #
 # Tests targetting the functions of the main module
 #
 
 @patch("builtins.print")
-@patch("ecap5_treq.main.import_reqs", side_effect=stubbed_import_reqs)
+@patch("ecap5_treq.req.import_reqs", side_effect=stubbed_import_reqs)
 def test_cmd_print_reqs(stub_import_reqs, stub_print):
     """Unit test for the cmd_print_reqs function
     """
@@ -140,12 +156,12 @@ def test_cmd_print_reqs(stub_import_reqs, stub_print):
 
     cmd_print_reqs(config)
 
-    stub_import_reqs.assert_called_once_with("path", "TEX")
+    stub_import_reqs.assert_called_once_with("path", "TEX", cache=None, jobs=1)
 
     stub_print.assert_has_calls([call(r) for r in stubbed_import_reqs.reqs])
 
 @patch("builtins.print")
-@patch("ecap5_treq.main.import_checks", side_effect=stubbed_import_checks)
+@patch("ecap5_treq.check.import_checks", side_effect=stubbed_import_checks)
 def test_cmd_print_checks(stub_import_checks, stub_print):
     """Unit test for the cmd_print_checks function
     """
@@ -162,12 +178,12 @@ def test_cmd_print_checks(stub_import_checks, stub_print):
 
     cmd_print_checks(config)
 
-    stub_import_checks.assert_called_once_with("path")
+    stub_import_checks.assert_called_once_with("path", cache=None, jobs=1)
 
     stub_print.assert_has_calls([call(c) for c in stubbed_import_checks.checks])
 
 @patch("builtins.print")
-@patch("ecap5_treq.main.import_testdata", side_effect=stubbed_import_testdata)
+@patch("ecap5_treq.check.import_testdata", side_effect=stubbed_import_testdata)
 def test_cmd_print_testdata(stub_import_testdata, stub_print):
     """Unit test for the cmd_print_testdata function
     """
@@ -184,15 +200,29 @@ def test_cmd_print_testdata(stub_import_testdata, stub_print):
 
     cmd_print_testdata(config)
 
-    stub_import_testdata.assert_called_once_with("path")
+    stub_import_testdata.assert_called_once_with("path", cache=None)
 
     stub_print.assert_has_calls([call(c) for c in stubbed_import_testdata.testdata])
 
-@patch("ecap5_treq.main.Matrix", MockMatrix)
-@patch("builtins.open", new_callable=mock_open)
+    # The runs of a check are merged
+    stubbed_import_testdata.testdata = [ \
+        Check("testsuite1", "testcase1", "check1", 0, "message1"), \
+        Check("testsuite1", "testcase1", "check1", 1, None) \
+    ]
+    stub_print.reset_mock()
+    config.set("testdata_merge", "any_fail")
+
+    cmd_print_testdata(config)
+
+    stub_print.assert_called_once()
+    check = stub_print.call_args.args[0]
+    assert (check.status, check.error_msg, check.runs) == (False, "message1", 2)
+
+@patch("ecap5_treq.matrix.Matrix", MockMatrix)
+@patch("ecap5_treq.output.OutputFile", new_callable=mock_open)
 @patch("builtins.print")
-@patch("ecap5_treq.main.prepare_matrix", side_effect=stubbed_prepare_matrix)
-@patch("ecap5_treq.main.import_checks", side_effect=stubbed_import_checks)
+@patch("ecap5_treq.matrix.prepare_matrix", side_effect=stubbed_prepare_matrix)
+@patch("ecap5_treq.check.import_checks", side_effect=stubbed_import_checks)
 def test_cmd_prepare_matrix_01(stub_import_checks, stub_prepare_matrix, stub_print, stub_open):
     """Unit test for the cmd_prepare_matrix function
 
@@ -214,18 +244,18 @@ def test_cmd_prepare_matrix_01(stub_import_checks, stub_prepare_matrix, stub_pri
     
     cmd_prepare_matrix(config)
 
-    stub_import_checks.assert_called_once_with("path")
+    stub_import_checks.assert_called_once_with("path", cache=None, jobs=1)
 
     stub_prepare_matrix.assert_called_once_with(stubbed_import_checks.checks, previous_matrix)
 
     stub_print.assert_called_once_with("testsuite1.testcase1.check1;req1;req2\r\n")
     stub_open.assert_not_called()
 
-@patch("ecap5_treq.main.Matrix", MockMatrix)
-@patch("builtins.open", new_callable=mock_open)
+@patch("ecap5_treq.matrix.Matrix", MockMatrix)
+@patch("ecap5_treq.output.OutputFile", new_callable=mock_open)
 @patch("builtins.print")
-@patch("ecap5_treq.main.prepare_matrix", side_effect=stubbed_prepare_matrix)
-@patch("ecap5_treq.main.import_checks", side_effect=stubbed_import_checks)
+@patch("ecap5_treq.matrix.prepare_matrix", side_effect=stubbed_prepare_matrix)
+@patch("ecap5_treq.check.import_checks", side_effect=stubbed_import_checks)
 def test_cmd_prepare_matrix_02(stub_import_checks, stub_prepare_matrix, stub_print, stub_open):
     """Unit test for the cmd_prepare_matrix function
 
@@ -250,24 +280,28 @@ def test_cmd_prepare_matrix_02(stub_import_checks, stub_prepare_matrix, stub_pri
     previous_matrix = MockMatrix()
     previous_matrix.read("path")
 
-    stub_import_checks.assert_called_once_with("path2")
+    stub_import_checks.assert_called_once_with("path2", cache=None, jobs=1)
 
     stub_prepare_matrix.assert_called_once_with(stubbed_import_checks.checks, previous_matrix)
 
-    stub_print.assert_called_once()
-    stub_open.assert_called_once_with("path3", "w", encoding="utf-8")
+    stub_print.assert_called_once_with("Matrix updated: 1 added, 1 removed and 0 changed checks, " \
+                                       "0 added, 0 removed and 0 changed untraceable requirements\n" \
+                                       "+ testsuite1.testcase1.check1: req1, req2\n" \
+                                       "- key1: content1, content2")
+    stub_open.assert_called_once_with("path3")
     stub_open.return_value.write.assert_called_once_with("testsuite1.testcase1.check1;req1;req2\r\n")
 
-@patch("ecap5_treq.main.Matrix", MockMatrix)
-@patch("builtins.open", new_callable=mock_open)
+@patch("ecap5_treq.matrix.Matrix", MockMatrix)
+@patch("ecap5_treq.output.OutputFile", new_callable=mock_open)
 @patch("builtins.print")
-@patch("ecap5_treq.main.prepare_matrix", side_effect=stubbed_prepare_matrix)
-@patch("ecap5_treq.main.import_checks", side_effect=stubbed_import_checks)
-@patch("subprocess.check_output")
-def test_cmd_prepare_matrix_03(stub_check_output, stub_import_checks, stub_prepare_matrix, stub_print, stub_open):
+@patch("ecap5_treq.matrix.prepare_matrix", side_effect=stubbed_prepare_matrix)
+@patch("ecap5_treq.check.import_checks", side_effect=stubbed_import_checks)
+def test_cmd_prepare_matrix_03(stub_import_checks, stub_prepare_matrix, stub_print, stub_open):
     """Unit test for the cmd_prepare_matrix function
 
-    The covered behavior is with a specified path for the same previous matrix and with an output
+    The covered behaviors are:
+        * differences output as JSON
+        * non-zero exit code when the matrix changed
     """
     stubbed_import_checks.checks = [ \
         Check("testsuite1", "testcase1", "check1"), \
@@ -282,25 +316,32 @@ def test_cmd_prepare_matrix_03(stub_check_output, stub_import_checks, stub_prepa
     config.set("matrix_path", "path1")
     config.set("test_dir_path", "path2")
     config.set("output", "path3")
+    config.set("json", True)
 
     cmd_prepare_matrix(config)
 
-    previous_matrix = MockMatrix()
-    previous_matrix.read("path")
-
-    stub_import_checks.assert_called_once_with("path2")
-
-    stub_prepare_matrix.assert_called_once_with(stubbed_import_checks.checks, previous_matrix)
-
     stub_print.assert_called_once()
-    stub_open.assert_called_once_with("path3", "w", encoding="utf-8")
+    assert json.loads(stub_print.call_args.args[0])["added_checks"] == \
+                {"testsuite1.testcase1.check1": ["req1", "req2"]}
     stub_open.return_value.write.assert_called_once_with("testsuite1.testcase1.check1;req1;req2\r\n")
 
-@patch("ecap5_treq.main.Matrix", MockMatrix)
-@patch("builtins.open", new_callable=mock_open)
+    config.set("exit_code", True)
+    with pytest.raises(SystemExit) as e:
+        cmd_prepare_matrix(config)
+    assert e.value.code == 1
+
+    # The command succeeds when the matrix is unchanged
+    stubbed_prepare_matrix.matrix = Matrix()
+    stubbed_prepare_matrix.matrix.add("key1", ["content1", "content2"])
+    stub_print.reset_mock()
+    cmd_prepare_matrix(config)
+    assert json.loads(stub_print.call_args.args[0])["removed_checks"] == {}
+
+@patch("ecap5_treq.matrix.Matrix", MockMatrix)
+@patch("ecap5_treq.output.OutputFile", new_callable=mock_open)
 @patch("builtins.print")
-@patch("ecap5_treq.main.prepare_matrix", side_effect=stubbed_prepare_matrix)
-@patch("ecap5_treq.main.import_checks", side_effect=stubbed_import_checks)
+@patch("ecap5_treq.matrix.prepare_matrix", side_effect=stubbed_prepare_matrix)
+@patch("ecap5_treq.check.import_checks", side_effect=stubbed_import_checks)
 def test_cmd_prepare_matrix_04(stub_import_checks, stub_prepare_matrix, stub_print, stub_open):
     """Unit test for the cmd_prepare_matrix function
 
@@ -325,25 +366,71 @@ def test_cmd_prepare_matrix_04(stub_import_checks, stub_prepare_matrix, stub_pri
 
     stub_prepare_matrix.assert_called_once_with(stubbed_import_checks.checks, previous_matrix)
 
-    stub_open.assert_called_once_with("path3", "w", encoding="utf-8")
+    stub_open.assert_called_once_with("path3")
     stub_open.return_value.write.assert_called_once_with("testsuite1.testcase1.check1;req1;req2\r\n")
 
-@patch("ecap5_treq.main.Analysis", MockAnalysis)
-@patch("ecap5_treq.main.Matrix", MockMatrix)
-@patch("builtins.open", new_callable=mock_open)
 @patch("builtins.print")
-@patch("ecap5_treq.main.generate_report_footer", return_value="generate_report_footer\n")
-@patch("ecap5_treq.main.generate_traceability_report", return_value="generate_traceability_report\n")
-@patch("ecap5_treq.main.generate_test_report", return_value="generate_test_report\n")
-@patch("ecap5_treq.main.generate_report_summary", return_value="generate_report_summary\n")
-@patch("ecap5_treq.main.generate_report_warning_section", return_value="generate_report_warning_section\n")
-@patch("ecap5_treq.main.import_testdata", side_effect=stubbed_import_testdata)
-@patch("ecap5_treq.main.import_checks", side_effect=stubbed_import_checks)
-@patch("ecap5_treq.main.import_reqs", side_effect=stubbed_import_reqs)
-def test_cmd_gen_report_01(stub_import_reqs, stub_import_checks, stub_import_testdata, stub_generate_report_warning_section, stub_generate_report_summary, stub_generate_test_report, stub_generate_traceability_report, stub_generate_report_footer, stub_print, stub_open):
+@patch("ecap5_treq.matrix.prepare_matrix", side_effect=stubbed_prepare_matrix)
+@patch("ecap5_treq.check.import_checks", side_effect=stubbed_import_checks)
+def test_cmd_prepare_matrix_05(stub_import_checks, stub_prepare_matrix, stub_print, tmp_path):
+    """Unit test for the cmd_prepare_matrix function
+
+    The covered behavior is a previous matrix and an output stored in a database
+    """
+    stubbed_import_checks.checks = [ \
+        Check("testsuite1", "testcase1", "check1"), \
+        Check("testsuite2", "testcase1", "check2") \
+    ]
+    stubbed_prepare_matrix.matrix = Matrix()
+    stubbed_prepare_matrix.matrix.add("testsuite1.testcase1.check1", ["req1", "req2"])
+    stubbed_prepare_matrix.matrix.add("testsuite2.testcase1.check2", [])
+
+    config = Config()
+    config.set("test_dir_path", "path")
+    config.set("matrix_path", str(tmp_path / "matrix.db"))
+    config.set("output", str(tmp_path / "matrix.db"))
+
+    # A missing previous matrix is reported as for a csv matrix
+    with pytest.raises(FileNotFoundError):
+        cmd_prepare_matrix(config)
+    with MatrixDb(str(tmp_path / "matrix.db")):
+        pass
+
+    cmd_prepare_matrix(config)
+    stub_print.assert_called_once_with("Matrix updated: 2 added, 0 removed and 0 changed checks, " \
+                                       "0 added, 0 removed and 0 changed untraceable requirements\n" \
+                                       "+ testsuite1.testcase1.check1: req1, req2\n" \
+                                       "+ testsuite2.testcase1.check2: ")
+    assert Matrix(str(tmp_path / "matrix.db")) == stubbed_prepare_matrix.matrix
+
+    stub_print.reset_mock()
+    cmd_prepare_matrix(config)
+    stub_print.assert_called_once_with("Matrix unchanged")
+    stub_prepare_matrix.assert_called_with(stubbed_import_checks.checks, stubbed_prepare_matrix.matrix)
+
+    # The number of written rows is reported without a previous matrix
+    config = Config()
+    config.set("test_dir_path", "path")
+    config.set("output", str(tmp_path / "matrix2.db"))
+    stub_print.reset_mock()
+    cmd_prepare_matrix(config)
+    stub_print.assert_called_once_with("Matrix updated: 2 modified rows")
+
+    stub_print.reset_mock()
+    cmd_prepare_matrix(config)
+    stub_print.assert_called_once_with("Matrix unchanged")
+
+@patch("ecap5_treq.analysis.Analysis", MockAnalysis)
+@patch("ecap5_treq.matrix.Matrix", MockMatrix)
+@patch("ecap5_treq.output.OutputFile", new_callable=mock_open)
+@patch("ecap5_treq.report.write_report", side_effect=stubbed_write_report)
+@patch("ecap5_treq.check.import_testdata", side_effect=stubbed_import_testdata)
+@patch("ecap5_treq.check.import_checks", side_effect=stubbed_import_checks)
+@patch("ecap5_treq.req.import_reqs", side_effect=stubbed_import_reqs)
+def test_cmd_gen_report_01(stub_import_reqs, stub_import_checks, stub_import_testdata, stub_write_report, stub_open, capsys):
     """Unit test for the cmd_gen_report function
 
-    The covered behavior is no error message and no output specified
+    The covered behavior is no output specified
     """
     stubbed_import_reqs.reqs = [ \
         Req("U_req1", "description1", {}), \
@@ -367,7 +454,6 @@ def test_cmd_gen_report_01(stub_import_reqs, stub_import_checks, stub_import_tes
         Check("testsuite4", "testcase1", "check4", 1, None),       \
         Check("testsuite3", "testcase1", "check6", 1, None)        \
     ]
-
     config = Config()
     config.set("spec_dir_path", "path1")
     config.set("test_dir_path", "path2")
@@ -377,39 +463,30 @@ def test_cmd_gen_report_01(stub_import_reqs, stub_import_checks, stub_import_tes
 
     cmd_gen_report(config)
 
-    stub_import_reqs.assert_called_once_with("path1", "TEX")
-    stub_import_checks.assert_called_once_with("path2")
-    stub_import_testdata.assert_called_once_with("path3")
+    stub_import_reqs.assert_called_once_with("path1", "TEX", cache=None, jobs=1)
+    stub_import_checks.assert_called_once_with("path2", cache=None, jobs=1)
+    stub_import_testdata.assert_called_once_with("path3", cache=None)
 
     matrix = MockMatrix("path4")
     analysis = MockAnalysis(stubbed_import_reqs.reqs, stubbed_import_checks.checks, stubbed_import_testdata.testdata, matrix)
     analysis.analyse()
+    stub_write_report.assert_called_once_with(analysis, sys.stdout, False)
 
-    stub_generate_report_warning_section.assert_called_once()
-    stub_generate_report_summary.assert_called_once_with(analysis)
-    stub_generate_test_report.assert_called_once_with(analysis)
-    stub_generate_traceability_report.assert_called_once_with(analysis)
-    stub_generate_report_footer.assert_called_once()
-
-    stub_print.assert_called_once_with("generate_report_warning_section\ngenerate_report_summary\ngenerate_test_report\ngenerate_traceability_report\ngenerate_report_footer\n")
+    assert capsys.readouterr().out == "report\n\n"
     stub_open.assert_not_called()
 
-@patch("ecap5_treq.main.Analysis", MockAnalysis)
-@patch("ecap5_treq.main.Matrix", MockMatrix)
-@patch("builtins.open", new_callable=mock_open)
+@patch("ecap5_treq.analysis.Analysis", MockAnalysis)
+@patch("ecap5_treq.matrix.Matrix", MockMatrix)
+@patch("ecap5_treq.output.OutputFile", new_callable=mock_open)
 @patch("builtins.print")
-@patch("ecap5_treq.main.generate_report_footer", return_value="generate_report_footer\n")
-@patch("ecap5_treq.main.generate_traceability_report", return_value="generate_traceability_report\n")
-@patch("ecap5_treq.main.generate_test_report", return_value="generate_test_report\n")
-@patch("ecap5_treq.main.generate_report_summary", return_value="generate_report_summary\n")
-@patch("ecap5_treq.main.generate_report_warning_section", return_value="generate_report_warning_section\n")
-@patch("ecap5_treq.main.import_testdata", side_effect=stubbed_import_testdata)
-@patch("ecap5_treq.main.import_checks", side_effect=stubbed_import_checks)
-@patch("ecap5_treq.main.import_reqs", side_effect=stubbed_import_reqs)
-def test_cmd_gen_report_02(stub_import_reqs, stub_import_checks, stub_import_testdata, stub_generate_report_warning_section, stub_generate_report_summary, stub_generate_test_report, stub_generate_traceability_report, stub_generate_report_footer, stub_print, stub_open):
+@patch("ecap5_treq.report.write_report", side_effect=stubbed_write_report)
+@patch("ecap5_treq.check.import_testdata", side_effect=stubbed_import_testdata)
+@patch("ecap5_treq.check.import_checks", side_effect=stubbed_import_checks)
+@patch("ecap5_treq.req.import_reqs", side_effect=stubbed_import_reqs)
+def test_cmd_gen_report_02(stub_import_reqs, stub_import_checks, stub_import_testdata, stub_write_report, stub_print, stub_open):
     """Unit test for the cmd_gen_report function
 
-    The covered behavior is one error message and an output specified
+    The covered behavior is the report streamed to the specified output
     """
     stubbed_import_reqs.reqs = [ \
         Req("U_req1", "description1", {}), \
@@ -417,7 +494,7 @@ def test_cmd_gen_report_02(stub_import_reqs, stub_import_checks, stub_import_tes
         Req("F_req3", "description3", {}), \
         Req("D_req4", "description4", {}), \
         Req("N_req5", "description5", {}), \
-        Req("req6", "description6", {}) \
+        Req("req6", "description6", {})    \
     ]
     stubbed_import_checks.checks = [ \
         Check("testsuite1", "testcase1", "check1"), \
@@ -433,7 +510,6 @@ def test_cmd_gen_report_02(stub_import_reqs, stub_import_checks, stub_import_tes
         Check("testsuite4", "testcase1", "check4", 1, None),       \
         Check("testsuite3", "testcase1", "check6", 1, None)        \
     ]
-
     config = Config()
     config.set("spec_dir_path", "path1")
     config.set("test_dir_path", "path2")
@@ -442,43 +518,31 @@ def test_cmd_gen_report_02(stub_import_reqs, stub_import_checks, stub_import_tes
     config.set("output", "path5")
     config.set("html", False)
 
-    log_error("error_msg")
-
     cmd_gen_report(config)
 
-    stub_import_reqs.assert_called_once_with("path1", "TEX")
-    stub_import_checks.assert_called_once_with("path2")
-    stub_import_testdata.assert_called_once_with("path3")
+    stub_import_reqs.assert_called_once_with("path1", "TEX", cache=None, jobs=1)
+    stub_import_checks.assert_called_once_with("path2", cache=None, jobs=1)
+    stub_import_testdata.assert_called_once_with("path3", cache=None)
 
     matrix = MockMatrix("path4")
     analysis = MockAnalysis(stubbed_import_reqs.reqs, stubbed_import_checks.checks, stubbed_import_testdata.testdata, matrix)
     analysis.analyse()
+    stub_write_report.assert_called_once_with(analysis, stub_open.return_value, False)
 
-    stub_generate_report_warning_section.assert_called_once()
-    stub_generate_report_summary.assert_called_once_with(analysis)
-    stub_generate_test_report.assert_called_once_with(analysis)
-    stub_generate_traceability_report.assert_called_once_with(analysis)
-    stub_generate_report_footer.assert_called_once()
-
-    # The print function is called only once for the log_error
-    stub_print.assert_called_once()
-    stub_open.assert_called_once_with("path5", "w", encoding="utf-8")
-    stub_open.return_value.write.assert_called_once_with("generate_report_warning_section\n\n**Report generation failed.**")
+    stub_print.assert_not_called()
+    stub_open.assert_called_once_with("path5")
+    stub_open.return_value.write.assert_called_once_with("report\n")
 
-@patch("ecap5_treq.main.Analysis", MockAnalysis)
-@patch("ecap5_treq.main.Matrix", MockMatrix)
-@patch("builtins.open", new_callable=mock_open)
+@patch("ecap5_treq.analysis.Analysis", MockAnalysis)
+@patch("ecap5_treq.matrix.Matrix", MockMatrix)
+@patch("ecap5_treq.output.OutputFile", new_callable=mock_open)
 @patch("builtins.print")
-@patch("ecap5_treq.main.markdown_to_html", side_effect=stubbed_markdown_to_html)
-@patch("ecap5_treq.main.generate_report_footer", return_value="generate_report_footer\n")
-@patch("ecap5_treq.main.generate_traceability_report", return_value="generate_traceability_report\n")
-@patch("ecap5_treq.main.generate_test_report", return_value="generate_test_report\n")
-@patch("ecap5_treq.main.generate_report_summary", return_value="generate_report_summary\n")
-@patch("ecap5_treq.main.generate_report_warning_section", return_value="generate_report_warning_section\n")
-@patch("ecap5_treq.main.import_testdata", side_effect=stubbed_import_testdata)
-@patch("ecap5_treq.main.import_checks", side_effect=stubbed_import_checks)
-@patch("ecap5_treq.main.import_reqs", side_effect=stubbed_import_reqs)
-def test_cmd_gen_report_03(stub_import_reqs, stub_import_checks, stub_import_testdata, stub_generate_report_warning_section, stub_generate_report_summary, stub_generate_test_report, stub_generate_traceability_report, stub_generate_report_footer, stub_markdown_to_html, stub_print, stub_open):
+@patch("sys.stdout", new_callable=io.StringIO)
+@patch("ecap5_treq.report.write_report", side_effect=stubbed_write_report)
+@patch("ecap5_treq.check.import_testdata", side_effect=stubbed_import_testdata)
+@patch("ecap5_treq.check.import_checks", side_effect=stubbed_import_checks)
+@patch("ecap5_treq.req.import_reqs", side_effect=stubbed_import_reqs)
+def test_cmd_gen_report_03(stub_import_reqs, stub_import_checks, stub_import_testdata, stub_write_report, stub_stdout, stub_print, stub_open):
     """Unit test for the cmd_gen_report function
 
     The covered behavior is generate an html report
@@ -505,7 +569,6 @@ def test_cmd_gen_report_03(stub_import_reqs, stub_import_checks, stub_import_tes
         Check("testsuite4", "testcase1", "check4", 1, None),       \
         Check("testsuite3", "testcase1", "check6", 1, None)        \
     ]
-
     config = Config()
     config.set("spec_dir_path", "path1")
     config.set("test_dir_path", "path2")
@@ -515,45 +578,67 @@ def test_cmd_gen_report_03(stub_import_reqs, stub_import_checks, stub_import_tes
 
     cmd_gen_report(config)
 
-    stub_import_reqs.assert_called_once_with("path1", "TEX")
-    stub_import_checks.assert_called_once_with("path2")
-    stub_import_testdata.assert_called_once_with("path3")
+    stub_import_reqs.assert_called_once_with("path1", "TEX", cache=None, jobs=1)
+    stub_import_checks.assert_called_once_with("path2", cache=None, jobs=1)
+    stub_import_testdata.assert_called_once_with("path3", cache=None)
 
     matrix = MockMatrix("path4")
     analysis = MockAnalysis(stubbed_import_reqs.reqs, stubbed_import_checks.checks, stubbed_import_testdata.testdata, matrix)
     analysis.analyse()
+    # The html report is rendered directly without converting the markdown report
+    stub_write_report.assert_called_once_with(analysis, stub_stdout, True)
+
+    assert stub_stdout.getvalue() == "html\nreport\n\n"
+    stub_print.assert_not_called()
+    stub_open.assert_not_called()
+
+@patch("ecap5_treq.analysis.Analysis", MockAnalysis)
+@patch("ecap5_treq.matrix.Matrix", MockMatrix)
+@patch("ecap5_treq.output.OutputFile", new_callable=mock_open)
+@patch("builtins.print")
+@patch("ecap5_treq.pages.write_site", return_value=1)
+@patch("ecap5_treq.report.write_report")
+@patch("ecap5_treq.check.import_testdata", side_effect=stubbed_import_testdata)
+@patch("ecap5_treq.check.import_checks", side_effect=stubbed_import_checks)
+@patch("ecap5_treq.req.import_reqs", side_effect=stubbed_import_reqs)
+def test_cmd_gen_report_04(stub_import_reqs, stub_import_checks, stub_import_testdata, stub_write_report, stub_write_site, stub_print, stub_open):
+    """Unit test for the cmd_gen_report function
+
+    The covered behavior is generate an html site
+    """
+    stubbed_import_reqs.reqs = [Req("U_req1", "description1", {})]
+    stubbed_import_checks.checks = [Check("testsuite1", "testcase1", "check1")]
+    stubbed_import_testdata.testdata = [Check("testsuite1", "testcase1", "check1", 1, None)]
+    config = Config()
+    config.set("spec_dir_path", "path1")
+    config.set("test_dir_path", "path2")
+    config.set("testdata_dir_path", "path3")
+    config.set("matrix_path", "path4")
+    config.set("html", False)
+    config.set("site", "path5")
+    config.set("jobs", 2)
+
+    cmd_gen_report(config)
 
-    stub_generate_report_warning_section.assert_called_once()
-    stub_generate_report_summary.assert_called_once_with(analysis)
-    stub_generate_test_report.assert_called_once_with(analysis)
-    stub_generate_traceability_report.assert_called_once_with(analysis)
-    stub_generate_report_footer.assert_called_once()
-    stub_markdown_to_html.assert_called_once_with("generate_report_warning_section\ngenerate_report_summary\ngenerate_test_report\ngenerate_traceability_report\ngenerate_report_footer\n")
+    matrix = MockMatrix("path4")
+    analysis = MockAnalysis(stubbed_import_reqs.reqs, stubbed_import_checks.checks, stubbed_import_testdata.testdata, matrix)
+    analysis.analyse()
+    stub_write_site.assert_called_once_with(analysis, "path5", 2)
 
-    stub_print.assert_called_once_with("html\ngenerate_report_warning_section\ngenerate_report_summary\ngenerate_test_report\ngenerate_traceability_report\ngenerate_report_footer\n")
+    stub_write_report.assert_not_called()
+    stub_print.assert_not_called()
     stub_open.assert_not_called()
 
-@patch("ecap5_treq.main.Analysis", MockAnalysis)
-@patch("ecap5_treq.main.Matrix", MockMatrix)
-@patch("builtins.open", new_callable=mock_open)
+@patch("ecap5_treq.output.OutputFile", new_callable=mock_open)
 @patch("builtins.print")
-@patch("ecap5_treq.main.generate_test_result_badge", return_value="generate_test_result_badge\n")
-@patch("ecap5_treq.main.import_testdata", side_effect=stubbed_import_testdata)
-@patch("ecap5_treq.main.import_checks", side_effect=stubbed_import_checks)
-@patch("ecap5_treq.main.import_reqs", side_effect=stubbed_import_reqs)
-def test_cmd_gen_test_result_badge_01(stub_import_reqs, stub_import_checks, stub_import_testdata, stub_generate_test_result_badge, stub_print, stub_open):
+@patch("ecap5_treq.report.generate_test_result_badge", return_value="generate_test_result_badge\n")
+@patch("ecap5_treq.check.iter_testdata", side_effect=stubbed_iter_testdata)
+@patch("ecap5_treq.check.import_checks", side_effect=stubbed_import_checks)
+def test_cmd_gen_test_result_badge_01(stub_import_checks, stub_iter_testdata, stub_generate_test_result_badge, stub_print, stub_open):
     """Unit test for the cmd_gen_test_result_badge function
 
     The covered behavior is no output specified
     """
-    stubbed_import_reqs.reqs = [ \
-        Req("U_req1", "description1", {}), \
-        Req("I_req2", "description2", {}), \
-        Req("F_req3", "description3", {}), \
-        Req("D_req4", "description4", {}), \
-        Req("N_req5", "description5", {}), \
-        Req("req6", "description6", {}) \
-    ]
     stubbed_import_checks.checks = [ \
         Check("testsuite1", "testcase1", "check1"), \
         Check("testsuite2", "testcase1", "check2"), \
@@ -570,47 +655,33 @@ def test_cmd_gen_test_result_badge_01(stub_import_reqs, stub_import_checks, stub
     ]
 
     config = Config()
-    config.set("spec_dir_path", "path1")
     config.set("test_dir_path", "path2")
     config.set("testdata_dir_path", "path3")
-    config.set("matrix_path", "path4")
 
     cmd_gen_test_result_badge(config)
 
-    stub_import_reqs.assert_called_once_with("path1", "TEX")
-    stub_import_checks.assert_called_once_with("path2")
-    stub_import_testdata.assert_called_once_with("path3")
+    stub_import_checks.assert_called_once_with("path2", cache=None, jobs=1)
+    stub_iter_testdata.assert_called_once_with("path3")
 
-    matrix = MockMatrix("path4")
-    analysis = MockAnalysis(stubbed_import_reqs.reqs, stubbed_import_checks.checks, stubbed_import_testdata.testdata, matrix)
-    analysis.analyse()
-
-    stub_generate_test_result_badge.assert_called_once_with(analysis)
+    # The badge is generated from the counters of the streamed testdata
+    summary = stub_generate_test_result_badge.call_args.args[0]
+    assert isinstance(summary, ResultsSummary)
+    assert summary.num_successfull_checks == 3
+    assert summary.test_result == 60
 
     stub_print.assert_called_once_with("generate_test_result_badge\n")
     stub_open.assert_not_called()
 
-@patch("ecap5_treq.main.Analysis", MockAnalysis)
-@patch("ecap5_treq.main.Matrix", MockMatrix)
-@patch("builtins.open", new_callable=mock_open)
+@patch("ecap5_treq.output.OutputFile", new_callable=mock_open)
 @patch("builtins.print")
-@patch("ecap5_treq.main.generate_test_result_badge", return_value="generate_test_result_badge\n")
-@patch("ecap5_treq.main.import_testdata", side_effect=stubbed_import_testdata)
-@patch("ecap5_treq.main.import_checks", side_effect=stubbed_import_checks)
-@patch("ecap5_treq.main.import_reqs", side_effect=stubbed_import_reqs)
-def test_cmd_gen_test_result_badge_02(stub_import_reqs, stub_import_checks, stub_import_testdata, stub_generate_test_result_badge, stub_print, stub_open):
+@patch("ecap5_treq.report.generate_test_result_badge", return_value="generate_test_result_badge\n")
+@patch("ecap5_treq.check.iter_testdata", side_effect=stubbed_iter_testdata)
+@patch("ecap5_treq.check.import_checks", side_effect=stubbed_import_checks)
+def test_cmd_gen_test_result_badge_02(stub_import_checks, stub_iter_testdata, stub_generate_test_result_badge, stub_print, stub_open):
     """Unit test for the cmd_gen_test_result_badge function
 
     The covered behavior is with output specified
     """
-    stubbed_import_reqs.reqs = [ \
-        Req("U_req1", "description1", {}), \
-        Req("I_req2", "description2", {}), \
-        Req("F_req3", "description3", {}), \
-        Req("D_req4", "description4", {}), \
-        Req("N_req5", "description5", {}), \
-        Req("req6", "description6", {}) \
-    ]
     stubbed_import_checks.checks = [ \
         Check("testsuite1", "testcase1", "check1"), \
         Check("testsuite2", "testcase1", "check2"), \
@@ -627,36 +698,33 @@ def test_cmd_gen_test_result_badge_02(stub_import_reqs, stub_import_checks, stub
     ]
 
     config = Config()
-    config.set("spec_dir_path", "path1")
     config.set("test_dir_path", "path2")
     config.set("testdata_dir_path", "path3")
-    config.set("matrix_path", "path4")
     config.set("output", "path5")
 
     cmd_gen_test_result_badge(config)
 
-    stub_import_reqs.assert_called_once_with("path1", "TEX")
-    stub_import_checks.assert_called_once_with("path2")
-    stub_import_testdata.assert_called_once_with("path3")
-
-    matrix = MockMatrix("path4")
-    analysis = MockAnalysis(stubbed_import_reqs.reqs, stubbed_import_checks.checks, stubbed_import_testdata.testdata, matrix)
-    analysis.analyse()
+    stub_import_checks.assert_called_once_with("path2", cache=None, jobs=1)
+    stub_iter_testdata.assert_called_once_with("path3")
 
-    stub_generate_test_result_badge.assert_called_once_with(analysis)
+    # The badge is generated from the counters of the streamed testdata
+    summary = stub_generate_test_result_badge.call_args.args[0]
+    assert isinstance(summary, ResultsSummary)
+    assert summary.num_successfull_checks == 3
+    assert summary.test_result == 60
 
     stub_print.assert_not_called()
-    stub_open.assert_called_once_with("path5", 'w', encoding='utf-8')
+    stub_open.assert_called_once_with("path5")
     stub_open.return_value.write.assert_called_once_with("generate_test_result_badge\n")
 
-@patch("ecap5_treq.main.Analysis", MockAnalysis)
-@patch("ecap5_treq.main.Matrix", MockMatrix)
-@patch("builtins.open", new_callable=mock_open)
+@patch("ecap5_treq.analysis.Analysis", MockAnalysis)
+@patch("ecap5_treq.matrix.Matrix", MockMatrix)
+@patch("ecap5_treq.output.OutputFile", new_callable=mock_open)
 @patch("builtins.print")
-@patch("ecap5_treq.main.generate_traceability_result_badge", return_value="generate_traceability_result_badge\n")
-@patch("ecap5_treq.main.import_testdata", side_effect=stubbed_import_testdata)
-@patch("ecap5_treq.main.import_checks", side_effect=stubbed_import_checks)
-@patch("ecap5_treq.main.import_reqs", side_effect=stubbed_import_reqs)
+@patch("ecap5_treq.report.generate_traceability_result_badge", return_value="generate_traceability_result_badge\n")
+@patch("ecap5_treq.check.import_testdata", side_effect=stubbed_import_testdata)
+@patch("ecap5_treq.check.import_checks", side_effect=stubbed_import_checks)
+@patch("ecap5_treq.req.import_reqs", side_effect=stubbed_import_reqs)
 def test_cmd_gen_traceability_result_badge_01(stub_import_reqs, stub_import_checks, stub_import_testdata, stub_generate_traceability_result_badge, stub_print, stub_open):
     """Unit test for the cmd_gen_test_result_badge function
 
@@ -693,9 +761,9 @@ def test_cmd_gen_traceability_result_badge_01(stub_import_reqs, stub_import_chec
 
     cmd_gen_traceability_result_badge(config)
 
-    stub_import_reqs.assert_called_once_with("path1", "TEX")
-    stub_import_checks.assert_called_once_with("path2")
-    stub_import_testdata.assert_called_once_with("path3")
+    stub_import_reqs.assert_called_once_with("path1", "TEX", cache=None, jobs=1)
+    stub_import_checks.assert_called_once_with("path2", cache=None, jobs=1)
+    stub_import_testdata.assert_called_once_with("path3", cache=None)
 
     matrix = MockMatrix("path4")
     analysis = MockAnalysis(stubbed_import_reqs.reqs, stubbed_import_checks.checks, stubbed_import_testdata.testdata, matrix)
@@ -706,14 +774,14 @@ def test_cmd_gen_traceability_result_badge_01(stub_import_reqs, stub_import_chec
     stub_print.assert_called_once_with("generate_traceability_result_badge\n")
     stub_open.assert_not_called()
 
-@patch("ecap5_treq.main.Analysis", MockAnalysis)
-@patch("ecap5_treq.main.Matrix", MockMatrix)
-@patch("builtins.open", new_callable=mock_open)
+@patch("ecap5_treq.analysis.Analysis", MockAnalysis)
+@patch("ecap5_treq.matrix.Matrix", MockMatrix)
+@patch("ecap5_treq.output.OutputFile", new_callable=mock_open)
 @patch("builtins.print")
-@patch("ecap5_treq.main.generate_traceability_result_badge", return_value="generate_traceability_result_badge\n")
-@patch("ecap5_treq.main.import_testdata", side_effect=stubbed_import_testdata)
-@patch("ecap5_treq.main.import_checks", side_effect=stubbed_import_checks)
-@patch("ecap5_treq.main.import_reqs", side_effect=stubbed_import_reqs)
+@patch("ecap5_treq.report.generate_traceability_result_badge", return_value="generate_traceability_result_badge\n")
+@patch("ecap5_treq.check.import_testdata", side_effect=stubbed_import_testdata)
+@patch("ecap5_treq.check.import_checks", side_effect=stubbed_import_checks)
+@patch("ecap5_treq.req.import_reqs", side_effect=stubbed_import_reqs)
 def test_cmd_gen_traceability_result_badge_02(stub_import_reqs, stub_import_checks, stub_import_testdata, stub_generate_traceability_result_badge, stub_print, stub_open):
     """Unit test for the cmd_gen_traceability_result_badge function
 
@@ -751,9 +819,9 @@ def test_cmd_gen_traceability_result_badge_02(stub_import_reqs, stub_import_chec
 
     cmd_gen_traceability_result_badge(config)
 
-    stub_import_reqs.assert_called_once_with("path1", "TEX")
-    stub_import_checks.assert_called_once_with("path2")
-    stub_import_testdata.assert_called_once_with("path3")
+    stub_import_reqs.assert_called_once_with("path1", "TEX", cache=None, jobs=1)
+    stub_import_checks.assert_called_once_with("path2", cache=None, jobs=1)
+    stub_import_testdata.assert_called_once_with("path3", cache=None)
 
     matrix = MockMatrix("path4")
     analysis = MockAnalysis(stubbed_import_reqs.reqs, stubbed_import_checks.checks, stubbed_import_testdata.testdata, matrix)
@@ -762,9 +830,276 @@ def test_cmd_gen_traceability_result_badge_02(stub_import_reqs, stub_import_chec
     stub_generate_traceability_result_badge.assert_called_once_with(analysis)
 
     stub_print.assert_not_called()
-    stub_open.assert_called_once_with("path5", 'w', encoding='utf-8')
+    stub_open.assert_called_once_with("path5")
     stub_open.return_value.write.assert_called_once_with("generate_traceability_result_badge\n")
 
+@patch("ecap5_treq.analysis.Analysis", MockAnalysis)
+@patch("ecap5_treq.matrix.Matrix", MockMatrix)
+@patch("os.makedirs")
+@patch("ecap5_treq.output.OutputFile", new_callable=mock_open)
+@patch("builtins.print")
+@patch("ecap5_treq.report.generate_traceability_result_badge", return_value="generate_traceability_result_badge\n")
+@patch("ecap5_treq.report.generate_test_result_badge", return_value="generate_test_result_badge\n")
+@patch("ecap5_treq.report.generate_report", side_effect=stubbed_generate_report)
+@patch("ecap5_treq.check.import_testdata", side_effect=stubbed_import_testdata)
+@patch("ecap5_treq.check.import_checks", side_effect=stubbed_import_checks)
+@patch("ecap5_treq.req.import_reqs", side_effect=stubbed_import_reqs)
+def test_cmd_gen_all(stub_import_reqs, stub_import_checks, stub_import_testdata, stub_generate_report, stub_generate_test_result_badge, stub_generate_traceability_result_badge, stub_print, stub_open, stub_makedirs):
+    """Unit test for the cmd_gen_all function
+
+    The covered behavior is the generation of all outputs from a single analysis
+    """
+    stubbed_import_reqs.reqs = [ \
+        Req("U_req1", "description1", {}), \
+        Req("I_req2", "description2", {}) \
+    ]
+    stubbed_import_checks.checks = [ \
+        Check("testsuite1", "testcase1", "check1"), \
+        Check("testsuite2", "testcase1", "check2") \
+    ]
+    stubbed_import_testdata.testdata = [ \
+        Check("testsuite1", "testcase1", "check1", 0, "message1"), \
+        Check("testsuite2", "testcase1", "check2", 1, None) \
+    ]
+
+    config = Config()
+    config.set("spec_dir_path", "path1")
+    config.set("test_dir_path", "path2")
+    config.set("testdata_dir_path", "path3")
+    config.set("matrix_path", "path4")
+    config.set("output", "path5")
+
+    cmd_gen_all(config)
+
+    # The inputs are only imported once
+    stub_import_reqs.assert_called_once_with("path1", "TEX", cache=None, jobs=1)
+    stub_import_checks.assert_called_once_with("path2", cache=None, jobs=1)
+    stub_import_testdata.assert_called_once_with("path3", cache=None)
+
+    matrix = MockMatrix("path4")
+    analysis = MockAnalysis(stubbed_import_reqs.reqs, stubbed_import_checks.checks, stubbed_import_testdata.testdata, matrix)
+    analysis.analyse()
+    stub_generate_report.assert_has_calls([call(analysis), call(analysis, html=True)])
+    stub_generate_test_result_badge.assert_called_once_with(analysis)
+    stub_generate_traceability_result_badge.assert_called_once_with(analysis)
+
+    stub_makedirs.assert_called_once_with("path5", exist_ok=True)
+    stub_print.assert_not_called()
+    stub_open.assert_has_calls([ \
+        call("path5/report.md"), \
+        call("path5/report.html"), \
+        call("path5/test-result-badge.json"), \
+        call("path5/traceability-result-badge.json") \
+    ], any_order=True)
+    stub_open.return_value.write.assert_has_calls([ \
+        call("report\n"), \
+        call("html\nreport\n"), \
+        call("generate_test_result_badge\n"), \
+        call("generate_traceability_result_badge\n") \
+    ])
+
+@patch("ecap5_treq.export.export_db")
+@patch("ecap5_treq.main.load_analysis", return_value="analysis")
+def test_cmd_export_db(stub_load_analysis, stub_export_db):
+    """Unit test for the cmd_export_db function
+    """
+    config = Config()
+    config.set("output", "path1")
+
+    cmd_export_db(config)
+
+    stub_load_analysis.assert_called_once_with(config)
+    stub_export_db.assert_called_once_with("analysis", "path1")
+
+@patch("builtins.print")
+@patch("ecap5_treq.main.write_all")
+@patch("ecap5_treq.watch.wait_for_changes", side_effect=[{"file": (2, 2)}, {"file": (3, 3)}, KeyboardInterrupt])
+@patch("ecap5_treq.watch.snapshot", return_value={"file": (1, 1)})
+@patch("ecap5_treq.main.load_analysis", side_effect=["analysis1", SystemExit, "analysis2"])
+def test_cmd_watch_01(stub_load_analysis, stub_snapshot, stub_wait_for_changes, stub_write_all, stub_print, tmp_path):
+    """Unit test for the cmd_watch function
+
+    The covered behaviors are:
+        * outputs generated again after each change
+        * previous analysis and in-memory cache reused
+        * critical parse errors not interrupting the command
+        * command stopped when interrupted
+    """
+    paths = [str(tmp_path / name) for name in ["path1", "path2", "path3", "path4"]]
+    for path in paths:
+        os.makedirs(path)
+    config = Config()
+    config.set("spec_dir_path", paths[0])
+    config.set("test_dir_path", paths[1])
+    config.set("testdata_dir_path", paths[2])
+    config.set("matrix_path", paths[3])
+    config.set("output", "path5")
+
+    cmd_watch(config)
+
+    stub_snapshot.assert_called_once_with(paths)
+    stub_wait_for_changes.assert_has_calls([ \
+        call(paths, {"file": (1, 1)}, WATCH_INTERVAL), \
+        call(paths, {"file": (2, 2)}, WATCH_INTERVAL), \
+        call(paths, {"file": (3, 3)}, WATCH_INTERVAL) \
+    ])
+
+    cache = stub_load_analysis.call_args_list[0].args[1]
+    assert isinstance(cache, Cache)
+    assert cache.path is None
+    stub_load_analysis.assert_has_calls([ \
+        call(config, cache, None), \
+        call(config, cache, "analysis1"), \
+        call(config, cache, "analysis1") \
+    ])
+    stub_write_all.assert_has_calls([call("path5", "analysis1"), call("path5", "analysis2")])
+    assert stub_print.call_args_list[1] == call("Outputs not generated, watching for changes")
+
+@patch("builtins.print")
+@patch("ecap5_treq.main.write_all")
+@patch("ecap5_treq.watch.wait_for_changes", side_effect=KeyboardInterrupt)
+@patch("ecap5_treq.watch.snapshot", return_value={})
+@patch("ecap5_treq.main.load_analysis", return_value="analysis")
+def test_cmd_watch_02(stub_load_analysis, stub_snapshot, stub_wait_for_changes, stub_write_all, stub_print, tmp_path):
+    """Unit test for the cmd_watch function
+
+    The covered behaviors are:
+        * configurable interval between two scans
+        * configuration errors interrupting the command before watching
+    """
+    paths = [str(tmp_path / name) for name in ["path1", "path2", "path3", "path4"]]
+    for path in paths:
+        os.makedirs(path)
+    config = Config()
+    config.set("spec_dir_path", paths[0])
+    config.set("test_dir_path", paths[1])
+    config.set("testdata_dir_path", paths[2])
+    config.set("matrix_path", paths[3])
+    config.set("output", "path5")
+    config.set("watch_interval", 2.0)
+
+    cmd_watch(config)
+
+    stub_wait_for_changes.assert_called_once_with(paths, {}, 2.0)
+    stub_write_all.assert_called_once_with("path5", "analysis")
+
+    stub_load_analysis.reset_mock()
+    # Missing output directory
+    del config.data["output"]
+    with pytest.raises(SystemExit):
+        cmd_watch(config)
+    # Missing input path
+    config.set("output", "path5")
+    config.set("matrix_path", str(tmp_path / "missing"))
+    with pytest.raises(SystemExit):
+        cmd_watch(config)
+    # Unknown merge policy
+    config.set("matrix_path", paths[3])
+    config.set("testdata_merge", "unknown")
+    with pytest.raises(SystemExit):
+        cmd_watch(config)
+    stub_load_analysis.assert_not_called()
+
+def test_cmd_watch_03(tmp_path):
+    """Unit test for the cmd_watch function
+
+    The covered behavior is the outputs generated after a testdata shard is added and removed matching the outputs
+    of a full analysis, the parsed records being kept in an in-memory cache
+    """
+    config = generate(str(tmp_path / "data"), 40)
+    config.set("output", str(tmp_path / "output"))
+    shard = os.path.join(config.get("testdata_dir_path"), "shard4.csv")
+
+    # Each change is followed by the generation of the outputs
+    changes = [lambda: open(shard, "w", encoding="utf-8").write("testsuite0.testcase0.check0;0;msg1\n"), \
+               lambda: os.remove(shard)]
+    def change(paths, files, interval):
+        if len(changes) == 0:
+            raise KeyboardInterrupt
+        changes.pop(0)()
+        return {}
+
+    reports = []
+    def check_outputs(output_dir, analysis):
+        reports.append((analysis.num_failed_checks, generate_report(analysis)))
+        # The outputs of a full analysis are generated with the same logged messages
+        log_clear()
+        full_analysis = load_analysis(config)
+        assert generate_report(analysis) == generate_report(full_analysis)
+
+    with patch("ecap5_treq.watch.wait_for_changes", side_effect=change), \
+         patch("ecap5_treq.main.write_all", side_effect=check_outputs), patch("builtins.print"):
+        cmd_watch(config)
+
+    assert len(reports) == 3
+    assert reports[1][0] == reports[0][0] + 1
+    assert reports[2] == reports[0]
+
+@patch("ecap5_treq.check.import_testdata", side_effect=stubbed_import_testdata)
+@patch("ecap5_treq.check.import_checks", side_effect=stubbed_import_checks)
+@patch("ecap5_treq.req.import_reqs", side_effect=stubbed_import_reqs)
+def test_load_analysis(stub_import_reqs, stub_import_checks, stub_import_testdata, tmp_path):
+    """Unit test for the load_analysis function
+
+    The covered behaviors are:
+        * incremental mode without a previous analysis
+        * incremental mode updating the previous analysis
+        * previous analysis not used without incremental mode
+    """
+    stubbed_import_reqs.reqs = [Req("req1", "", None)]
+    stubbed_import_checks.checks = [Check("testsuite", "testcase", "check1")]
+    stubbed_import_testdata.testdata = [Check("testsuite", "testcase", "check1", 1)]
+    matrix_path = tmp_path / "matrix.csv"
+    matrix_path.write_text("testsuite.testcase.check1;req1\n")
+
+    config = Config()
+    config.set("spec_dir_path", "path1")
+    config.set("test_dir_path", "path2")
+    config.set("testdata_dir_path", "path3")
+    config.set("matrix_path", str(matrix_path))
+    config.set("cache_dir_path", str(tmp_path / "cache"))
+    config.set("incremental", True)
+
+    with patch.object(Analysis, "update") as stub_Analysis_update:
+        analysis = load_analysis(config)
+        stub_Analysis_update.assert_not_called()
+    assert analysis.num_successfull_checks == 1
+    assert Cache(str(tmp_path / "cache")).get_state("analysis") is not None
+
+    stubbed_import_testdata.testdata = [Check("testsuite", "testcase", "check1", 0)]
+    with patch.object(Analysis, "update", autospec=True) as stub_Analysis_update:
+        analysis = load_analysis(config)
+        stub_Analysis_update.assert_called_once_with(analysis, stubbed_import_reqs.reqs, \
+                stubbed_import_checks.checks, stubbed_import_testdata.testdata, Matrix(str(matrix_path)), True)
+
+    config.set("incremental", False)
+    with patch.object(Analysis, "update") as stub_Analysis_update:
+        analysis = load_analysis(config)
+        stub_Analysis_update.assert_not_called()
+    assert analysis.num_failed_checks == 1
+
+    # The analysis provided as parameter is updated
+    with patch.object(Analysis, "update", autospec=True) as stub_Analysis_update:
+        assert load_analysis(config, Cache(None), analysis) is analysis
+        stub_Analysis_update.assert_called_once()
+
+def test_open_cache():
+    """Unit test for the open_cache function
+
+    The covered behaviors are:
+        * without a cache directory
+        * with a cache directory
+    """
+    config = Config()
+    assert open_cache(config) is None
+
+    config.set("cache_dir_path", "path1")
+    config.set("cache_hash", True)
+    cache = open_cache(config)
+    assert isinstance(cache, Cache)
+    assert cache.path == "path1"
+    assert cache.use_hash == True
+
 @patch("ecap5_treq.main.Config", MockConfig)
 def test_main_01():
     """Unit test for the main function
@@ -960,3 +1295,248 @@ def test_main_12(stub_Config___init__, stub_Config_set_path, stub_Config_set, st
         stub_Config_set_path.assert_not_called()
         stub_Config_set.assert_has_calls([call("spec_format", "RST"), call("disable_allocation", True), call("html", False)])
         stub_cmd_gen_report.assert_called_once()
+
+@patch("ecap5_treq.main.cmd_gen_all")
+@patch.object(Config, "set")
+@patch.object(Config, "set_path")
+@patch.object(Config, "__init__", return_value=None)
+def test_main_13(stub_Config___init__, stub_Config_set_path, stub_Config_set, stub_cmd_gen_all):
+    """Unit test for the main function
+
+    The covered behavior is gen_all command
+    """
+    args = ["ecap5-treq", "-c", "path1", "gen_all", "-o", "path2"]
+    with patch.object(sys, 'argv', args):
+        main()
+        stub_Config___init__.assert_called_once_with("path1")
+        stub_Config_set_path.assert_not_called()
+        stub_Config_set.assert_has_calls([call("output", "path2"), call("html", False)])
+        stub_cmd_gen_all.assert_called_once()
+
+@patch("ecap5_treq.main.cmd_gen_report")
+@patch.object(Config, "set")
+@patch.object(Config, "set_path")
+@patch.object(Config, "__init__", return_value=None)
+def test_main_14(stub_Config___init__, stub_Config_set_path, stub_Config_set, stub_cmd_gen_report):
+    """Unit test for the main function
+
+    The covered behavior is the configuration of the parse cache
+    """
+    args = ["ecap5-treq", "-c", "path1", "--cache", "path2", "--cache-hash", "gen_report"]
+    with patch.object(sys, 'argv', args):
+        main()
+        stub_Config___init__.assert_called_once_with("path1")
+        stub_Config_set_path.assert_called_once_with("cache_dir_path", "path2")
+        stub_Config_set.assert_has_calls([call("cache_hash", True), call("html", False)])
+        stub_cmd_gen_report.assert_called_once()
+
+@patch("ecap5_treq.main.cmd_print_reqs")
+@patch.object(Config, "set")
+@patch.object(Config, "set_path")
+@patch.object(Config, "__init__", return_value=None)
+def test_main_15(stub_Config___init__, stub_Config_set_path, stub_Config_set, stub_cmd_print_reqs):
+    """Unit test for the main function
+
+    The covered behavior is the configuration of the number of jobs
+    """
+    args = ["ecap5-treq", "-c", "path1", "--jobs", "4", "print_reqs"]
+    with patch.object(sys, 'argv', args):
+        main()
+        stub_Config___init__.assert_called_once_with("path1")
+        stub_Config_set_path.assert_not_called()
+        stub_Config_set.assert_has_calls([call("jobs", 4), call("html", False)])
+        stub_cmd_print_reqs.assert_called_once()
+
+@patch("ecap5_treq.main.cmd_gen_report")
+@patch.object(Config, "set")
+@patch.object(Config, "set_path")
+@patch.object(Config, "__init__", return_value=None)
+def test_main_16(stub_Config___init__, stub_Config_set_path, stub_Config_set, stub_cmd_gen_report):
+    """Unit test for the main function
+
+    The covered behavior is the configuration of the incremental mode
+    """
+    args = ["ecap5-treq", "-c", "path1", "--cache", "path2", "--incremental", "gen_report"]
+    with patch.object(sys, 'argv', args):
+        main()
+        stub_Config___init__.assert_called_once_with("path1")
+        stub_Config_set_path.assert_called_once_with("cache_dir_path", "path2")
+        stub_Config_set.assert_has_calls([call("incremental", True), call("html", False)])
+        stub_cmd_gen_report.assert_called_once()
+
+@patch("ecap5_treq.main.cmd_watch")
+@patch.object(Config, "set")
+@patch.object(Config, "set_path")
+@patch.object(Config, "__init__", return_value=None)
+def test_main_17(stub_Config___init__, stub_Config_set_path, stub_Config_set, stub_cmd_watch):
+    """Unit test for the main function
+
+    The covered behavior is watch command
+    """
+    args = ["ecap5-treq", "-c", "path1", "-o", "path2", "--watch-interval", "1.5", "watch"]
+    with patch.object(sys, 'argv', args):
+        main()
+        stub_Config___init__.assert_called_once_with("path1")
+        stub_Config_set_path.assert_not_called()
+        stub_Config_set.assert_has_calls([call("watch_interval", 1.5), call("output", "path2"), call("html", False)])
+        stub_cmd_watch.assert_called_once()
+
+@patch("ecap5_treq.main.cmd_export_db")
+@patch.object(Config, "set")
+@patch.object(Config, "set_path")
+@patch.object(Config, "__init__", return_value=None)
+def test_main_18(stub_Config___init__, stub_Config_set_path, stub_Config_set, stub_cmd_export_db):
+    """Unit test for the main function
+
+    The covered behavior is export_db command
+    """
+    args = ["ecap5-treq", "-c", "path1", "-o", "path2", "export_db"]
+    with patch.object(sys, 'argv', args):
+        main()
+        stub_Config___init__.assert_called_once_with("path1")
+        stub_Config_set_path.assert_not_called()
+        stub_Config_set.assert_has_calls([call("output", "path2"), call("html", False)])
+        stub_cmd_export_db.assert_called_once()
+
+@patch("ecap5_treq.main.cmd_gen_report")
+@patch.object(Config, "set")
+@patch.object(Config, "set_path")
+@patch.object(Config, "__init__", return_value=None)
+def test_main_19(stub_Config___init__, stub_Config_set_path, stub_Config_set, stub_cmd_gen_report):
+    """Unit test for the main function
+
+    The covered behavior is the configuration of the testdata merge policy
+    """
+    args = ["ecap5-treq", "-c", "path1", "--testdata-merge", "pass_rate", "--testdata-pass-rate", "0", "gen_report"]
+    with patch.object(sys, 'argv', args):
+        main()
+        stub_Config___init__.assert_called_once_with("path1")
+        stub_Config_set.assert_has_calls([call("testdata_merge", "pass_rate"), call("testdata_pass_rate", 0.0), \
+                                          call("html", False)])
+        stub_cmd_gen_report.assert_called_once()
+
+@patch("ecap5_treq.main.cmd_gen_report")
+@patch.object(Config, "set")
+@patch.object(Config, "set_path")
+@patch.object(Config, "__init__", return_value=None)
+def test_main_21(stub_Config___init__, stub_Config_set_path, stub_Config_set, stub_cmd_gen_report):
+    """Unit test for the main function
+
+    The covered behavior is the configuration of the html site
+    """
+    args = ["ecap5-treq", "-c", "path1", "--site", "path2", "gen_report"]
+    with patch.object(sys, 'argv', args):
+        main()
+        stub_Config___init__.assert_called_once_with("path1")
+        stub_Config_set.assert_has_calls([call("html", False), call("site", "path2")])
+        stub_cmd_gen_report.assert_called_once()
+
+def stubbed_cmd_gen_report_profiled(config):
+    with profiler.stage("stage1"):
+        profiler.count("counter1")
+    sys.exit(1)
+
+@patch("ecap5_treq.main.cmd_gen_report", side_effect=stubbed_cmd_gen_report_profiled)
+@patch.object(Config, "set")
+@patch.object(Config, "set_path")
+@patch.object(Config, "__init__", return_value=None)
+def test_main_20(stub_Config___init__, stub_Config_set_path, stub_Config_set, stub_cmd_gen_report, tmp_path, capsys):
+    """Unit test for the main function
+
+    The covered behaviors are:
+        * profile summary printed to stderr
+        * profile JSON and trace outputs written atomically
+        * profile output when the command exits
+    """
+    json_path = str(tmp_path / "profile.json")
+    trace_path = str(tmp_path / "trace.json")
+    args = ["ecap5-treq", "gen_report", "--profile", "--profile-json", json_path, "--profile-trace", trace_path]
+    with patch.object(sys, 'argv', args):
+        with pytest.raises(SystemExit):
+            main()
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "stage1" in captured.err
+    assert "counter1=1" in captured.err
+    with open(json_path, encoding="utf-8") as file:
+        assert json.load(file)[0]["counters"] == {"counter1": 1}
+    with open(trace_path, encoding="utf-8") as file:
+        assert json.load(file)["traceEvents"][0]["name"] == "stage1"
+    # The outputs are written atomically, no temporary file being left
+    assert sorted(os.listdir(str(tmp_path))) == ["profile.json", "trace.json"]
+
+    # The profiler is stopped after the command
+    assert not profiler.enabled
+
+@patch("ecap5_treq.check.import_checks", side_effect=stubbed_import_checks)
+def test_main_22(stub_import_checks, capsys):
+    """Unit test for the main function
+
+    The covered behavior is the profile of a print command
+    """
+    stubbed_import_checks.checks = [Check("testsuite1", "testcase1", "check1"), Check("testsuite1", "testcase1", "check2")]
+    args = ["ecap5-treq", "-t", "path1", "print_checks", "--profile"]
+    with patch.object(sys, 'argv', args):
+        main()
+    captured = capsys.readouterr()
+    lines = captured.err.split("\n")
+    assert len(lines) == 3
+    assert lines[1].startswith("import_checks")
+    assert lines[1].endswith("checks=2")
+
+# Budget in seconds of the import of the main module, the modules of the commands not being imported
+IMPORT_TIME_BUDGET = 0.05
+# Modules which shall not be imported before they are required by a command
+LAZY_MODULES = ["markdown", "sqlite3", "tracemalloc", "concurrent.futures", "xml.etree.ElementTree", \
+                "ecap5_treq.analysis", "ecap5_treq.check", "ecap5_treq.html", "ecap5_treq.matrix", "ecap5_treq.report", \
+                "ecap5_treq.req"]
+
+def run_python(code, importtime=False):
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(ecap5_treq.__file__)))
+    options = ["-X", "importtime"] if importtime else []
+    return subprocess.run([sys.executable] + options + ["-c", code], env=env, capture_output=True, text=True, \
+                          check=True)
+
+def loaded_lazy_modules(code):
+    result = run_python(code + "\nimport sys\nprint(' '.join(sorted(sys.modules)))")
+    modules = result.stdout.split("\n")[-2].split(" ")
+    return [module for module in LAZY_MODULES if module in modules]
+
+def cumulative_import_time(module):
+    # Each line of the importtime output reads "import time: <self us> | <cumulative us> | <module>"
+    lines = run_python("import {}".format(module), importtime=True).stderr.split("\n")
+    cumulative = [int(line.split("|")[1]) for line in lines if line.split("|")[-1].strip() == module]
+    assert len(cumulative) == 1
+    return cumulative[0] / 1e6
+
+def test_main_startup_01():
+    """Unit test for the startup of the program
+
+    The covered behavior is the modules of the commands not imported by the main module
+    """
+    assert loaded_lazy_modules("import ecap5_treq.main") == []
+
+def test_main_startup_02(tmp_path):
+    """Unit test for the startup of the program
+
+    The covered behaviors are:
+        * modules imported by the print_checks command
+        * markdown not imported by the gen_report command, with or without the --html option
+    """
+    config = generate(str(tmp_path), 40)
+    args = ["ecap5-treq", "-s", config.get("spec_dir_path"), "-t", config.get("test_dir_path"), \
+            "-d", config.get("testdata_dir_path"), "-m", config.get("matrix_path"), "-o", str(tmp_path / "output")]
+    code = "import sys\nfrom ecap5_treq.main import main\nsys.argv = {}\nmain()"
+
+    assert loaded_lazy_modules(code.format(args + ["print_checks"])) == ["ecap5_treq.check"]
+    assert "markdown" not in loaded_lazy_modules(code.format(args + ["gen_report"]))
+    assert "markdown" not in loaded_lazy_modules(code.format(args + ["gen_report", "--html"]))
+
+def test_main_startup_03():
+    """Unit test for the startup of the program
+
+    The covered behavior is the cumulative import time of the main module reported by -X importtime within its
+    budget
+    """
+    # The fastest of several imports is kept to ignore the noise
+    assert min(cumulative_import_time("ecap5_treq.main") for _ in range(3)) < IMPORT_TIME_BUDGET
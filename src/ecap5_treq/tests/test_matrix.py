@@ -20,10 +20,12 @@
 # along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
+import json
+import sqlite3
 from mock import patch, Mock, mock_open, call
 import pytest
 
-from ecap5_treq.matrix import Matrix, prepare_matrix
+from ecap5_treq.matrix import Matrix, MatrixDb, MatrixDiff, is_matrix_db, prepare_matrix
 from ecap5_treq.check import Check
 from ecap5_treq.log import log_error, log_clear, log_warn
 
@@ -35,6 +37,16 @@ from ecap5_treq.log import log_error, log_clear, log_warn
 def reset():
     log_clear()
 
+@pytest.fixture()
+def matrix():
+    matrix = Matrix()
+    matrix.add("testsuite1.testcase1.check1", ["req1", "req2"])
+    matrix.add("testsuite1.testcase1.check2", [])
+    matrix.add("testsuite1.testcase1.check3", ["req2", "req2"])
+    matrix.add_untraceable("req3", "just1")
+    matrix.add_untraceable("req4")
+    return matrix
+
 #
 # Tests targetting Matrix class
 #
@@ -152,6 +164,34 @@ def test_Matrix_read_06():
     assert matrix.data["element2"] == []
     assert matrix.untraceable == {"req1": "just1", "req2": ""}
 
+def test_Matrix_read_07(tmp_path, matrix):
+    """Unit test for the read method of the Matrix class
+
+    The covered behavior is a matrix stored in a database
+    """
+    with MatrixDb(str(tmp_path / "matrix.db")) as db:
+        db.write(matrix)
+
+    assert Matrix(str(tmp_path / "matrix.db")) == matrix
+    assert list(Matrix(str(tmp_path / "matrix.db")).data) == list(matrix.data)
+
+def test_Matrix_read_08(tmp_path, matrix):
+    """Unit test for the read method of the Matrix class
+
+    The covered behaviors are:
+        * missing database reported as a missing csv matrix and not created
+        * database path with characters reserved in URIs
+    """
+    for extension in ["csv", "db"]:
+        with pytest.raises(FileNotFoundError):
+            Matrix(str(tmp_path / "missing.{}".format(extension)))
+    assert not (tmp_path / "missing.db").exists()
+
+    path = str(tmp_path / "matrix #1?.db")
+    with MatrixDb(path) as db:
+        db.write(matrix)
+    assert Matrix(path) == matrix
+
 def test_Matrix_check_01():
     """Unit test for the check method of the Matrix class
 
@@ -341,6 +381,168 @@ def test_Matrix___str__():
 # Tests targetting functions in matrix module
 #
 
+#
+# Tests targetting MatrixDb class
+#
+
+def test_MatrixDb_read(tmp_path, matrix):
+    """Unit test for the read method of the MatrixDb class
+
+    The covered behaviors are:
+        * empty database created
+        * database read by another read-only connection
+    """
+    with MatrixDb(str(tmp_path / "matrix.db")) as db:
+        result = Matrix()
+        db.read(result)
+        assert result == Matrix()
+        db.write(matrix)
+
+    with MatrixDb(str(tmp_path / "matrix.db"), readonly=True) as db:
+        result = Matrix()
+        db.read(result)
+        # The database opened read-only cannot be modified
+        with pytest.raises(sqlite3.OperationalError):
+            db.write(Matrix(), result)
+    assert result == matrix
+    assert list(result.untraceable) == ["req3", "req4"]
+
+def test_MatrixDb_lookups(tmp_path, matrix):
+    """Unit test for the get, get_checks and __contains__ methods of the MatrixDb class
+    """
+    with MatrixDb(str(tmp_path / "matrix.db")) as db:
+        db.write(matrix)
+
+        assert db.get("testsuite1.testcase1.check1") == ["req1", "req2"]
+        assert db.get("testsuite1.testcase1.check2") == []
+        assert db.get("testsuite1.testcase1.check4") == []
+        assert db.get_checks("req2") == ["testsuite1.testcase1.check1", "testsuite1.testcase1.check3"]
+        assert db.get_checks("req5") == []
+        assert "testsuite1.testcase1.check2" in db
+        assert "testsuite1.testcase1.check4" not in db
+
+def test_MatrixDb_write(tmp_path, matrix):
+    """Unit test for the write method of the MatrixDb class
+
+    The covered behaviors are:
+        * number of modified rows
+        * added, removed, modified and moved checks and untraceable requirements
+        * modifications rolled back on error
+    """
+    with MatrixDb(str(tmp_path / "matrix.db")) as db:
+        assert db.write(matrix) == 5
+        assert db.write(matrix) == 0
+        assert db.write(matrix, matrix) == 0
+
+        updated = Matrix()
+        updated.add("testsuite1.testcase1.check0", ["req1"])
+        updated.add("testsuite1.testcase1.check3", ["req2"])
+        updated.add("testsuite1.testcase1.check1", ["req1", "req2"])
+        updated.add_untraceable("req4", "just2")
+        # Removed check2 and req3, added check0, modified check3 and req4, moved check1
+        assert db.write(updated) == 6
+        result = Matrix()
+        db.read(result)
+        assert result == updated
+        assert list(result.data) == list(updated.data)
+        assert db.get_checks("req2") == ["testsuite1.testcase1.check3", "testsuite1.testcase1.check1"]
+
+        # The invalid requirement id raises an error after the removed checks were deleted
+        matrix.add("testsuite1.testcase1.check1", ["req1", None])
+        with pytest.raises(TypeError):
+            db.write(matrix)
+        result = Matrix()
+        db.read(result)
+        assert result == updated
+
+#
+# Tests targetting MatrixDiff class
+#
+
+def test_MatrixDiff_01():
+    """Unit test for the MatrixDiff class
+
+    The covered behaviors are:
+        * identical matrices
+        * added, removed and changed checks
+        * added, removed and changed untraceable requirements
+        * trace order change
+    """
+    previous = Matrix()
+    previous.add("check1", ["req1"])
+    previous.add("check2", ["req1", "req2"])
+    previous.add("check3", [])
+    previous.add("check4", ["req3", "req4"])
+    previous.add_untraceable("req5", "just1")
+    previous.add_untraceable("req6", "just2")
+
+    diff = MatrixDiff(previous, previous)
+    assert len(diff) == 0
+    assert diff.to_str() == "Matrix unchanged"
+
+    matrix = Matrix()
+    matrix.add("check1", ["req1"])
+    matrix.add("check3", ["req2"])
+    matrix.add("check4", ["req4", "req3"])
+    matrix.add("check5", [])
+    matrix.add_untraceable("req6", "just3")
+    matrix.add_untraceable("req7", "just4")
+
+    diff = MatrixDiff(previous, matrix)
+    assert len(diff) == 7
+    assert diff.added_checks == {"check5": []}
+    assert diff.removed_checks == {"check2": ["req1", "req2"]}
+    assert diff.changed_checks == {"check3": ([], ["req2"]), "check4": (["req3", "req4"], ["req4", "req3"])}
+    assert diff.added_untraceable == {"req7": "just4"}
+    assert diff.removed_untraceable == {"req5": "just1"}
+    assert diff.changed_untraceable == {"req6": ("just2", "just3")}
+
+def test_MatrixDiff_02():
+    """Unit test for the to_str, __str__ and to_json methods of the MatrixDiff class
+    """
+    previous = Matrix()
+    previous.add("check1", ["req1"])
+    previous.add("check2", ["req2"])
+    previous.add_untraceable("req3", "just1")
+    previous.add_untraceable("req4", "just2")
+    matrix = Matrix()
+    matrix.add("check1", ["req1", "req2"])
+    matrix.add("check3", ["req3"])
+    matrix.add_untraceable("req4", "just3")
+    matrix.add_untraceable("req5", "just4")
+
+    diff = MatrixDiff(previous, matrix)
+    assert str(diff) == diff.to_str() == \
+        "Matrix updated: 1 added, 1 removed and 1 changed checks, " \
+        "1 added, 1 removed and 1 changed untraceable requirements\n" \
+        "+ check3: req3\n" \
+        "- check2: req2\n" \
+        "~ check1: req1, req2 (was req1)\n" \
+        "+ __UNTRACEABLE__ req5: just4\n" \
+        "- __UNTRACEABLE__ req3: just1\n" \
+        "~ __UNTRACEABLE__ req4: just3 (was just2)"
+    assert json.loads(diff.to_json()) == {
+        "added_checks": {"check3": ["req3"]},
+        "removed_checks": {"check2": ["req2"]},
+        "changed_checks": {"check1": {"previous": ["req1"], "current": ["req1", "req2"]}},
+        "added_untraceable": {"req5": "just4"},
+        "removed_untraceable": {"req3": "just1"},
+        "changed_untraceable": {"req4": {"previous": "just2", "current": "just3"}}
+    }
+
+#
+# Tests targetting functions of the matrix module
+#
+
+def test_is_matrix_db():
+    """Unit test for the is_matrix_db function
+    """
+    assert is_matrix_db("path/matrix.db")
+    assert is_matrix_db("path/matrix.SQLITE")
+    assert is_matrix_db("path/matrix.sqlite3")
+    assert not is_matrix_db("path/matrix.csv")
+    assert not is_matrix_db("path.db/matrix")
+
 def test_prepare_matrix_01():
     """Unit test for the prepare_matrix function
 
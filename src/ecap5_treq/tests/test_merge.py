@@ -0,0 +1,110 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+# 
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+# 
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from ecap5_treq.check import Check
+from ecap5_treq.config import MergePolicy
+from ecap5_treq.merge import merge_testdata
+from ecap5_treq.log import log_error, log_clear
+
+#
+# Fixture definitions
+#
+
+@pytest.fixture(autouse=True)
+def reset():
+    log_clear()
+
+def runs() -> list[Check]:
+    return [
+        Check("testsuite1", "testcase1", "check1", 1, None),
+        Check("testsuite1", "testcase1", "check2", 0, "msg1"),
+        Check("testsuite1", "testcase1", "check1", 0, "msg2"),
+        Check("testsuite1", "testcase1", "check3", 1, None),
+        Check("testsuite1", "testcase1", "check2", 1, None),
+        Check("testsuite1", "testcase1", "check1", 0, "msg3"),
+        Check("testsuite1", "testcase1", "check1", 1, None),
+        Check("testsuite1", "testcase1", "check1", 1, None)
+    ]
+
+def summary(checks: list[Check]) -> list[tuple]:
+    return [(check.shortid, check.status, check.error_msg, check.runs) for check in checks]
+
+#
+# Tests targetting functions from the merge module
+#
+
+def test_merge_testdata_01():
+    """Unit test for the merge_testdata function
+
+    The covered behaviors are:
+        * no testdata
+        * no duplicates
+        * last policy
+        * order of the first runs
+        * testdata not modified
+    """
+    assert merge_testdata([]) == []
+
+    testdata = [Check("testsuite1", "testcase1", "check1", 1, None), Check("testsuite1", "testcase1", "check2", 0, "msg")]
+    merged = merge_testdata(iter(testdata))
+    assert merged == testdata
+    assert merged[0] is testdata[0]
+
+    testdata = runs()
+    merged = merge_testdata(testdata)
+    assert summary(merged) == [("check1", True, None, 5), ("check2", True, None, 2), ("check3", True, None, 1)]
+    assert testdata == runs()
+
+def test_merge_testdata_02():
+    """Unit test for the merge_testdata function
+
+    The covered behavior is the any_fail policy
+    """
+    merged = merge_testdata(runs(), MergePolicy.ANY_FAIL)
+    assert summary(merged) == [("check1", False, "msg3", 5), ("check2", False, "msg1", 2), ("check3", True, None, 1)]
+
+def test_merge_testdata_03():
+    """Unit test for the merge_testdata function
+
+    The covered behaviors are:
+        * pass_rate policy reached
+        * pass_rate policy not reached
+        * pass_rate applied to checks run once
+    """
+    merged = merge_testdata(runs(), MergePolicy.PASS_RATE, 0.5)
+    assert summary(merged) == [("check1", True, None, 5), ("check2", True, None, 2), ("check3", True, None, 1)]
+
+    merged = merge_testdata(runs(), MergePolicy.PASS_RATE, 0.8)
+    assert summary(merged) == [("check1", False, "msg3", 5), ("check2", False, "msg1", 2), ("check3", True, None, 1)]
+
+    merged = merge_testdata([Check("testsuite1", "testcase1", "check1", 0, "msg")], MergePolicy.PASS_RATE, 0)
+    assert summary(merged) == [("check1", True, None, 1)]
+
+def test_merge_testdata_04():
+    """Unit test for the merge_testdata function
+
+    The covered behavior is an unknown policy
+    """
+    with pytest.raises(SystemExit) as e:
+        merge_testdata(runs(), "policy")
+    assert len(log_error.msgs) == 1
@@ -0,0 +1,178 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+# 
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+# 
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import pytest
+from mock import patch
+
+from ecap5_treq.output import OutputFile, read_umask, replace_if_changed, same_content
+
+#
+# Tests targetting OutputFile class
+#
+
+def test_OutputFile_01(tmp_path):
+    """Unit test for the OutputFile class
+
+    The covered behaviors are:
+        * new output file
+        * unchanged output file not replaced
+        * changed output file replaced
+        * no temporary file left
+    """
+    path = str(tmp_path / "output.md")
+
+    output = OutputFile(path)
+    with output as file:
+        file.write("content1\n")
+        # The output file is only created once complete
+        assert not os.path.exists(path)
+    assert output.changed
+    with open(path, encoding="utf-8") as file:
+        assert file.read() == "content1\n"
+
+    os.utime(path, ns=(0, 0))
+    output = OutputFile(path)
+    with output as file:
+        file.write("content1")
+        file.write("\n")
+    assert not output.changed
+    assert os.stat(path).st_mtime_ns == 0
+
+    output = OutputFile(path)
+    with output as file:
+        file.write("content2\n")
+    assert output.changed
+    assert os.stat(path).st_mtime_ns != 0
+    with open(path, encoding="utf-8") as file:
+        assert file.read() == "content2\n"
+
+    assert os.listdir(tmp_path) == ["output.md"]
+
+def test_OutputFile_02(tmp_path):
+    """Unit test for the OutputFile class
+
+    The covered behavior is an exception raised while writing
+    """
+    path = str(tmp_path / "output.md")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("content1\n")
+
+    with pytest.raises(RuntimeError):
+        with OutputFile(path) as file:
+            file.write("content2\n")
+            raise RuntimeError()
+
+    assert os.listdir(tmp_path) == ["output.md"]
+    with open(path, encoding="utf-8") as file:
+        assert file.read() == "content1\n"
+
+def test_OutputFile_03(tmp_path):
+    """Unit test for the OutputFile class
+
+    The covered behaviors are:
+        * outputs written at the same time using different temporary files
+        * permissions of a new output file
+    """
+    path = str(tmp_path / "output.md")
+
+    output1 = OutputFile(path)
+    output2 = OutputFile(path)
+    with output1 as file1, output2 as file2:
+        assert output1.tmp_path != output2.tmp_path
+        file1.write("content1\n")
+        file2.write("content2\n")
+    assert output1.changed
+    assert output2.changed
+
+    assert os.listdir(tmp_path) == ["output.md"]
+    with open(path, encoding="utf-8") as file:
+        assert file.read() == "content1\n"
+    umask = os.umask(0o022)
+    os.umask(umask)
+    assert os.stat(path).st_mode & 0o777 == 0o666 & ~umask
+
+#
+# Tests targetting functions from the output module
+#
+
+def test_replace_if_changed(tmp_path):
+    """Unit test for the replace_if_changed function
+
+    The covered behavior is the permissions of the replaced file being kept
+    """
+    path = str(tmp_path / "output.json")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("content1\n")
+    os.chmod(path, 0o640)
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        file.write("content2\n")
+
+    assert replace_if_changed(path + ".tmp", path)
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    assert not os.path.exists(path + ".tmp")
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="/proc is not available")
+def test_read_umask_01():
+    """Unit test for the read_umask function
+
+    The covered behavior is the mask read from /proc/self/status without setting it
+    """
+    umask = os.umask(0o027)
+    try:
+        with patch("os.umask") as stub_umask:
+            assert read_umask() == 0o027
+            stub_umask.assert_not_called()
+    finally:
+        os.umask(umask)
+
+def test_read_umask_02():
+    """Unit test for the read_umask function
+
+    The covered behavior is the mask read by setting it when /proc is not available
+    """
+    umask = os.umask(0o027)
+    try:
+        with patch("builtins.open", side_effect=OSError):
+            assert read_umask() == 0o027
+        assert os.umask(0o027) == 0o027
+    finally:
+        os.umask(umask)
+
+def test_same_content(tmp_path):
+    """Unit test for the same_content function
+
+    The covered behaviors are:
+        * missing file
+        * different sizes
+        * same size with different contents
+        * same contents
+    """
+    contents = {"file1": "content1", "file2": "content1", "file3": "content2", "file4": "content"}
+    for name, content in contents.items():
+        with open(str(tmp_path / name), "w", encoding="utf-8") as file:
+            file.write(content)
+
+    assert not same_content(str(tmp_path / "file1"), str(tmp_path / "file5"))
+    assert not same_content(str(tmp_path / "file1"), str(tmp_path / "file4"))
+    assert not same_content(str(tmp_path / "file1"), str(tmp_path / "file3"))
+    assert same_content(str(tmp_path / "file1"), str(tmp_path / "file2"))
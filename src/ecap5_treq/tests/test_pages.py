@@ -0,0 +1,194 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+#
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+#
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import pytest
+
+from ecap5_treq.req import Req
+from ecap5_treq.check import Check
+from ecap5_treq.matrix import Matrix
+from ecap5_treq.analysis import Analysis
+from ecap5_treq.html import STYLE
+from ecap5_treq.log import log_clear, log_error
+from ecap5_treq.pages import PageKind, write_site, site_pages, page_name
+
+#
+# Fixture definitions
+#
+
+@pytest.fixture(autouse=True)
+def reset():
+    log_clear()
+
+@pytest.fixture
+def analysis():
+    reqs = [ \
+        Req("U_cov1", "description1", {}), \
+        Req("F_cov2", "description2", {"derivedfrom": ["U_cov1"], "allocation": ["module1"]}), \
+        Req("U_untra3", "description3", {}), \
+        Req("F_uncov4", "description4", {"allocation": ["module1"]}) \
+    ]
+    checks = [ \
+        Check("testsuite1", "testcase1", "check1"), \
+        Check("testsuite1", "testcase1", "check2"), \
+        Check("testsuite1", "testcase2", "check3"), \
+        Check("testsuite 3", "testcase1", "check5") \
+    ]
+    testdata = [ \
+        Check("testsuite1", "testcase1", "check1", 1), \
+        Check("testsuite1", "testcase1", "check2", 1), \
+        Check("testsuite2", "testcase1", "check4", 1), \
+        Check("testsuite 3", "testcase1", "check5", 0, "msg1") \
+    ]
+    matrix = Matrix()
+    matrix.add("testsuite1.testcase1.check1", ["F_cov2"])
+    matrix.add("testsuite1.testcase1.check2", ["U_cov1"])
+    matrix.add("testsuite 3.testcase1.check5", ["U_cov1"])
+    matrix.add_untraceable("U_untra3", "just1")
+    result = Analysis(reqs, checks, testdata, matrix)
+    log_clear()
+    return result
+
+def read(path):
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+#
+# Tests targetting functions of the pages module
+#
+
+def test_write_site_01(tmp_path, analysis):
+    """Unit test for the write_site function
+
+    The covered behaviors are:
+        * index, testsuite and requirement category pages
+        * shared stylesheet
+        * links of the index page to the other pages
+        * unchanged pages not replaced
+    """
+    path = str(tmp_path / "site")
+
+    assert write_site(analysis, path) == 6
+
+    assert sorted(os.listdir(path)) == ["index.html", "reqs-functional-requirements.html", \
+                                        "reqs-user-requirements.html", "style.css", "testsuite-testsuite-3.html", \
+                                        "testsuite-testsuite1.html"]
+    assert read(os.path.join(path, "style.css")) == STYLE
+    for name in os.listdir(path):
+        if name.endswith(".html"):
+            page = read(os.path.join(path, name))
+            assert "<link rel=\"stylesheet\" href=\"style.css\">" in page
+            assert STYLE not in page
+
+    index = read(os.path.join(path, "index.html"))
+    assert "<a href=\"testsuite-testsuite1.html\"><samp>testsuite1</samp></a>" in index
+    assert "<a href=\"reqs-user-requirements.html\">User Requirements</a>" in index
+    # The counters link to the pages of the anchors
+    assert "<a href=\"testsuite-testsuite-3.html#first-failed-check\">1</a>" in index
+    assert "<a href=\"reqs-user-requirements.html#untraceable-reqs\">1</a>" in index
+    assert "<a href=\"reqs-functional-requirements.html#uncovered-reqs\">1</a>" in index
+    assert "<a href=\"reqs-user-requirements.html#first-unallocated-req\">2</a>" in index
+    # The skipped and unknown checks are listed in the index page
+    assert "<a href=\"#skipped-checks\">1</a>" in index
+    assert "<a href=\"#unknown-checks\">1</a>" in index
+    assert "testsuite2.testcase1.check4" in index
+
+    testsuite = read(os.path.join(path, "testsuite-testsuite-3.html"))
+    assert "<a href=\"index.html\">Back to summary</a>" in testsuite
+    assert "<a id=\"first-failed-check\"></a>" in testsuite
+    assert "testsuite1.testcase1.check1" not in testsuite
+
+    category = read(os.path.join(path, "reqs-user-requirements.html"))
+    assert "U_cov1" in category
+    assert "<a id=\"untraceable-reqs\"></a>" in category
+    assert "F_uncov4" not in category
+
+    assert write_site(analysis, path) == 0
+
+def test_write_site_02(tmp_path, analysis):
+    """Unit test for the write_site function
+
+    The covered behavior is the pages written in parallel being identical to the pages written sequentially
+    """
+    write_site(analysis, str(tmp_path / "site1"))
+    write_site(analysis, str(tmp_path / "site2"), 2)
+
+    names = sorted(os.listdir(str(tmp_path / "site1")))
+    assert sorted(os.listdir(str(tmp_path / "site2"))) == names
+    for name in names:
+        assert read(str(tmp_path / "site1" / name)) == read(str(tmp_path / "site2" / name))
+
+def test_write_site_03(tmp_path, analysis):
+    """Unit test for the write_site function
+
+    The covered behavior is the removal of the pages of a previous report, other files being kept
+    """
+    path = tmp_path / "site"
+    path.mkdir()
+    for name in ["testsuite-testsuite4.html", "reqs-design-requirements.html", "other.html"]:
+        (path / name).write_text("content")
+
+    write_site(analysis, str(path))
+
+    assert not (path / "testsuite-testsuite4.html").exists()
+    assert not (path / "reqs-design-requirements.html").exists()
+    assert (path / "other.html").exists()
+
+def test_write_site_04(tmp_path, analysis):
+    """Unit test for the write_site function
+
+    The covered behavior is only the index page being written when errors were logged
+    """
+    log_error("error1")
+
+    write_site(analysis, str(tmp_path / "site"))
+
+    assert sorted(os.listdir(str(tmp_path / "site"))) == ["index.html", "style.css"]
+    index = read(str(tmp_path / "site" / "index.html"))
+    assert "<samp>error1</samp>" in index
+    assert "<p><strong>Report generation failed.</strong></p>" in index
+
+def test_site_pages(analysis):
+    """Unit test for the site_pages function
+
+    The covered behaviors are:
+        * testsuites which checks are all unknown without page
+        * requirement categories without requirements without page
+    """
+    assert site_pages(analysis) == {
+        "testsuite-testsuite1.html": (PageKind.TESTSUITE, "testsuite1"),
+        "testsuite-testsuite-3.html": (PageKind.TESTSUITE, "testsuite 3"),
+        "reqs-user-requirements.html": (PageKind.CATEGORY, "user_reqs"),
+        "reqs-functional-requirements.html": (PageKind.CATEGORY, "functional_reqs")
+    }
+
+def test_page_name():
+    """Unit test for the page_name function
+
+    The covered behaviors are:
+        * characters not allowed in file names replaced
+        * pages with the same name numbered
+    """
+    pages = {}
+    pages[page_name("prefix-", "Test/Suite 1", pages)] = None
+    pages[page_name("prefix-", "test suite:1", pages)] = None
+    pages[page_name("prefix-", "test-suite-1", pages)] = None
+    assert list(pages) == ["prefix-test-suite-1.html", "prefix-test-suite-1-2.html", "prefix-test-suite-1-3.html"]
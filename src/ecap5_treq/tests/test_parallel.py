@@ -0,0 +1,177 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+# 
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+# 
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+from mock import patch, Mock
+import pytest
+
+from ecap5_treq.parallel import parse_files, parse_in_worker, replay_worker_result
+from ecap5_treq.cache import Cache
+from ecap5_treq.req import tex_import_reqs_from_file
+from ecap5_treq.log import log_imp, log_warn, log_error, log_clear
+
+#
+# Fixture definitions
+#
+
+@pytest.fixture(autouse=True)
+def reset():
+    log_clear()
+
+@pytest.fixture()
+def spec_files(tmp_path):
+    files = []
+    for i in range(6):
+        path = tmp_path / "spec{}.tex".format(i)
+        # Every other requirement is missing its description to log warnings
+        path.write_text("\\req{{req{0}}}{{{1}}}\n\\req{{req{0}_bis}}{{description}}\ntext\n".format(i, "" if i % 2 else "description"))
+        files += [str(path)]
+    return files
+
+def parse_sequentially(files, cache=None):
+    """Parses files without any process pool and returns the records and logged messages
+    """
+    records = parse_files(cache, "tex", files, tex_import_reqs_from_file)
+    return records, log_imp.msgs, log_warn.msgs, log_error.msgs
+
+#
+# Tests targetting functions of the parallel module
+#
+
+def test_parse_files_01(spec_files, capsys):
+    """Unit test for the parse_files function
+
+    The covered behavior is the parsing of files using a pool of processes
+    """
+    expected = parse_sequentially(spec_files)
+    expected_output = capsys.readouterr().err
+    log_clear()
+
+    records = parse_files(None, "tex", spec_files, tex_import_reqs_from_file, 4)
+
+    assert len(records) == 12
+    assert (records, log_imp.msgs, log_warn.msgs, log_error.msgs) == expected
+    assert capsys.readouterr().err == expected_output
+
+def test_parse_files_02(tmp_path, spec_files, capsys):
+    """Unit test for the parse_files function
+
+    The covered behavior is the parsing of partially cached files using a pool of processes
+    """
+    cache = Cache(str(tmp_path / "cache"))
+    expected = parse_sequentially(spec_files[::2], cache)
+    cache.save()
+    log_clear()
+    capsys.readouterr()
+
+    expected = parse_sequentially(spec_files)
+    expected_output = capsys.readouterr().err
+    log_clear()
+
+    cache = Cache(str(tmp_path / "cache"))
+    records = parse_files(cache, "tex", spec_files, tex_import_reqs_from_file, 4)
+
+    assert (records, log_imp.msgs, log_warn.msgs, log_error.msgs) == expected
+    assert capsys.readouterr().err == expected_output
+    # The files parsed by the pool are stored in the cache
+    assert sorted(cache.tables["tex"].keys()) == sorted(spec_files)
+
+@patch("concurrent.futures.ProcessPoolExecutor")
+def test_parse_files_03(stub_ProcessPoolExecutor, tmp_path, spec_files):
+    """Unit test for the parse_files function
+
+    The covered behavior is no pool being created when all files are cached
+    """
+    cache = Cache(str(tmp_path / "cache"))
+    expected = parse_sequentially(spec_files, cache)
+    log_clear()
+
+    records = parse_files(cache, "tex", spec_files, tex_import_reqs_from_file, 4)
+
+    assert (records, log_imp.msgs, log_warn.msgs, log_error.msgs) == expected
+    stub_ProcessPoolExecutor.assert_not_called()
+
+def test_parse_files_04(tmp_path, spec_files, capsys):
+    """Unit test for the parse_files function
+
+    The covered behavior is a critical error interrupting the parsing in a worker process
+    """
+    path = tmp_path / "spec_error.tex"
+    path.write_text("\\req{}{description}\ntext\n")
+    spec_files.insert(3, str(path))
+
+    with pytest.raises(SystemExit) as excp:
+        parse_files(None, "tex", spec_files, tex_import_reqs_from_file, 4)
+
+    assert excp.value.code == -1
+    # Messages of the files preceding the error are logged before the error
+    assert log_warn.msgs == ["Missing description for requirement: \"\\req{req1}{}\""]
+    assert len(log_error.msgs) == 1
+    assert capsys.readouterr().err.endswith("ERROR: {}\n".format(log_error.msgs[0]))
+
+def test_parse_in_worker(spec_files, capsys):
+    """Unit test for the parse_in_worker function
+    """
+    log_warn("warn0")
+
+    records, imps, warnings, errors, output, exit_code = parse_in_worker(tex_import_reqs_from_file, spec_files[1])
+
+    assert len(records) == 2
+    assert imps == []
+    assert warnings == ["Missing description for requirement: \"\\req{req1}{}\""]
+    assert errors == []
+    assert output == "WARN: {}\n".format(warnings[0])
+    assert exit_code is None
+    # The messages are not printed by the worker process
+    assert capsys.readouterr().err == "WARN: warn0\n"
+
+def test_replay_worker_result(capsys):
+    """Unit test for the replay_worker_result function
+    """
+    records, warnings = replay_worker_result((["record"], ["imp1"], ["warn1"], ["error1"], "output", None))
+
+    assert records == ["record"]
+    assert warnings == ["warn1"]
+    assert log_imp.msgs == ["imp1"]
+    assert log_warn.msgs == ["warn1"]
+    assert log_error.msgs == ["error1"]
+    assert capsys.readouterr().err == "output"
+
+    with pytest.raises(SystemExit) as excp:
+        replay_worker_result(([], [], [], ["error2"], "", -1))
+    assert excp.value.code == -1
+    assert log_error.msgs == ["error1", "error2"]
+
+def test_parse_in_worker_exit(tmp_path, capsys):
+    """Unit test for the parse_in_worker function
+
+    The covered behavior is a critical error interrupting the parsing
+    """
+    path = tmp_path / "spec_error.tex"
+    path.write_text("\\req{}{description}\ntext\n")
+
+    records, imps, warnings, errors, output, exit_code = parse_in_worker(tex_import_reqs_from_file, str(path))
+
+    assert records == []
+    assert len(errors) == 1
+    assert output == "ERROR: {}\n".format(errors[0])
+    assert exit_code == -1
+    assert capsys.readouterr().err == ""
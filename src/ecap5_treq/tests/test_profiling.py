@@ -0,0 +1,122 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+# 
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+# 
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import tracemalloc
+
+from ecap5_treq.profiling import Profiler
+
+#
+# Tests targetting Profiler class
+#
+
+def test_Profiler_01():
+    """Unit test for the Profiler class
+
+    The covered behaviors are:
+        * stages and counters ignored until the profiler is started
+        * counters ignored outside of a stage
+    """
+    profiler = Profiler()
+    with profiler.stage("stage1") as stage:
+        assert stage is None
+        profiler.count("counter1")
+    assert profiler.stages == []
+
+    profiler.start(trace_memory=False)
+    profiler.count("counter1")
+    profiler.count_file(__file__)
+    profiler.stop()
+    assert profiler.stages == []
+
+def test_Profiler_02(tmp_path):
+    """Unit test for the Profiler class
+
+    The covered behaviors are:
+        * nested stages
+        * counters added to the innermost stage
+        * files read
+        * peak memory of a stage including the one of its nested stages
+        * memory tracing stopped with the profiler
+    """
+    path = str(tmp_path / "file1")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("content1")
+
+    profiler = Profiler()
+    profiler.start()
+    with profiler.stage("stage1"):
+        profiler.count("counter1", 2)
+        with profiler.stage("stage2"):
+            profiler.count("counter1")
+            profiler.count_file(path)
+            data = bytearray(10**6)
+        del data
+        profiler.count("counter1")
+    with profiler.stage("stage3"):
+        pass
+    profiler.stop()
+    assert not tracemalloc.is_tracing()
+
+    stage1, stage2, stage3 = profiler.stages
+    assert [stage.name for stage in profiler.stages] == ["stage1", "stage2", "stage3"]
+    assert [stage.depth for stage in profiler.stages] == [0, 1, 0]
+    assert stage1.counters == {"counter1": 3}
+    assert stage2.counters == {"counter1": 1, "files_read": 1, "bytes_read": 8}
+    assert stage3.counters == {}
+    assert stage2.peak_memory >= 10**6
+    assert stage1.peak_memory >= stage2.peak_memory
+    assert stage3.peak_memory < 10**6
+    assert stage1.wall_time >= stage2.wall_time
+    assert stage3.start >= stage1.start + stage1.wall_time
+
+def test_Profiler_03():
+    """Unit test for the Profiler class
+
+    The covered behaviors are:
+        * summary
+        * JSON output
+        * Chrome trace output
+    """
+    profiler = Profiler()
+    profiler.start(trace_memory=False)
+    with profiler.stage("stage1"):
+        with profiler.stage("stage2"):
+            profiler.count("counter1", 4)
+    profiler.stop()
+
+    lines = profiler.summary().split("\n")
+    assert len(lines) == 3
+    assert lines[1].startswith("stage1 ")
+    assert lines[2].startswith("  stage2 ")
+    assert lines[2].endswith("counter1=4")
+
+    stages = json.loads(profiler.to_json())
+    assert [stage["name"] for stage in stages] == ["stage1", "stage2"]
+    assert stages[1]["depth"] == 1
+    assert stages[1]["counters"] == {"counter1": 4}
+
+    events = json.loads(profiler.to_chrome_trace())["traceEvents"]
+    assert [event["name"] for event in events] == ["stage1", "stage2"]
+    assert all(event["ph"] == "X" for event in events)
+    assert events[1]["args"]["counter1"] == 4
+    assert events[0]["ts"] <= events[1]["ts"]
+    assert events[0]["dur"] >= events[1]["dur"]
@@ -27,8 +27,11 @@ from ecap5_treq.req import Req
 from ecap5_treq.check import Check
 from ecap5_treq.matrix import Matrix 
 from ecap5_treq.analysis import Analysis 
-from ecap5_treq.report import generate_report_warning_section, generate_report_summary, generate_test_report, generate_traceability_report, generate_test_result_badge, generate_traceability_result_badge, generate_report_footer, surround_with_link_if, latex_to_html, gen_result_badge, req_list_to_table_rows
+import io
+import re
+from ecap5_treq.report import write_report, generate_report, generate_report_warning_section, generate_report_summary, generate_test_report, generate_traceability_report, generate_test_result_badge, generate_traceability_result_badge, generate_report_footer, surround_with_link_if, latex_to_html, gen_result_badge, req_list_to_table_rows
 from ecap5_treq.log import log_error, log_clear, log_imp, log_warn
+from ecap5_treq.html import markdown_to_html
 
 #
 # Fixture definitions
@@ -42,6 +45,101 @@ def reset():
 # Tests targetting functions of the report module
 #
 
+def test_write_report_01():
+    """Unit test for the write_report function
+
+    The covered behavior is the full report being written when no errors were logged
+    """
+    log_warn("warn1")
+
+    analysis = Analysis([Req("req1", "description1", {})], [], [], Matrix())
+
+    out = io.StringIO()
+    write_report(analysis, out)
+
+    # The streamed report is identical to the concatenation of its sections
+    assert out.getvalue() == generate_report_warning_section() \
+                           + generate_report_summary(analysis) \
+                           + generate_test_report(analysis) \
+                           + generate_traceability_report(analysis) \
+                           + generate_report_footer()
+    assert generate_report(analysis) == out.getvalue()
+
+def test_write_report_02():
+    """Unit test for the write_report function
+
+    The covered behavior is only the warning section being written when errors were logged
+    """
+    log_error("error1")
+
+    analysis = Analysis([], [], [], Matrix())
+
+    out = io.StringIO()
+    write_report(analysis, out)
+
+    assert out.getvalue() == generate_report_warning_section() + "\n**Report generation failed.**"
+
+def normalize_html(html):
+    # The whitespace between elements is not significant
+    return re.sub(r">\s+<", "><", html).strip()
+
+def test_write_report_03():
+    """Unit test for the write_report function
+
+    The covered behaviors are:
+        * html report equivalent to the conversion of the markdown report
+        * alerts of each kind
+        * failed, skipped and unknown checks
+        * covered, untraceable and uncovered requirements
+    """
+    log_warn("warn1")
+    log_imp("imp1")
+
+    reqs = [ \
+        Req("U_cov1", "description1", {}), \
+        Req("F_cov2", "description2", {"derivedfrom": ["U_cov1"], "allocation": ["module1"]}), \
+        Req("U_untra3", "description3", {}), \
+        Req("F_uncov4", "description4", {}) \
+    ]
+    checks = [ \
+        Check("testsuite1", "testcase1", "check1"), \
+        Check("testsuite1", "testcase1", "check2"), \
+        Check("testsuite1", "testcase2", "check3") \
+    ]
+    testdata = [ \
+        Check("testsuite1", "testcase1", "check1", 0, "msg1"), \
+        Check("testsuite1", "testcase1", "check2", 1), \
+        Check("testsuite2", "testcase1", "check4", 1) \
+    ]
+    matrix = Matrix()
+    matrix.add("testsuite1.testcase1.check1", ["F_cov2"])
+    matrix.add("testsuite1.testcase1.check2", ["U_cov1"])
+    matrix.add_untraceable("U_untra3", "just1")
+
+    analysis = Analysis(reqs, checks, testdata, matrix)
+
+    out = io.StringIO()
+    write_report(analysis, out, html=True)
+
+    assert out.getvalue().startswith("<html>")
+    assert normalize_html(out.getvalue()) == normalize_html(markdown_to_html(generate_report(analysis)))
+    assert generate_report(analysis, html=True) == out.getvalue()
+
+def test_write_report_04():
+    """Unit test for the write_report function
+
+    The covered behavior is the html report when errors were logged
+    """
+    log_error("error1")
+
+    analysis = Analysis([], [], [], Matrix())
+
+    out = io.StringIO()
+    write_report(analysis, out, html=True)
+
+    assert "<p><strong>Report generation failed.</strong></p>" in out.getvalue()
+    assert normalize_html(out.getvalue()) == normalize_html(markdown_to_html(generate_report(analysis)))
+
 def test_generate_report_warning_section():
     """Unit test for the generate_report_warning_section function
 
@@ -25,7 +25,7 @@ from mock import patch, Mock, mock_open, call
 import pytest
 import io
 
-from ecap5_treq.req import Req, ReqStatus, import_reqs, rst_import_reqs, tex_import_reqs, tex_process_keyword, tex_process_matching_token, tex_process_options
+from ecap5_treq.req import Req, ReqStatus, import_reqs, rst_import_reqs, rst_import_reqs_from_file, tex_import_reqs, tex_import_reqs_from_file, tex_process_matching_token, tex_skip_newlines, tex_decode, tex_process_options
 from ecap5_treq.log import log_error, log_warn, log_clear
 
 #
@@ -46,6 +46,9 @@ def stubbed_open(path, encoding = "", newline=""):
     output = io.TextIOWrapper(reader)
     return output
 
+def stubbed_open_source(path):
+    return contextlib.nullcontext(stubbed_open.file_contents[path].encode("utf-8"))
+
 #
 # Tests targetting Req class
 #
@@ -224,6 +227,31 @@ def test_Req___eq__():
     other = "foo"
     assert req != other
 
+def test_Req___hash__():
+    """Unit test for the __hash__ method of the Req class
+
+    The covered behaviors are:
+        * requirements with the same id and data in sets and as dictionary keys
+        * hash unchanged when the status is modified
+        * interned ids
+        * no attribute dictionary
+    """
+    req = Req("req1", "description1", {"derivedfrom": ["req2"]})
+    other = Req("req1", "description1", {"derivedfrom": ["req2"]})
+    assert len(set([req, other, Req("req2", "description1", {})])) == 2
+    assert {req: "value"}[other] == "value"
+
+    hash_before = hash(req)
+    req.status = ReqStatus.COVERED
+    assert hash(req) == hash_before
+
+    derived = Req("".join(["req", "2"]), "description2", {"derivedfrom": ["".join(["req", "1"])]})
+    assert derived.id is req.derived_from[0]
+    assert derived.derived_from[0] is req.id
+
+    with pytest.raises(AttributeError):
+        req.attribute = "value"
+
 #
 # Tests targetting functions in req module
 #
@@ -235,7 +263,7 @@ def test_import_reqs_01(stub_rst_import_reqs):
     The covered behavior is RST format
     """
     reqs = import_reqs("path1", "RST")
-    stub_rst_import_reqs.assert_called_once_with("path1")
+    stub_rst_import_reqs.assert_called_once_with("path1", None, 1)
     assert reqs == ["val"]
 
 @patch("ecap5_treq.req.tex_import_reqs", return_value=["val"])
@@ -245,7 +273,7 @@ def test_import_reqs_02(stub_tex_import_reqs):
     The covered behavior is TEX format
     """
     reqs = import_reqs("path1", "TEX")
-    stub_tex_import_reqs.assert_called_once_with("path1")
+    stub_tex_import_reqs.assert_called_once_with("path1", None, 1)
     assert reqs == ["val"]
 
 def test_import_reqs_03():
@@ -396,9 +424,9 @@ content
     reqs = rst_import_reqs("path")
     assert len(log_warn.msgs) == 1
 
-@patch("builtins.open", side_effect=stubbed_open)
+@patch("ecap5_treq.req.open_source", side_effect=stubbed_open_source)
 @patch("glob.glob", side_effect=stubbed_glob)
-def test_tex_import_reqs_01(stub_glob, stub_open):
+def test_tex_import_reqs_01(stub_glob, stub_open_source):
     """Unit test for the tex_import_reqs function
 
     The covered behavior is no specification source file
@@ -406,9 +434,9 @@ def test_tex_import_reqs_01(stub_glob, stub_open):
     reqs = tex_import_reqs("path")
     assert len(reqs) == 0
 
-@patch("builtins.open", side_effect=stubbed_open)
+@patch("ecap5_treq.req.open_source", side_effect=stubbed_open_source)
 @patch("glob.glob", side_effect=stubbed_glob)
-def test_tex_import_reqs_02(stub_glob, stub_open):
+def test_tex_import_reqs_02(stub_glob, stub_open_source):
     """Unit test for the tex_import_reqs function
 
     The covered behavior is two files with no reqs
@@ -420,9 +448,9 @@ def test_tex_import_reqs_02(stub_glob, stub_open):
     reqs = tex_import_reqs("path")
     assert len(reqs) == 0
 
-@patch("builtins.open", side_effect=stubbed_open)
+@patch("ecap5_treq.req.open_source", side_effect=stubbed_open_source)
 @patch("glob.glob", side_effect=stubbed_glob)
-def test_tex_import_reqs_03(stub_glob, stub_open):
+def test_tex_import_reqs_03(stub_glob, stub_open_source):
     """Unit test for the tex_import_reqs function
 
     The covered behaviors are:
@@ -475,9 +503,9 @@ def test_tex_import_reqs_03(stub_glob, stub_open):
     assert reqs[4].description == "description5"
     assert reqs[4].derived_from == ["req1", "req2"]
 
-@patch("builtins.open", side_effect=stubbed_open)
+@patch("ecap5_treq.req.open_source", side_effect=stubbed_open_source)
 @patch("glob.glob", side_effect=stubbed_glob)
-def test_tex_import_reqs_04(stub_glob, stub_open):
+def test_tex_import_reqs_04(stub_glob, stub_open_source):
     """Unit test for the tex_import_reqs function
 
     The covered behavior is Req with empty id
@@ -490,9 +518,9 @@ def test_tex_import_reqs_04(stub_glob, stub_open):
         reqs = tex_import_reqs("path")
         assert len(log_error.msgs) == 1
 
-@patch("builtins.open", side_effect=stubbed_open)
+@patch("ecap5_treq.req.open_source", side_effect=stubbed_open_source)
 @patch("glob.glob", side_effect=stubbed_glob)
-def test_tex_import_reqs_05(stub_glob, stub_open):
+def test_tex_import_reqs_05(stub_glob, stub_open_source):
     """Unit test for the tex_import_reqs function
 
     The covered behavior is Req with missing description
@@ -504,9 +532,9 @@ def test_tex_import_reqs_05(stub_glob, stub_open):
     reqs = tex_import_reqs("path")
     assert len(log_warn.msgs) == 1
 
-@patch("builtins.open", side_effect=stubbed_open)
+@patch("ecap5_treq.req.open_source", side_effect=stubbed_open_source)
 @patch("glob.glob", side_effect=stubbed_glob)
-def test_tex_import_reqs_06(stub_glob, stub_open):
+def test_tex_import_reqs_06(stub_glob, stub_open_source):
     """Unit test for the tex_import_reqs function
 
     The covered behavior is Req with empty description
@@ -518,29 +546,103 @@ def test_tex_import_reqs_06(stub_glob, stub_open):
     reqs = tex_import_reqs("path")
     assert len(log_warn.msgs) == 1
 
-def test_tex_process_keyword_01():
-    """Unit test for the tex_process_keyword function
+@patch("ecap5_treq.req.open_source", side_effect=stubbed_open_source)
+@patch("glob.glob", side_effect=stubbed_glob)
+def test_tex_import_reqs_08(stub_glob, stub_open_source):
+    """Unit test for the tex_import_reqs function
 
-    The covered behaviors are :
-        * Cur equal zero
-        * Cur greater than zero
-        * Keyword without spaces
-        * Keyword with spaces
+    The covered behaviors are:
+        * Req fields separated by line breaks
+        * Req at the end of the file
+        * Req keyword within the description of a req
     """
-    cur = tex_process_keyword(0, "\\req{id}")
-    assert cur == 4
+    stubbed_glob.file_list = ["file1"]
+    stubbed_open.file_contents["file1"] = "\\req{req1}\n{description1 \\req{req2}{}}\n[derivedfrom=req0]\n\\req{req3}{description3}"
 
-    cur = tex_process_keyword(5, "     \\req {  id}")
-    assert cur == 10
+    reqs = tex_import_reqs("path")
 
-def test_tex_process_keyword_02():
-    """Unit test for the tex_process_keyword function
+    assert len(reqs) == 2
+    assert reqs[0].id == "req1"
+    assert reqs[0].description == "description1 \\req{req2}{}"
+    assert reqs[0].derived_from == ["req0"]
+    assert reqs[1].id == "req3"
+    assert reqs[1].description == "description3"
+    assert len(log_warn.msgs) == 0
+
+@patch("ecap5_treq.req.open_source", side_effect=stubbed_open_source)
+@patch("glob.glob", side_effect=stubbed_glob)
+def test_tex_import_reqs_09(stub_glob, stub_open_source):
+    """Unit test for the tex_import_reqs function
 
-    The covered behavior is syntax error in keyword
+    The covered behaviors are the locations reported in syntax errors:
+        * Req with empty id
+        * Req with unterminated description
     """
-    with pytest.raises(SystemExit) as e:
-        cur = tex_process_keyword(0, "\\req id}")
-        assert len(log_error.msgs) == 1
+    stubbed_glob.file_list = ["file1"]
+    stubbed_open.file_contents["file1"] = "\\req{req1}{description1}\n\n  \\req{}{description2}\n"
+
+    with pytest.raises(SystemExit):
+        tex_import_reqs("path")
+    assert log_error.msgs == ["Missing id for requirement at file1:3:3: \"\\req{}{description2}\""]
+
+    log_clear()
+    stubbed_open.file_contents["file1"] = "\\req{req1}{description1}\n\\req{req2}\n{description2 {}\n"
+
+    with pytest.raises(SystemExit):
+        tex_import_reqs("path")
+    assert log_error.msgs == ["Syntax error while processing matching tokens at file1:3:1: missing \"}\" matching \"{\""]
+
+@patch("ecap5_treq.req.parse_files", return_value=["req1", "req2"])
+@patch("glob.glob", side_effect=stubbed_glob)
+def test_rst_import_reqs_07(stub_glob, stub_parse_files):
+    """Unit test for the rst_import_reqs function
+
+    The covered behavior is importing requirements through a cache using multiple jobs
+    """
+    stubbed_glob.file_list = ["file1", "file2"]
+    cache = Mock()
+
+    reqs = rst_import_reqs("path", cache, 4)
+
+    assert reqs == ["req1", "req2"]
+    stub_parse_files.assert_called_once_with(cache, "rst", ["file1", "file2"], rst_import_reqs_from_file, 4)
+    cache.save.assert_called_once()
+
+@patch("ecap5_treq.req.parse_files", return_value=["req1", "req2"])
+@patch("glob.glob", side_effect=stubbed_glob)
+def test_tex_import_reqs_07(stub_glob, stub_parse_files):
+    """Unit test for the tex_import_reqs function
+
+    The covered behavior is importing requirements through a cache using multiple jobs
+    """
+    stubbed_glob.file_list = ["file1", "file2"]
+    cache = Mock()
+
+    reqs = tex_import_reqs("path", cache, 4)
+
+    assert reqs == ["req1", "req2"]
+    stub_parse_files.assert_called_once_with(cache, "tex", ["file1", "file2"], tex_import_reqs_from_file, 4)
+    cache.save.assert_called_once()
+
+def test_tex_skip_newlines():
+    """Unit test for the tex_skip_newlines function
+
+    The covered behaviors are :
+        * no line break
+        * multiple line breaks
+        * line breaks up to the end of the content
+    """
+    assert tex_skip_newlines(2, b"{}{}") == 2
+    assert tex_skip_newlines(2, b"{}\n\n{}") == 4
+    assert tex_skip_newlines(2, b"{}\n\n") == 4
+    assert tex_skip_newlines(2, b"{}\r\n{}") == 4
+
+def test_tex_decode():
+    """Unit test for the tex_decode function
+    """
+    assert tex_decode(b"content") == "content"
+    assert tex_decode(b"line1\nline2\r\nline3") == "line1line2line3"
+    assert tex_decode("d\u00e9rive".encode("utf-8")) == "d\u00e9rive"
 
 def test_tex_process_matching_token_01():
     """Unit test for the tex_process_matching_token function
@@ -552,18 +654,22 @@ def test_tex_process_matching_token_01():
         * multiple valid levels of tokens
         * different sets of tokens
     """
-    cur, result = tex_process_matching_token(0, "{content1}", "{", "}")
+    cur, result = tex_process_matching_token(0, b"{content1}", "{", "}")
     assert cur == 10
     assert result == "content1"
 
-    cur, result = tex_process_matching_token(5, "     [content1]", "[", "]")
+    cur, result = tex_process_matching_token(5, b"     [content1]", "[", "]")
     assert cur == 15
     assert result == "content1"
 
-    cur, result = tex_process_matching_token(0, "{content1 {second_level} end}", "{", "}")
+    cur, result = tex_process_matching_token(0, b"{content1 {second_level} end}", "{", "}")
     assert cur == 29
     assert result == "content1 {second_level} end"
 
+    cur, result = tex_process_matching_token(0, b"{content1\n content2}", "{", "}")
+    assert cur == 20
+    assert result == "content1 content2"
+
 def test_tex_process_matching_token_02():
     """Unit test for the tex_process_matching_token function
 
@@ -573,20 +679,24 @@ def test_tex_process_matching_token_02():
         * missing opening token in multiple levels
         * missing closing token in multiple levels
     """
-    cur, result = tex_process_matching_token(0, "content1", "{", "}")
+    cur, result = tex_process_matching_token(0, b"content1", "{", "}")
     assert cur == 0
     assert result == None
 
     with pytest.raises(SystemExit) as e:
-        cur, result = tex_process_matching_token(0, "{content1", "{", "}")
+        cur, result = tex_process_matching_token(0, b"{content1", "{", "}")
         assert len(log_error.msgs) == 1
 
-    cur, result = tex_process_matching_token(0, "content1 {content2}}", "{", "}")
+    cur, result = tex_process_matching_token(0, b"content1 {content2}}", "{", "}")
     assert cur == 0
     assert result == None
 
+    cur, result = tex_process_matching_token(8, b"content1", "{", "}")
+    assert cur == 8
+    assert result == None
+
     with pytest.raises(SystemExit) as e:
-        cur, result = tex_process_matching_token(0, "{content1 {content2} end", "{", "}")
+        cur, result = tex_process_matching_token(0, b"{content1 {content2} end", "{", "}")
         assert len(log_error.msgs) == 2
 
 def test_tex_process_options_01():
@@ -0,0 +1,96 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+# 
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+# 
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+import mmap
+from mock import patch
+import pytest
+
+from ecap5_treq.source import open_source, source_location
+from ecap5_treq.check import import_checks_from_file
+from ecap5_treq.req import tex_import_reqs_from_file
+from ecap5_treq.log import log_clear
+
+#
+# Fixture definitions
+#
+
+@pytest.fixture(autouse=True)
+def reset():
+    log_clear()
+
+#
+# Tests targetting functions of the source module
+#
+
+def test_open_source_01(tmp_path):
+    """Unit test for the open_source function
+
+    The covered behaviors are:
+        * small file read in memory
+        * empty file
+    """
+    path = tmp_path / "source.cpp"
+    path.write_bytes(b"content\r\n")
+    with open_source(str(path)) as content:
+        assert isinstance(content, bytes)
+        assert content == b"content\r\n"
+
+    path.write_bytes(b"")
+    with open_source(str(path)) as content:
+        assert content == b""
+
+@patch("ecap5_treq.source.MMAP_MIN_SIZE", 1)
+def test_open_source_02(tmp_path):
+    """Unit test for the open_source function
+
+    The covered behavior is large file mapped in memory
+    """
+    path = tmp_path / "source.cpp"
+    path.write_bytes(b"content\r\n")
+    with open_source(str(path)) as content:
+        assert isinstance(content, mmap.mmap)
+        assert content[:] == b"content\r\n"
+    assert content.closed
+
+@patch("ecap5_treq.source.MMAP_MIN_SIZE", 1)
+def test_open_source_03(tmp_path):
+    """Unit test for the open_source function
+
+    The covered behavior is the scanning of mapped check and latex files
+    """
+    path = tmp_path / "source.cpp"
+    path.write_bytes(b"// CHECK(\"a.b.c\")\nCHECK(\"testsuite1.testcase1.check1\", cond);\n")
+    checks = import_checks_from_file(str(path))
+    assert [check.id for check in checks] == ["testsuite1.testcase1.check1"]
+
+    path = tmp_path / "spec.tex"
+    path.write_bytes("\\req{req1}{d\u00e9scription\r\n1}\n".encode("utf-8"))
+    reqs = tex_import_reqs_from_file(str(path))
+    assert [(req.id, req.description) for req in reqs] == [("req1", "d\u00e9scription1")]
+
+def test_source_location():
+    """Unit test for the source_location function
+    """
+    content = "line1\n  l\u00efne2 {\nline3".encode("utf-8")
+
+    assert source_location(0, content, "file") == "file:1:1"
+    assert source_location(15, content, "file") == "file:2:9"
+    assert source_location(17, content) == "<content>:3:1"
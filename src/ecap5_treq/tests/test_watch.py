@@ -0,0 +1,90 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+# 
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+# 
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+from mock import patch
+import pytest
+
+from ecap5_treq.watch import snapshot, wait_for_changes
+
+#
+# Tests targetting functions from the watch module
+#
+
+def test_snapshot(tmp_path):
+    """Unit test for the snapshot function
+
+    The covered behaviors are:
+        * files in nested directories
+        * watched file
+        * missing path
+    """
+    os.makedirs(str(tmp_path / "dir" / "subdir"))
+    (tmp_path / "dir" / "file1").write_text("content1")
+    (tmp_path / "dir" / "subdir" / "file2").write_text("content22")
+    (tmp_path / "file3").write_text("")
+
+    files = snapshot([str(tmp_path / "dir"), str(tmp_path / "file3"), str(tmp_path / "missing")])
+    assert sorted(files.keys()) == [ \
+        str(tmp_path / "dir" / "file1"), \
+        str(tmp_path / "dir" / "subdir" / "file2"), \
+        str(tmp_path / "file3") \
+    ]
+    assert files[str(tmp_path / "dir" / "subdir" / "file2")] == \
+            (os.stat(str(tmp_path / "dir" / "subdir" / "file2")).st_mtime_ns, 9)
+
+def test_wait_for_changes(tmp_path):
+    """Unit test for the wait_for_changes function
+
+    The covered behaviors are:
+        * scans repeated until a change is detected
+        * changes written in several steps debounced
+    """
+    file = tmp_path / "file"
+    file.write_text("content")
+    previous = snapshot([str(tmp_path)])
+
+    # Each scan is preceded by a sleep, the file is modified during some of them
+    writes = {3: "content1", 4: "content12", 5: "content123"}
+    def stubbed_sleep(interval):
+        stubbed_sleep.count += 1
+        if stubbed_sleep.count in writes:
+            file.write_text(writes[stubbed_sleep.count])
+    stubbed_sleep.count = 0
+
+    with patch("time.sleep", side_effect=stubbed_sleep):
+        current = wait_for_changes([str(tmp_path)], previous, 0.1, 0.0)
+    # Without debouncing, the first change is returned
+    assert stubbed_sleep.count == 3
+    assert current[str(file)][1] == len("content1")
+
+    # The clock advances by the interval at each sleep
+    file.write_text("content")
+    previous = snapshot([str(tmp_path)])
+    stubbed_sleep.count = 0
+    with patch("time.sleep", side_effect=stubbed_sleep), \
+         patch("time.monotonic", side_effect=lambda: stubbed_sleep.count * 0.1):
+        current = wait_for_changes([str(tmp_path)], previous, 0.1, 0.25)
+    # The scans continue until no change is detected for the debounce duration after the last change
+    assert stubbed_sleep.count == 8
+    assert current == snapshot([str(tmp_path)])
+    assert current[str(file)][1] == len("content123")
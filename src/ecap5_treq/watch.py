@@ -0,0 +1,101 @@
+#           __        _
+#  ________/ /  ___ _(_)__  ___
+# / __/ __/ _ \/ _ `/ / _ \/ -_)
+# \__/\__/_//_/\_,_/_/_//_/\__/
+# 
+# Copyright (C) Clément Chaine
+# This file is part of ECAP5-TREQ <https://github.com/ECAP5/ECAP5-TREQ>
+# 
+# ECAP5-TREQ is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# ECAP5-TREQ is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with ECAP5-TREQ.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import time
+
+# Interval in seconds between two scans of the watched paths
+WATCH_INTERVAL = 0.2
+# Duration in seconds without any change after which the changes are considered complete
+WATCH_DEBOUNCE = 0.3
+
+def snapshot(paths: list[str]) -> dict[str, tuple[int, int]]:
+    """Returns the modification time and size of the files in the watched paths
+
+    :param paths: paths to the watched files and directories. Directories are watched recursively and missing paths
+                  are ignored.
+    :type paths: list[str]
+
+    :returns: the modification time and size of each file indexed by path
+    :rtype: dict[str, tuple[int, int]]
+    """
+    files = {}
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, filenames in os.walk(path):
+                for filename in filenames:
+                    stat_file(os.path.join(root, filename), files)
+        else:
+            stat_file(path, files)
+    return files
+
+def stat_file(file: str, files: dict[str, tuple[int, int]]) -> None:
+    """Adds the modification time and size of a file to a snapshot
+
+    :param file: path to the file
+    :type file: str
+
+    :param files: the snapshot to complete
+    :type files: dict[str, tuple[int, int]]
+    """
+    try:
+        stat = os.stat(file)
+    except OSError:
+        # The file was removed or is not accessible
+        return
+    files[file] = (stat.st_mtime_ns, stat.st_size)
+
+def wait_for_changes(paths: list[str], previous: dict[str, tuple[int, int]], interval: float = WATCH_INTERVAL, \
+                     debounce: float = WATCH_DEBOUNCE) -> dict[str, tuple[int, int]]:
+    """Waits until files of the watched paths are added, removed or modified
+
+    The watched paths are scanned periodically. Once a change is detected, the scans continue until no change is
+    detected for the debounce duration so that files written in several steps are only processed once.
+
+    :param paths: paths to the watched files and directories
+    :type paths: list[str]
+
+    :param previous: snapshot of the watched paths to compare to
+    :type previous: dict[str, tuple[int, int]]
+
+    :param interval: interval in seconds between two scans
+    :type interval: float, optional
+
+    :param debounce: duration in seconds without any change after which the changes are complete
+    :type debounce: float, optional
+
+    :returns: the snapshot of the watched paths after the changes
+    :rtype: dict[str, tuple[int, int]]
+    """
+    current = previous
+    while current == previous:
+        time.sleep(interval)
+        current = snapshot(paths)
+
+    last_change = time.monotonic()
+    while time.monotonic() - last_change < debounce:
+        time.sleep(interval)
+        latest = snapshot(paths)
+        if latest != current:
+            current = latest
+            last_change = time.monotonic()
+    return current